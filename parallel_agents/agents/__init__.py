@@ -1,22 +1,28 @@
 """
 Agents package for script analysis workflow.
+
+Submodules are imported on first attribute access, and each agent is only
+built the first time it runs, so importing the package is cheap.
 """
 
+import importlib
+
 # You can optionally export commonly used classes
-from .info_gathering_agent import RawScriptData, extract_script_data
-from .cost_analysis_agent import CostBreakdown, analyze_costs
-from .props_extraction_agent import PropsBreakdown, analyze_props
-from .location_analysis_agent import LocationBreakdown, analyze_locations
-from .character_analysis_agent import CharacterBreakdown, analyze_characters
-from .scene_breakdown_agent import SceneBreakdown, analyze_scenes
-from .timeline_agent import TimelineBreakdown, analyze_timeline
+_EXPORTS = {
+    'RawScriptData': 'info_gathering_agent', 'extract_script_data': 'info_gathering_agent',
+    'CostBreakdown': 'cost_analysis_agent', 'analyze_costs': 'cost_analysis_agent',
+    'PropsBreakdown': 'props_extraction_agent', 'analyze_props': 'props_extraction_agent',
+    'LocationBreakdown': 'location_analysis_agent', 'analyze_locations': 'location_analysis_agent',
+    'CharacterBreakdown': 'character_analysis_agent', 'analyze_characters': 'character_analysis_agent',
+    'SceneBreakdown': 'scene_breakdown_agent', 'analyze_scenes': 'scene_breakdown_agent',
+    'TimelineBreakdown': 'timeline_agent', 'analyze_timeline': 'timeline_agent',
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    'RawScriptData', 'extract_script_data',
-    'CostBreakdown', 'analyze_costs',
-    'PropsBreakdown', 'analyze_props',
-    'LocationBreakdown', 'analyze_locations',
-    'CharacterBreakdown', 'analyze_characters',
-    'SceneBreakdown', 'analyze_scenes',
-    'TimelineBreakdown', 'analyze_timeline',
-]
\ No newline at end of file
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
@@ -1,6 +1,6 @@
-from pydantic_ai import Agent
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
+from functools import lru_cache
 import sys
 import os
 
@@ -8,7 +8,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils import get_model
 from .info_gathering_agent import RawScriptData
 
-model = get_model()
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
 
 # State/Output type
 class CharacterBreakdown(BaseModel):
@@ -40,13 +41,18 @@ system_prompt = """
     """
 
 # Agent
-character_analysis_agent = Agent(
-    model,
-    output_type=CharacterBreakdown,
-    system_prompt=system_prompt
-)
-
-async def analyze_characters(raw_data: RawScriptData) -> CharacterBreakdown:
-    """Analyze characters based on extracted script data"""
-    result = await character_analysis_agent.run(raw_data.model_dump_json())
+@lru_cache(maxsize=None)
+def get_character_analysis_agent() -> "Agent":
+    """Build the agent on first use"""
+    from pydantic_ai import Agent
+
+    return Agent(
+        get_model(),
+        output_type=CharacterBreakdown,
+        system_prompt=system_prompt
+    )
+
+async def analyze_characters(raw_data: RawScriptData, payload: Optional[str] = None) -> CharacterBreakdown:
+    """Analyze characters based on extracted script data, optionally given a pre-serialized projection of it"""
+    result = await get_character_analysis_agent().run(payload if payload is not None else raw_data.model_dump_json())
     return result.output
\ No newline at end of file
@@ -1,14 +1,18 @@
-from pydantic_ai import Agent
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
+from functools import lru_cache
+import json
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cost_model import estimate_costs
+from script_stats import ScriptStatistics
 from utils import get_model
 from .info_gathering_agent import RawScriptData
 
-model = get_model()
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
 
 # State/Output type
 class CostBreakdown(BaseModel):
@@ -36,16 +40,63 @@ system_prompt="""
     - Post-production requirements
     - Shooting schedule impact on costs
 
+    When script_statistics is given, its page counts, scene counts, day/night and INT/EXT splits
+    and pages per location are exact figures computed from the script - use them as they are
+    instead of estimating.
+
+    When cost_estimate is given, it summarizes the budget computed from the production's rate tables.
+    Leave every field except cost_optimization_suggestions empty (0 for estimated_shoot_days), they
+    are filled in from the estimate. Base the suggestions on its largest categories.
+
     Provide realistic cost assessments based on industry standards.
     """
 
 # Agent
-cost_analysis_agent = Agent(
-    model,
-    output_type=CostBreakdown,
-    system_prompt=system_prompt
-)
-
-async def analyze_costs(raw_data: RawScriptData) -> CostBreakdown:
-    """Analyze costs based on extracted script data"""
-    return await cost_analysis_agent.run(raw_data.model_dump_json())
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_cost_analysis_agent() -> "Agent":
+    """Build the agent on first use"""
+    from pydantic_ai import Agent
+
+    return Agent(
+        get_model(),
+        output_type=CostBreakdown,
+        system_prompt=system_prompt
+    )
+
+def cost_suggestions_enabled() -> bool:
+    """Whether the model is asked for cost suggestions when the cost model provides the figures (COST_SUGGESTIONS_ENABLED)"""
+    return os.getenv('COST_SUGGESTIONS_ENABLED', '1').lower() not in ('0', 'false', 'no', '')
+
+def blank_cost_breakdown() -> CostBreakdown:
+    """A breakdown with every field empty, for the cost model to fill in"""
+    return CostBreakdown(
+        estimated_budget_range="", estimated_shoot_days=0, crew_size_recommendation="",
+        location_costs=[], equipment_costs=[], talent_requirements=[], post_production_complexity="",
+        total_cost_drivers=[], cost_optimization_suggestions=[]
+    )
+
+async def analyze_costs(
+    raw_data: RawScriptData,
+    payload: Optional[str] = None,
+    statistics: Optional[ScriptStatistics] = None
+) -> CostBreakdown:
+    """
+    Analyze costs based on extracted script data, optionally given a pre-serialized projection of it.
+
+    When the rule-based cost model can price the script (statistics given, or a
+    cost_estimate in the payload) and COST_SUGGESTIONS_ENABLED is off, no model
+    call is made. With statistics the figures come from the cost model; the
+    workflow applies apply_cost_model itself.
+    """
+    if not cost_suggestions_enabled() and (statistics is not None or (payload and "cost_estimate" in json.loads(payload))):
+        breakdown = blank_cost_breakdown()
+    else:
+        result = await get_cost_analysis_agent().run(payload if payload is not None else raw_data.model_dump_json())
+        breakdown = result.output
+    if statistics is None:
+        return breakdown
+    return apply_cost_model(breakdown, statistics)
+
+def apply_cost_model(breakdown: CostBreakdown, statistics: ScriptStatistics) -> CostBreakdown:
+    """Replace every field but the suggestions with the rule-based estimate for the script statistics"""
+    return breakdown.model_copy(update=estimate_costs(statistics).breakdown_fields())
\ No newline at end of file
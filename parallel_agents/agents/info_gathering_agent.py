@@ -271,10 +271,12 @@
 #         print(f"Data extraction error: {e}")
 #         raise
 
-from pydantic_ai import Agent
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, NamedTuple, Optional
 from dataclasses import dataclass
+from collections import Counter
+from functools import lru_cache
+import asyncio
 import sys
 import os
 import re
@@ -282,14 +284,20 @@ from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils import get_model
+from circuit_breaker import circuit_is_open, get_circuit_breakers
+from script_parser import ParsedScript, parse_script
+from executor import PROCESS, get_executor
+from language_detect import LanguageDetection, detect_language
 
-model = get_model()
+if TYPE_CHECKING:
+    from pydantic_ai import Agent, RunContext
 
 # Dependencies/Context
 @dataclass
 class ScriptContext:
     """Simple context for script analysis"""
     analysis_timestamp: datetime = None
+    language: Optional[LanguageDetection] = None    # Detected locally before the model call
     
     def __post_init__(self):
         if self.analysis_timestamp is None:
@@ -307,6 +315,11 @@ class RawScriptData(BaseModel):
     estimated_pages: int = Field(description='Estimated page count')
     scene_count: int = Field(description='Number of scenes detected')
 
+class Extraction(NamedTuple):
+    """Extracted raw data and whether any of it came from the local parser because the model call failed"""
+    raw_data: RawScriptData
+    local_fallback: bool
+
 # Prompt
 system_prompt = """
 You are a script analysis expert. Extract key information from the provided script.
@@ -316,90 +329,301 @@ Extract and return:
 2. Locations (INT./EXT. scene headers)
 3. A few sample dialogue lines
 4. A few sample action lines
-5. Primary language (English/Malay)
+5. Primary language (English, Malay, Indonesian, Tamil or Chinese)
 6. Basic script statistics
 
 Be thorough but concise. Focus on accuracy over completeness.
 """
 
+# Extra instructions for scripts not written in English, picked by the local language detector
+language_prompts = {
+    "Malay": """
+The script is in Malay. Scene headers may use DALAM/LUAR for INT./EXT. and SIANG/MALAM for DAY/NIGHT -
+treat them as INT./EXT. headers. Keep character names, locations and dialogue as written, do not translate.
+""",
+    "Indonesian": """
+The script is in Indonesian. Scene headers may use INT./EKST. and PAGI/SIANG/SORE/MALAM for the time of day -
+treat them as INT./EXT. headers. Keep character names, locations and dialogue as written, do not translate.
+""",
+    "Tamil": """
+The script is in Tamil, in Tamil script or romanized (Tanglish), often mixed with English. Keep dialogue
+samples in the original script and spelling, do not translate. Honorifics (e.g. Anna, Akka, Sir) are
+part of how characters are addressed, not separate characters.
+""",
+    "Chinese": """
+The script is in Chinese, in Han characters or Hanyu Pinyin. Keep dialogue samples as written, do not
+translate. Character names are usually a family name followed by one or two syllables (e.g. LI WEI) -
+keep them together as one character.
+""",
+}
+
+def language_prompt(ctx: "RunContext[ScriptContext]") -> str:
+    """Language-specific instructions for the detected language, empty for English or when unsure"""
+    language = ctx.deps.language if ctx.deps is not None else None
+    if language is None or language.confidence < MIN_LANGUAGE_CONFIDENCE:
+        return ""
+    return language_prompts.get(language.language, "")
+
 # Agent
-info_gathering_agent = Agent(
-    model,
-    output_type=RawScriptData,
-    system_prompt=system_prompt,
-    deps_type=ScriptContext,
-    retries=2
+@lru_cache(maxsize=None)
+def get_info_gathering_agent() -> "Agent":
+    """Build the agent on first use"""
+    from pydantic_ai import Agent
+
+    agent = Agent(
+        get_model(),
+        output_type=RawScriptData,
+        system_prompt=system_prompt,
+        deps_type=ScriptContext,
+        retries=2
+    )
+    agent.system_prompt(language_prompt)
+    return agent
+
+# Chunking configuration
+SINGLE_PASS_MAX_CHARS = 8000    # Scripts up to this size are sent in one call
+MAX_CHUNK_TOKENS = 2000         # Upper bound of estimated tokens per chunk
+CHARS_PER_TOKEN = 4             # Rough character-to-token ratio for estimates
+MAX_CONCURRENT_CHUNKS = 4       # Chunk extractions allowed in flight at once
+MAX_SAMPLE_LINES = 10           # Sample dialogue/action lines kept after merge
+CHARS_PER_PAGE = 1800           # Rough characters per formatted page, for merged chunks without parsed structure
+MIN_LANGUAGE_CONFIDENCE = 0.4   # Share of function-word hits needed to add language instructions
+DETECT_IN_PROCESS_MIN_CHARS = 200_000   # Longer scripts are scanned on the process pool
+
+SCENE_HEADER_PATTERN = re.compile(
+    r'^[ \t]*(?:\d+[ \t.]*)?(?:INT\.|EXT\.|INT/EXT\.|I/E\.)',
+    re.IGNORECASE | re.MULTILINE
 )
 
 # Function (to extract data and pass to state)
-async def extract_script_data(script_content: str) -> RawScriptData:
-    """Extract raw data from script content"""
-    context = ScriptContext()
+async def extract_script_data(script_content: str, parsed_script: Optional[ParsedScript] = None) -> RawScriptData:
+    """
+    Extract raw data from script content
+
+    Args:
+        script_content: Raw script text
+        parsed_script: Output of the deterministic parser, when already available
+
+    Returns:
+        RawScriptData: Structured raw data for analysis agents
+    """
+    return (await run_extraction(script_content, parsed_script)).raw_data
+
+async def run_extraction(script_content: str, parsed_script: Optional[ParsedScript] = None) -> Extraction:
+    """
+    Extract raw data like extract_script_data, also reporting whether the local
+    parser stood in for the model - the circuit was open, or it opened (or the
+    call failed otherwise) during this extraction
+    """
+    # Well-formatted screenplays are fully covered by the parser, so the model
+    # is only asked to extract scripts the parser cannot make sense of
+    if parsed_script is not None and parsed_script.is_structured:
+        return Extraction(raw_data_from_parsed_script(parsed_script, script_content, await detect_script_language(script_content)), False)
+
+    # The provider is failing - extract locally instead of queueing behind its timeouts
+    if extraction_circuit_open():
+        print("🔌 Model circuit open, extracting with the local parser")
+        if parsed_script is not None:
+            return Extraction(raw_data_from_parsed_script(parsed_script, script_content, await detect_script_language(script_content)), True)
+        return Extraction(await get_executor().run(_manual_extract_script_data, script_content), True)
+
+    language = await detect_script_language(script_content)
+    if len(script_content) > SINGLE_PASS_MAX_CHARS:
+        return await _extract_chunks(script_content, MAX_CHUNK_TOKENS, MAX_CONCURRENT_CHUNKS, language)
+
+    context = ScriptContext(language=language)
     
     try:
-        # Limit script content to avoid token limits
-        limited_content = script_content[:8000] if len(script_content) > 8000 else script_content
-        
-        result = await info_gathering_agent.run(limited_content, deps=context)
-        return result.output
+        result = await get_info_gathering_agent().run(script_content, deps=context)
+        return Extraction(result.output, False)
         
     except Exception as e:
         print(f"Pydantic AI extraction failed: {e}")
         # Fallback to manual extraction
-        return _manual_extract_script_data(script_content)
+        return Extraction(await get_executor().run(_manual_extract_script_data, script_content), True)
 
-def _manual_extract_script_data(script_content: str) -> RawScriptData:
-    """Fallback manual extraction using regex"""
-    lines = script_content.split('\n')
-    
-    characters = set()
-    locations = []
-    dialogue_lines = []
-    action_lines = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
+async def detect_script_language(script_content: str) -> LanguageDetection:
+    """Detect the script's language, off the event loop for long scripts"""
+    if len(script_content) >= DETECT_IN_PROCESS_MIN_CHARS:
+        return await get_executor().run(detect_language, script_content)
+    return detect_language(script_content)
+
+def extraction_circuit_open() -> bool:
+    """Whether the extraction model's circuit is open, so extraction runs locally without the network"""
+    return get_circuit_breakers() is not None and circuit_is_open(get_info_gathering_agent().model)
+
+async def extract_script_data_chunked(
+    script_content: str,
+    max_chunk_tokens: int = MAX_CHUNK_TOKENS,
+    max_concurrency: int = MAX_CONCURRENT_CHUNKS,
+    language: Optional[LanguageDetection] = None
+) -> RawScriptData:
+    """
+    Extract raw data from a long script by running the agent over scene chunks
+    concurrently and merging the partial results.
+
+    Args:
+        script_content: Raw script text
+        max_chunk_tokens: Estimated token budget for each chunk
+        max_concurrency: Maximum number of chunk extractions running at once
+        language: Language of the whole script, detected when not given; every
+            chunk gets the same language instructions
+
+    Returns:
+        RawScriptData: Merged data for the whole script
+    """
+    if language is None:
+        language = await detect_script_language(script_content)
+    return (await _extract_chunks(script_content, max_chunk_tokens, max_concurrency, language)).raw_data
+
+async def _extract_chunks(
+    script_content: str,
+    max_chunk_tokens: int,
+    max_concurrency: int,
+    language: LanguageDetection
+) -> Extraction:
+    chunks = split_script_into_chunks(script_content, max_chunk_tokens)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def extract_chunk(chunk: str) -> Extraction:
+        async with semaphore:
+            try:
+                result = await get_info_gathering_agent().run(chunk, deps=ScriptContext(language=language))
+                return Extraction(result.output, False)
+            except Exception as e:
+                print(f"Pydantic AI chunk extraction failed: {e}")
+                # Only this chunk falls back, the others keep the agent output
+                return Extraction(await get_executor().run(_manual_extract_script_data, chunk), True)
+
+    partials = await asyncio.gather(*(extract_chunk(chunk) for chunk in chunks))
+    return Extraction(
+        merge_raw_script_data([partial.raw_data for partial in partials], script_length=len(script_content)),
+        any(partial.local_fallback for partial in partials)
+    )
+
+def split_script_into_chunks(script_content: str, max_chunk_tokens: int = MAX_CHUNK_TOKENS) -> List[str]:
+    """Split a script on INT./EXT. scene headers into chunks bounded by estimated tokens"""
+    max_chars = max_chunk_tokens * CHARS_PER_TOKEN
+
+    # Scene boundaries - text before the first header is kept as its own block
+    starts = [match.start() for match in SCENE_HEADER_PATTERN.finditer(script_content)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    boundaries = starts + [len(script_content)]
+    scenes = [script_content[boundaries[i]:boundaries[i + 1]] for i in range(len(starts))]
+
+    chunks = []
+    current = []
+    current_size = 0
+    for scene in scenes:
+        if not scene.strip():
             continue
-            
-        # Extract locations (scene headers)
-        if re.match(r'^(INT\.|EXT\.)', line, re.IGNORECASE):
-            locations.append(line)
-        
-        # Extract character names (all caps, not scene headers)
-        elif (line.isupper() and 
-              len(line.split()) <= 3 and 
-              not line.startswith(('INT.', 'EXT.', 'FADE', 'CUT', 'DISSOLVE')) and
-              not re.match(r'^[A-Z\s]+(DAY|NIGHT)', line)):
-            
-            clean_name = re.sub(r'\s*\([^)]*\)', '', line).strip()
-            if clean_name and len(clean_name) > 1:
-                characters.add(clean_name)
-        
-        # Collect sample dialogue and action lines
-        elif not line.isupper() and len(dialogue_lines) < 5:
-            if any(char in line.lower() for char in ['said', 'says', '"', "'"]):
-                dialogue_lines.append(line[:100])  # Limit length
-            elif len(action_lines) < 5:
-                action_lines.append(line[:100])
-    
-    # Detect language
-    text_lower = script_content.lower()
-    malay_words = ['yang', 'dan', 'dengan', 'untuk', 'adalah', 'ini', 'itu', 'saya']
-    english_words = ['the', 'and', 'with', 'for', 'is', 'this', 'that', 'you']
-    
-    malay_count = sum(1 for word in malay_words if word in text_lower)
-    english_count = sum(1 for word in english_words if word in text_lower)
-    
-    language = "Malay" if malay_count > english_count else "English"
-    
+
+        # A single scene over the budget is split between lines
+        pieces = _split_on_lines(scene, max_chars) if len(scene) > max_chars else [scene]
+        for piece in pieces:
+            if current and current_size + len(piece) > max_chars:
+                chunks.append(''.join(current))
+                current = []
+                current_size = 0
+            current.append(piece)
+            current_size += len(piece)
+
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+def _split_on_lines(text: str, max_chars: int) -> List[str]:
+    """Split text into pieces of at most max_chars, breaking only between lines"""
+    pieces = []
+    current = []
+    current_size = 0
+    for line in text.splitlines(keepends=True):
+        if current and current_size + len(line) > max_chars:
+            pieces.append(''.join(current))
+            current = []
+            current_size = 0
+        current.append(line)
+        current_size += len(line)
+    if current:
+        pieces.append(''.join(current))
+    return pieces
+
+def merge_raw_script_data(
+    partials: List[RawScriptData],
+    script_length: Optional[int] = None,
+    estimated_pages: Optional[int] = None,
+    scene_count: Optional[int] = None
+) -> RawScriptData:
+    """
+    Merge partial extraction results - dedup characters/locations and sum counts.
+
+    Page estimates are rounded up to at least one page per partial, so they are
+    not summed: pass the whole script's estimated_pages (and scene_count) when
+    known, otherwise pages are estimated from script_length.
+    """
+    characters = _dedup_preserving_order(name for partial in partials for name in partial.characters)
+    locations = _dedup_preserving_order(location for partial in partials for location in partial.locations)
+    dialogue_lines = [line for partial in partials for line in partial.dialogue_lines][:MAX_SAMPLE_LINES]
+    action_lines = [line for partial in partials for line in partial.action_lines][:MAX_SAMPLE_LINES]
+
+    # Language vote weighted by how much text each partial covered
+    language_votes = Counter()
+    for partial in partials:
+        language_votes[partial.language_detected] += max(1, partial.script_length)
+    language = language_votes.most_common(1)[0][0] if language_votes else "English"
+
+    if script_length is None:
+        script_length = sum(partial.script_length for partial in partials)
+    if estimated_pages is None:
+        estimated_pages = round(script_length / CHARS_PER_PAGE)
+    if scene_count is None:
+        scene_count = sum(partial.scene_count for partial in partials)
+
     return RawScriptData(
-        characters=list(characters),
+        characters=characters,
         locations=locations,
         dialogue_lines=dialogue_lines,
         action_lines=action_lines,
         language_detected=language,
+        script_length=script_length,
+        estimated_pages=max(1, estimated_pages),
+        scene_count=scene_count
+    )
+
+def _dedup_preserving_order(values) -> List[str]:
+    """Drop duplicates (ignoring case and spacing) and keep the first spelling"""
+    seen = set()
+    unique = []
+    for value in values:
+        key = ' '.join(value.split()).upper()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(value.strip())
+    return unique
+
+def _manual_extract_script_data(script_content: str) -> RawScriptData:
+    """Fallback manual extraction using the deterministic screenplay parser"""
+    return raw_data_from_parsed_script(parse_script(script_content), script_content, detect_language(script_content))
+
+# CPU-bound, so they run on the process pool instead of blocking the event loop
+get_executor().register(_manual_extract_script_data, PROCESS)
+get_executor().register(detect_language, PROCESS)
+
+def raw_data_from_parsed_script(parsed_script: ParsedScript, script_content: str, language: LanguageDetection) -> RawScriptData:
+    """
+    Build RawScriptData from a parsed script without calling the model. The
+    language is detected by the caller, with detect_script_language() on the
+    event loop, so a long script is not scanned inline here.
+    """
+    return RawScriptData(
+        characters=parsed_script.characters,
+        locations=[scene.heading for scene in parsed_script.scenes],
+        dialogue_lines=parsed_script.dialogue_samples,
+        action_lines=parsed_script.action_samples,
+        language_detected=language.language,
         script_length=len(script_content),
-        estimated_pages=max(1, len(script_content) // 250),
-        scene_count=len(locations)
-    )
\ No newline at end of file
+        estimated_pages=parsed_script.estimated_pages,
+        scene_count=len(parsed_script.scenes)
+    )
+
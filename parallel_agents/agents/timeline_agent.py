@@ -1,14 +1,17 @@
-from pydantic_ai import Agent
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
+from functools import lru_cache
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scheduler import build_shooting_schedule
+from script_stats import ScriptStatistics
 from utils import get_model
 from .info_gathering_agent import RawScriptData
 
-model = get_model()
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
 
 # State/Output type
 class TimelineBreakdown(BaseModel):
@@ -38,17 +41,53 @@ system_prompt="""
     - Critical path dependencies
     - Risk factors and buffer needs
 
+    When script_statistics is given, base shoot days, location order and day/night blocks on its
+    exact page counts and pages per location rather than estimating them from the raw totals.
+
+    When shooting_schedule is given, it summarizes the computed shooting schedule and its days are
+    final. Leave shooting_schedule_estimate, scene_grouping_recommendations and location_shooting_order
+    empty, they are filled in from the schedule. Base cast availability, equipment scheduling,
+    critical path items and buffers on its shoot days and location order.
+
     Provide detailed timeline analysis for production scheduling.
     """
 
 # Agent
-timeline_agent = Agent(
-    model,
-    output_type=TimelineBreakdown,
-    system_prompt=system_prompt
-)
-
-async def analyze_timeline(raw_data: RawScriptData) -> TimelineBreakdown:
-    """Analyze timeline and scheduling based on extracted script data"""
-    result = await timeline_agent.run(raw_data.model_dump_json())
-    return result.output
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_timeline_agent() -> "Agent":
+    """Build the agent on first use"""
+    from pydantic_ai import Agent
+
+    return Agent(
+        get_model(),
+        output_type=TimelineBreakdown,
+        system_prompt=system_prompt
+    )
+
+async def analyze_timeline(
+    raw_data: RawScriptData,
+    payload: Optional[str] = None,
+    statistics: Optional[ScriptStatistics] = None
+) -> TimelineBreakdown:
+    """
+    Analyze timeline and scheduling based on extracted script data, optionally given a pre-serialized projection of it.
+
+    With per-scene statistics the schedule fields come from the scheduling engine
+    rather than the model; the workflow applies apply_schedule itself.
+    """
+    result = await get_timeline_agent().run(payload if payload is not None else raw_data.model_dump_json())
+    if statistics is None:
+        return result.output
+    return apply_schedule(result.output, statistics)
+
+def blank_timeline_breakdown() -> TimelineBreakdown:
+    """A breakdown with every field empty, for the scheduling engine to fill in"""
+    return TimelineBreakdown(
+        shooting_schedule_estimate=[], scene_grouping_recommendations=[], location_shooting_order=[],
+        cast_availability_requirements=[], equipment_scheduling=[], pre_production_timeline=[],
+        post_production_timeline=[], critical_path_items=[], buffer_recommendations=[]
+    )
+
+def apply_schedule(breakdown: TimelineBreakdown, statistics: ScriptStatistics) -> TimelineBreakdown:
+    """Replace the scheduling fields with the shooting schedule computed from the script statistics"""
+    return breakdown.model_copy(update=build_shooting_schedule(statistics).timeline_fields())
\ No newline at end of file
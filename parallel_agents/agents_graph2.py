@@ -1,14 +1,18 @@
-from typing import Optional, Dict, Any, List, Annotated
-from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Annotated, Iterable, AsyncIterator, Tuple
+from pydantic import BaseModel, Field, model_validator
 from dataclasses import dataclass
+from functools import lru_cache
 from langgraph.graph import StateGraph, START, END
 from typing import Literal, Dict, Any
 import asyncio
 from datetime import datetime
-import inspect
+import json
+import time
 
 # Import Agents
 from agents.info_gathering_agent import RawScriptData
+from script_parser import ParsedScript, parse_script
+from script_stats import ScriptStatistics, compute_script_statistics, format_eighths
 from agents.cost_analysis_agent import CostBreakdown
 from agents.props_extraction_agent import PropsBreakdown
 from agents.location_analysis_agent import LocationBreakdown
@@ -17,13 +21,25 @@ from agents.scene_breakdown_agent import SceneBreakdown
 from agents.timeline_agent import TimelineBreakdown
 
 # Import agents result
-from agents.info_gathering_agent import extract_script_data
-from agents.cost_analysis_agent import analyze_costs
-from agents.props_extraction_agent import analyze_props
-from agents.location_analysis_agent import analyze_locations
-from agents.character_analysis_agent import analyze_characters
-from agents.scene_breakdown_agent import analyze_scenes
-from agents.timeline_agent import analyze_timeline
+from agents.info_gathering_agent import run_extraction
+
+# Import analysis registry
+from analysis_registry import ANALYSIS_SPECS, ALL_ANALYSES, AnalysisSpec, build_analysis_inputs, build_derived_inputs, resolve_analyses
+from analysis_cache import get_analysis_cache, make_cache_key
+from tracing import current_span, traced_node
+from hedging import get_hedger
+from circuit_breaker import CircuitOpenError
+from executor import PROCESS, get_executor
+from fusion import FusionGroup, get_fusion_groups
+from context_cache import TTL_MARGIN_SECONDS, CachedContext, context_prompt, get_context_cache, use_context
+from checkpoints import get_checkpointer, latest_run, run_thread_id, thread_config
+from blob_store import BlobRef, pinned, store_text
+
+# Scripts shorter than this parse faster inline than the round trip to a worker process
+PARSE_IN_PROCESS_MIN_CHARS = 50_000
+
+executor = get_executor()
+executor.register(parse_script, PROCESS)
 
 # Custom reducers for handling concurrent updates
 def merge_metadata(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
@@ -63,16 +79,52 @@ def merge_bools(left: bool, right: bool) -> bool:
 # State/Output type
 class ScriptAnalysisState(BaseModel):
     """State for script analysis workflow"""
-    # Input - this should only be set once at the beginning
-    script_content: str = Field(description="Original script content")
+    # Input - this should only be set once at the beginning. Only a handle is kept in the
+    # state, so the checkpoints and serialized copies of it at every step leave the text out
+    script: Optional[BlobRef] = Field(default=None, description="Handle to the original script content in the blob store")
+    script_content: Optional[str] = Field(
+        default=None,
+        description="Script text, accepted as input in place of script; script_parsing stores it and clears this key"
+    )
+    
+    # Analyses to run - names from the analysis registry, defaults to all
+    requested_analyses: List[str] = Field(
+        default_factory=lambda: list(ALL_ANALYSES),
+        description="Analyses requested by the caller"
+    )
     
     # Current workflow state - use Annotated to handle concurrent updates
     current_agent: Annotated[Optional[str], merge_strings] = Field(default=None, description="Currently running agent")
     task_complete: Annotated[bool, merge_bools] = Field(default=False, description="Whether analysis is complete")
     
+    # Phase 0: Deterministic parsing - only set once by script_parsing
+    parsed_script: Optional[ParsedScript] = Field(default=None, description="Scene structure from the screenplay parser")
+    script_statistics: Optional[ScriptStatistics] = Field(
+        default=None,
+        description="Per-scene page eighths, dialogue ratio, cast size and day/night and INT/EXT flags"
+    )
+    
     # Phase 1: Raw data extraction - only set once by info_gathering
     raw_data: Optional[RawScriptData] = Field(default=None, description="Extracted raw script data")
     extraction_complete: bool = Field(default=False, description="Whether extraction is complete")
+    analysis_inputs: Dict[str, str] = Field(default_factory=dict, description="Projected raw data payload per analysis")
+    cached_context: Optional[CachedContext] = Field(
+        default=None,
+        description="Raw data uploaded once for the analysis agents to share, deleted when the run finishes"
+    )
+    
+    # Deadline - set once from ScriptAnalysisDeps.timeout_seconds, nodes only get the remaining budget
+    deadline: Optional[float] = Field(default=None, description="Epoch time the workflow must finish by")
+    timed_out: Annotated[List[str], merge_errors] = Field(
+        default_factory=list,
+        description="Steps cancelled because the deadline passed"
+    )
+    
+    # Circuit breaker - steps that ran without the model provider because its circuit was open
+    degraded: Annotated[List[str], merge_errors] = Field(
+        default_factory=list,
+        description="Steps served locally, or only partly, because the model provider was unavailable"
+    )
     
     # Phase 2: Analysis results - each set by individual nodes
     cost_analysis: Optional[CostBreakdown] = Field(default=None, description="Cost analysis results")
@@ -84,15 +136,8 @@ class ScriptAnalysisState(BaseModel):
     
     # Analysis completion tracking - use custom reducer
     analyses_complete: Annotated[Dict[str, bool], merge_analyses_complete] = Field(
-        default_factory=lambda: {
-            "cost": False,
-            "props": False,
-            "location": False,
-            "character": False,
-            "scene": False,
-            "timeline": False
-        },
-        description="Track completion of each analysis type"
+        default_factory=lambda: {name: False for name in ALL_ANALYSES},
+        description="Track completion of each requested analysis type"
     )
     
     # Metadata - use custom reducer
@@ -106,6 +151,17 @@ class ScriptAnalysisState(BaseModel):
         default_factory=list, 
         description="Any errors encountered"
     )
+    
+    @model_validator(mode="before")
+    @classmethod
+    def store_script_content(cls, data: Any) -> Any:
+        """Accept the script text itself, as script_content (as before handles) or script, and store it"""
+        if isinstance(data, dict) and data.get("script_content") is not None and data.get("script") is None:
+            data = {**data, "script": store_text(data["script_content"]), "script_content": None}
+        elif isinstance(data, dict) and isinstance(data.get("script"), str):
+            # e.g. {"script": "..."} typed into LangGraph Studio
+            data = {**data, "script": store_text(data["script"])}
+        return data
 
 # Dependencies
 @dataclass
@@ -125,43 +181,127 @@ def extract_result(result: Any) -> Any:
     else:
         return result
 
-async def safe_call_agent(agent_func, *args, **kwargs):
-    """Safely call an agent function, ensuring it runs asynchronously"""
+def remaining_budget(state: ScriptAnalysisState) -> Optional[float]:
+    """Seconds left until the workflow deadline, None when there is no deadline"""
+    if state.deadline is None:
+        return None
+    return state.deadline - time.time()
+
+async def call_analysis_agent(spec: AnalysisSpec, raw_data: RawScriptData, payload: str, timeout_seconds: Optional[float] = None):
+    """Call an analysis agent within the time budget, hedging slow calls when HEDGING_ENABLED is set"""
+    hedger = get_hedger()
+    if hedger is None:
+        return extract_result(await executor.run(spec.analyze, raw_data, payload, timeout_seconds=timeout_seconds))
+    hedged_call = hedger.run(spec.name, lambda: executor.run(spec.analyze, raw_data, payload))
+    if timeout_seconds is None:
+        return extract_result(await hedged_call)
+    return extract_result(await asyncio.wait_for(hedged_call, max(0.0, timeout_seconds)))
+
+async def run_cached_analysis(spec: AnalysisSpec, raw_data: RawScriptData, payload: str, timeout_seconds: Optional[float] = None):
+    """Return a cached analysis result when available, otherwise call the agent and store its result"""
+    cache = get_analysis_cache()
+    if cache is None:
+        return await call_analysis_agent(spec, raw_data, payload, timeout_seconds), False
+    
+    # Keyed on the projected payload, so changes to fields the agent ignores still hit
+    key = make_cache_key(payload, spec.system_prompt, spec.output_type, spec.model_name)
+    cached_result = await executor.run(cache.get_model, key, spec.output_type)
+    if cached_result is not None:
+        return cached_result, True
+    
+    result = await call_analysis_agent(spec, raw_data, payload, timeout_seconds)
+    await executor.run(cache.set_model, key, spec.name, result)
+    return result, False
+
+async def create_shared_context(state: ScriptAnalysisState, raw_data: RawScriptData) -> Optional[CachedContext]:
+    """Upload the raw data once for the analysis agents when CONTEXT_CACHE_ENABLED is set and several will run"""
+    context_cache = get_context_cache()
+    if context_cache is None or len(state.requested_analyses) < 2:
+        return None
+    
+    # The context lives as long as the run may, with a margin in case releasing it fails
+    budget = remaining_budget(state)
+    ttl_seconds = budget + TTL_MARGIN_SECONDS if budget is not None else None
+    model = ANALYSIS_SPECS[state.requested_analyses[0]].get_agent().model
+    payload = raw_data.model_dump(mode="json")
+    payload.update(build_derived_inputs(
+        (key for name in state.requested_analyses for key in ANALYSIS_SPECS[name].derived_inputs), state.script_statistics
+    ))
+    return await context_cache.create(json.dumps(payload, ensure_ascii=False), model, ttl_seconds)
+
+# Node functions
+async def run_script_parsing(state: ScriptAnalysisState) -> Dict[str, Any]:
+    """Parse the screenplay structure deterministically before any model call."""
+    print("📝 Phase 0: Parsing screenplay structure...")
+    start_time = datetime.now()
+    
+    # Dict input ({"script_content": "..."} or {"script": "..."}, e.g. from LangGraph Studio)
+    # is not validated, so the text arrives as is - store it once here and keep only the
+    # handle from now on. The text is resolved once; the run's pin keeps it in memory for
+    # info gathering.
+    if state.script_content is not None and state.script is None:
+        script = store_text(state.script_content)
+    else:
+        script = store_text(state.script) if isinstance(state.script, str) else state.script
+    stored = {"script": script, "script_content": None} if script is not state.script or state.script_content is not None else {}
+    
     try:
-        # Check if function is already a coroutine function
-        if inspect.iscoroutinefunction(agent_func):
-            return await agent_func(*args, **kwargs)
+        script_content = script.text()
+        if len(script_content) >= PARSE_IN_PROCESS_MIN_CHARS:
+            # Long scripts are parsed on the process pool so concurrent workflows use all cores
+            parsed_script = await executor.run(parse_script, script_content)
+        else:
+            parsed_script = parse_script(script_content)
+        script_statistics = compute_script_statistics(parsed_script)
+        parsing_time = (datetime.now() - start_time).total_seconds()
         
-        # Check if it's a callable that might return a coroutine
-        elif callable(agent_func):
-            result = agent_func(*args, **kwargs)
-            
-            # If the result is a coroutine, await it
-            if inspect.iscoroutine(result):
-                return await result
-            
-            # If it's not a coroutine, it's a blocking call - run in thread
-            else:
-                # We need to call the function again in the thread
-                return await asyncio.to_thread(agent_func, *args, **kwargs)
+        print(f"✅ Parsing completed in {parsing_time * 1000:.1f} ms")
+        print(f"   - Scenes found: {len(parsed_script.scenes)}")
+        print(f"   - Speaking characters: {len(parsed_script.characters)}")
+        if script_statistics is not None:
+            print(f"   - Pages: {format_eighths(sum(script_statistics.page_eighths))}")
+        
+        return {
+            "current_agent": "script_parsing",
+            **stored,
+            "parsed_script": parsed_script,
+            "script_statistics": script_statistics,
+            "processing_metadata": {
+                "parsing_time_seconds": parsing_time,
+                "parsed_structure_complete": parsed_script.is_structured
+            }
+        }
         
-        else:
-            # Fallback: run in thread
-            return await asyncio.to_thread(agent_func, *args, **kwargs)
-            
     except Exception as e:
-        print(f"Error in safe_call_agent: {str(e)}")
-        raise e
+        error_msg = f"Error in script parsing: {str(e)}"
+        print(f"❌ {error_msg}")
+        
+        # Extraction can still run on the raw text without the parsed structure
+        return {
+            "current_agent": "script_parsing",
+            **stored,
+            "errors": [error_msg]
+        }
 
-# Node functions
 async def run_info_gathering(state: ScriptAnalysisState) -> Dict[str, Any]:
     """Run the info gathering agent to extract raw data."""
     print("🔍 Phase 1: Extracting raw data from script...")
     start_time = datetime.now()
     
+    degraded = False
     try:
-        # Extract raw data using the info gathering agent
-        raw_data = await safe_call_agent(extract_script_data, state.script_content)
+        if state.raw_data is not None and state.extraction_complete:
+            # Raw data supplied by the caller (e.g. incremental re-analysis) is reused as is
+            print("   - Using previously extracted raw data")
+            raw_data = state.raw_data
+        else:
+            # Extract raw data using the info gathering agent, within the remaining time budget.
+            # Degraded when the local parser stood in for the model, including when the
+            # circuit opened during this extraction
+            raw_data, degraded = await executor.run(
+                run_extraction, state.script.text(), state.parsed_script,
+                timeout_seconds=remaining_budget(state)
+            )
         
         extraction_time = (datetime.now() - start_time).total_seconds()
         
@@ -171,305 +311,602 @@ async def run_info_gathering(state: ScriptAnalysisState) -> Dict[str, Any]:
             print(f"   - Locations found: {len(raw_data.locations) if hasattr(raw_data, 'locations') else 0}")
             print(f"   - Language detected: {getattr(raw_data, 'language_detected', 'Unknown')}")
         
+        # Serialize once and project per analysis, so each agent only gets the fields it uses
+        analysis_inputs, projection_report = build_analysis_inputs(
+            raw_data, state.requested_analyses, state.script_statistics
+        )
+        
+        # Long scripts are uploaded once and referenced by every analysis agent instead
+        cached_context = await create_shared_context(state, raw_data)
+        if cached_context is not None:
+            print(f"   - Shared context cached: {cached_context.name} (~{cached_context.token_count} tokens)")
+        
         # Return only the fields this node should update
         return {
             "current_agent": "info_gathering",
+            "degraded": ["info_gathering"] if degraded else [],
             "raw_data": raw_data,
             "extraction_complete": True,
+            "analysis_inputs": analysis_inputs,
+            "cached_context": cached_context,
             "processing_metadata": {
                 "extraction_time_seconds": extraction_time,
-                "extraction_timestamp": datetime.now().isoformat()
+                "extraction_timestamp": datetime.now().isoformat(),
+                "input_projection": projection_report
             }
         }
         
-    except Exception as e:
-        error_msg = f"Error in info gathering: {str(e)}"
-        print(f"❌ {error_msg}")
+    except asyncio.TimeoutError:
+        error_msg = "Info gathering timed out before the workflow deadline"
+        print(f"⏱️ {error_msg}")
         
         return {
             "current_agent": "info_gathering",
             "errors": [error_msg],
+            "timed_out": ["info_gathering"],
             "extraction_complete": False
         }
-
-async def run_cost_analysis(state: ScriptAnalysisState) -> Dict[str, Any]:
-    """Run cost analysis."""
-    print("💰 Running cost analysis...")
-    
-    if not state.raw_data:
-        error_msg = "No raw data available for cost analysis"
-        print(f"❌ {error_msg}")
-        return {
-            "errors": [error_msg]
-        }
-    
-    try:
-        result = await safe_call_agent(analyze_costs, state.raw_data)
-        actual_result = extract_result(result)
-        
-        print("✅ Cost analysis completed")
-        
-        return {
-            "current_agent": "cost_analysis",
-            "cost_analysis": actual_result,
-            "analyses_complete": {"cost": True}
-        }
         
     except Exception as e:
-        error_msg = f"Error in cost analysis: {str(e)}"
+        error_msg = f"Error in info gathering: {str(e)}"
         print(f"❌ {error_msg}")
         
         return {
-            "current_agent": "cost_analysis",
-            "errors": [error_msg]
+            "current_agent": "info_gathering",
+            "errors": [error_msg],
+            "extraction_complete": False
         }
 
-async def run_props_analysis(state: ScriptAnalysisState) -> Dict[str, Any]:
-    """Run props analysis."""
-    print("🎭 Running props analysis...")
-    
-    if not state.raw_data:
-        error_msg = "No raw data available for props analysis"
-        print(f"❌ {error_msg}")
-        return {
-            "errors": [error_msg]
-        }
-    
-    try:
-        result = await safe_call_agent(analyze_props, state.raw_data)
-        actual_result = extract_result(result)
-        
-        print("✅ Props analysis completed")
-        
-        return {
-            "current_agent": "props_analysis",
-            "props_analysis": actual_result,
-            "analyses_complete": {"props": True}
-        }
+def make_analysis_node(spec: AnalysisSpec):
+    """Create the graph node function running one registered analysis."""
+    async def run_analysis(state: ScriptAnalysisState) -> Dict[str, Any]:
+        print(f"{spec.icon} Running {spec.name} analysis...")
+        start_time = datetime.now()
+        
+        timeout_seconds = remaining_budget(state)
+        if timeout_seconds is not None and timeout_seconds <= 0:
+            error_msg = f"{spec.label} analysis skipped, the workflow deadline has passed"
+            print(f"⏱️ {error_msg}")
+            return {
+                "current_agent": f"{spec.name}_analysis",
+                "errors": [error_msg],
+                "timed_out": [spec.name]
+            }
         
-    except Exception as e:
-        error_msg = f"Error in props analysis: {str(e)}"
-        print(f"❌ {error_msg}")
+        if not state.raw_data:
+            error_msg = f"No raw data available for {spec.name} analysis"
+            print(f"❌ {error_msg}")
+            return {
+                "errors": [error_msg]
+            }
         
-        return {
-            "current_agent": "props_analysis",
-            "errors": [error_msg]
-        }
-
-async def run_location_analysis(state: ScriptAnalysisState) -> Dict[str, Any]:
-    """Run location analysis."""
-    print("📍 Running location analysis...")
-    
-    if not state.raw_data:
-        error_msg = "No raw data available for location analysis"
-        print(f"❌ {error_msg}")
-        return {
-            "errors": [error_msg]
-        }
+        try:
+            payload = state.analysis_inputs.get(spec.name)
+            if payload is None:
+                payload = build_analysis_inputs(state.raw_data, [spec.name], state.script_statistics)[0][spec.name]
+            
+            with use_context(state.cached_context, context_prompt(spec.input_fields)):
+                actual_result, cache_hit = await run_cached_analysis(spec, state.raw_data, payload, timeout_seconds)
+            if spec.finalize is not None and state.script_statistics is not None:
+                actual_result = spec.finalize(actual_result, state.script_statistics)
+            analysis_time = (datetime.now() - start_time).total_seconds()
+            
+            span = current_span()
+            if span is not None:
+                span.cache_hit = cache_hit
+            
+            print(f"✅ {spec.label} analysis completed{' (cached)' if cache_hit else ''}")
+            
+            return {
+                "current_agent": f"{spec.name}_analysis",
+                spec.state_field: actual_result,
+                "analyses_complete": {spec.name: True},
+                "processing_metadata": {
+                    f"{spec.name}_cache_hit": cache_hit,
+                    f"{spec.name}_time_seconds": analysis_time
+                }
+            }
+            
+        except asyncio.TimeoutError:
+            error_msg = f"{spec.label} analysis timed out before the workflow deadline"
+            print(f"⏱️ {error_msg}")
+            
+            return {
+                "current_agent": f"{spec.name}_analysis",
+                "errors": [error_msg],
+                "timed_out": [spec.name]
+            }
+            
+        except CircuitOpenError as e:
+            # Fail fast while the provider is down; computed fields are still filled in locally
+            error_msg = f"{spec.label} analysis degraded: {str(e)}"
+            print(f"🔌 {error_msg}")
+            
+            return {
+                "current_agent": f"{spec.name}_analysis",
+                spec.state_field: spec.degraded_result(state.script_statistics),
+                "errors": [error_msg],
+                "degraded": [spec.name]
+            }
+            
+        except Exception as e:
+            error_msg = f"Error in {spec.name} analysis: {str(e)}"
+            print(f"❌ {error_msg}")
+            
+            return {
+                "current_agent": f"{spec.name}_analysis",
+                "errors": [error_msg]
+            }
     
-    try:
-        result = await safe_call_agent(analyze_locations, state.raw_data)
-        actual_result = extract_result(result)
-        
-        print("✅ Location analysis completed")
-        
-        return {
-            "current_agent": "location_analysis",
-            "location_analysis": actual_result,
-            "analyses_complete": {"location": True}
-        }
-        
-    except Exception as e:
-        error_msg = f"Error in location analysis: {str(e)}"
-        print(f"❌ {error_msg}")
-        
-        return {
-            "current_agent": "location_analysis",
-            "errors": [error_msg]
-        }
+    run_analysis.__name__ = f"run_{spec.name}_analysis"
+    run_analysis.__doc__ = f"Run {spec.name} analysis."
+    return run_analysis
 
-async def run_character_analysis(state: ScriptAnalysisState) -> Dict[str, Any]:
-    """Run character analysis."""
-    print("👥 Running character analysis...")
-    
-    if not state.raw_data:
-        error_msg = "No raw data available for character analysis"
-        print(f"❌ {error_msg}")
-        return {
-            "errors": [error_msg]
-        }
-    
-    try:
-        result = await safe_call_agent(analyze_characters, state.raw_data)
-        actual_result = extract_result(result)
-        
-        print("✅ Character analysis completed")
-        
-        return {
-            "current_agent": "character_analysis",
-            "character_analysis": actual_result,
-            "analyses_complete": {"character": True}
-        }
+def make_fused_analysis_node(group: FusionGroup):
+    """Create the graph node function running a fusion group with one agent call."""
+    async def run_fused_analysis(state: ScriptAnalysisState) -> Dict[str, Any]:
+        print(f"{group.icon} Running {group.name} analyses in one call...")
+        start_time = datetime.now()
+        
+        timeout_seconds = remaining_budget(state)
+        if timeout_seconds is not None and timeout_seconds <= 0:
+            error_msg = f"{group.label} analyses skipped, the workflow deadline has passed"
+            print(f"⏱️ {error_msg}")
+            return {
+                "current_agent": f"{group.name}_analysis",
+                "errors": [error_msg],
+                "timed_out": list(group.names)
+            }
         
-    except Exception as e:
-        error_msg = f"Error in character analysis: {str(e)}"
-        print(f"❌ {error_msg}")
+        if not state.raw_data:
+            error_msg = f"No raw data available for {group.name} analyses"
+            print(f"❌ {error_msg}")
+            return {
+                "errors": [error_msg]
+            }
         
-        return {
-            "current_agent": "character_analysis",
-            "errors": [error_msg]
-        }
-
-async def run_scene_analysis(state: ScriptAnalysisState) -> Dict[str, Any]:
-    """Run scene analysis."""
-    print("🎬 Running scene analysis...")
-    
-    if not state.raw_data:
-        error_msg = "No raw data available for scene analysis"
-        print(f"❌ {error_msg}")
-        return {
-            "errors": [error_msg]
-        }
+        try:
+            payload = group.build_payload(state.raw_data, state.script_statistics)
+            with use_context(state.cached_context, context_prompt(group.input_fields)):
+                fused_result, cache_hit = await run_cached_analysis(group, state.raw_data, payload, timeout_seconds)
+            analysis_time = (datetime.now() - start_time).total_seconds()
+            
+            span = current_span()
+            if span is not None:
+                span.cache_hit = cache_hit
+            
+            print(f"✅ {group.label} analyses completed{' (cached)' if cache_hit else ''}")
+            
+            # Split the combined result back into the usual per-analysis fields
+            update = {
+                "current_agent": f"{group.name}_analysis",
+                "analyses_complete": {name: True for name in group.names},
+                "processing_metadata": {}
+            }
+            for name, result in group.split(fused_result, state.script_statistics).items():
+                update[ANALYSIS_SPECS[name].state_field] = result
+                update["processing_metadata"][f"{name}_cache_hit"] = cache_hit
+                update["processing_metadata"][f"{name}_time_seconds"] = analysis_time
+                update["processing_metadata"][f"{name}_fused_with"] = group.name
+            return update
+            
+        except asyncio.TimeoutError:
+            error_msg = f"{group.label} analyses timed out before the workflow deadline"
+            print(f"⏱️ {error_msg}")
+            
+            return {
+                "current_agent": f"{group.name}_analysis",
+                "errors": [error_msg],
+                "timed_out": list(group.names)
+            }
+            
+        except CircuitOpenError as e:
+            error_msg = f"{group.label} analyses degraded: {str(e)}"
+            print(f"🔌 {error_msg}")
+            
+            update = {
+                "current_agent": f"{group.name}_analysis",
+                "errors": [error_msg],
+                "degraded": list(group.names)
+            }
+            for spec in group.specs:
+                update[spec.state_field] = spec.degraded_result(state.script_statistics)
+            return update
+            
+        except Exception as e:
+            error_msg = f"Error in {group.name} analyses: {str(e)}"
+            print(f"❌ {error_msg}")
+            
+            return {
+                "current_agent": f"{group.name}_analysis",
+                "errors": [error_msg]
+            }
     
-    try:
-        result = await safe_call_agent(analyze_scenes, state.raw_data)
-        actual_result = extract_result(result)
-        
-        print("✅ Scene analysis completed")
-        
-        return {
-            "current_agent": "scene_analysis",
-            "scene_analysis": actual_result,
-            "analyses_complete": {"scene": True}
-        }
-        
-    except Exception as e:
-        error_msg = f"Error in scene analysis: {str(e)}"
-        print(f"❌ {error_msg}")
-        
-        return {
-            "current_agent": "scene_analysis",
-            "errors": [error_msg]
-        }
+    run_fused_analysis.__name__ = f"run_{'_'.join(group.names)}_analysis"
+    run_fused_analysis.__doc__ = f"Run {group.name} analyses with one agent call."
+    return run_fused_analysis
+
+async def release_shared_context(state: ScriptAnalysisState) -> Dict[str, Any]:
+    """Delete the run's cached context once every analysis has finished."""
+    context_cache = get_context_cache()
+    if context_cache is not None and state.cached_context is not None:
+        await context_cache.release(state.cached_context)
+    return {"current_agent": "release_context"}
+
+def route_analyses(state: ScriptAnalysisState, fusion_groups: Iterable[FusionGroup] = ()) -> List[str]:
+    """
+    Fan out from info gathering to the requested analysis nodes only, fused where a whole group was requested.
+    Analyses already complete (e.g. when resuming a checkpointed run) are skipped.
+    """
+    pending = [name for name in state.requested_analyses if not state.analyses_complete.get(name)]
+    nodes = []
+    fused = set()
+    for group in fusion_groups:
+        if group.covers(pending):
+            nodes.append(group.node_name)
+            fused.update(group.names)
+    nodes += [
+        ANALYSIS_SPECS[name].node_name for name in pending
+        if name in ANALYSIS_SPECS and name not in fused
+    ]
+    return nodes or [END]
 
-async def run_timeline_analysis(state: ScriptAnalysisState) -> Dict[str, Any]:
-    """Run timeline analysis."""
-    print("⏰ Running timeline analysis...")
+# Define graph
+def create_script_analysis_workflow(fusion_groups: Optional[List[FusionGroup]] = None, checkpointer=None):
+    """
+    Create and return the script analysis workflow.
     
-    if not state.raw_data:
-        error_msg = "No raw data available for timeline analysis"
-        print(f"❌ {error_msg}")
-        return {
-            "errors": [error_msg]
-        }
+    Args:
+        fusion_groups: Analyses served by one agent call each; defaults to ANALYSIS_FUSION
+        checkpointer: LangGraph checkpointer saving every step, so failed runs can be resumed;
+            runs then need a thread_id in their config (see thread_config)
+    """
+    fusion_groups = get_fusion_groups() if fusion_groups is None else fusion_groups
     
-    try:
-        result = await safe_call_agent(analyze_timeline, state.raw_data)
-        actual_result = extract_result(result)
-        
-        print("✅ Timeline analysis completed")
-        
-        return {
-            "current_agent": "timeline_analysis",
-            "timeline_analysis": actual_result,
-            "analyses_complete": {"timeline": True}
-        }
-        
-    except Exception as e:
-        error_msg = f"Error in timeline analysis: {str(e)}"
-        print(f"❌ {error_msg}")
-        
-        return {
-            "current_agent": "timeline_analysis",
-            "errors": [error_msg]
-        }
-# Define graph
-def create_script_analysis_workflow():
-    """Create and return the script analysis workflow."""
     # Create the graph
     workflow = StateGraph(ScriptAnalysisState)
     
-    # Add nodes to the graph - using unique names to avoid conflicts
-    workflow.add_node("info_gathering", run_info_gathering)
-    workflow.add_node("cost_node", run_cost_analysis)
-    workflow.add_node("props_node", run_props_analysis)
-    workflow.add_node("location_node", run_location_analysis)
-    workflow.add_node("character_node", run_character_analysis)
-    workflow.add_node("scene_node", run_scene_analysis)
-    workflow.add_node("timeline_node", run_timeline_analysis)
-    
-    # Add edges - info_gathering runs first, then all analyses run in parallel
-    workflow.add_edge(START, "info_gathering")
-    workflow.add_edge("info_gathering", "cost_node")
-    workflow.add_edge("info_gathering", "props_node")
-    workflow.add_edge("info_gathering", "location_node")
-    workflow.add_edge("info_gathering", "character_node")
-    workflow.add_edge("info_gathering", "scene_node")
-    workflow.add_edge("info_gathering", "timeline_node")
-    workflow.add_edge("cost_node", END)
-    workflow.add_edge("props_node", END)
-    workflow.add_edge("location_node", END)
-    workflow.add_edge("character_node", END)
-    workflow.add_edge("scene_node", END)
-    workflow.add_edge("timeline_node", END)
+    # Add nodes to the graph - one node per registered analysis and fusion group, each recorded as a trace span
+    workflow.add_node("script_parsing", traced_node("script_parsing", "script_parsing", run_script_parsing))
+    workflow.add_node("info_gathering", traced_node("info_gathering", "info_gathering", run_info_gathering))
+    for spec in ANALYSIS_SPECS.values():
+        workflow.add_node(spec.node_name, traced_node(spec.node_name, spec.name, make_analysis_node(spec)))
+    for group in fusion_groups:
+        workflow.add_node(group.node_name, traced_node(group.node_name, group.name, make_fused_analysis_node(group)))
+    
+    # Add edges - parsing and info_gathering run first, then the requested analyses run in parallel
+    analysis_nodes = [spec.node_name for spec in ANALYSIS_SPECS.values()] + [group.node_name for group in fusion_groups]
+    workflow.add_edge(START, "script_parsing")
+    workflow.add_edge("script_parsing", "info_gathering")
+    workflow.add_conditional_edges(
+        "info_gathering",
+        lambda state: route_analyses(state, fusion_groups),
+        analysis_nodes + [END]
+    )
+    if get_context_cache() is not None:
+        # Runs once, after all the parallel analyses, so the shared context can be deleted
+        workflow.add_node("release_context", release_shared_context)
+        for node in analysis_nodes:
+            workflow.add_edge(node, "release_context")
+        workflow.add_edge("release_context", END)
+    else:
+        for node in analysis_nodes:
+            workflow.add_edge(node, END)
     
     # Compile the graph
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+# Fusion groups selected for this deployment
+FUSION_GROUPS = get_fusion_groups()
 
 # Create the compiled graph for LangGraph Studio
-analyze_script_workflow = create_script_analysis_workflow()
+analyze_script_workflow = create_script_analysis_workflow(FUSION_GROUPS)
 
+NODE_ANALYSES = {spec.node_name: spec for spec in ANALYSIS_SPECS.values()}
+NODE_FUSION_GROUPS = {group.node_name: group for group in FUSION_GROUPS}
 
-async def run_analyze_script_workflow(script_content: str) -> ScriptAnalysisState:
-    """Run the complete script analysis workflow."""
-    print("🎬 Starting Script Analysis Workflow")
-    print("=" * 50)
-    
-    # Initialize state
-    initial_state = ScriptAnalysisState(
-        script_content=script_content,
+@lru_cache(maxsize=None)
+def _checkpointed_workflow(checkpointer):
+    return create_script_analysis_workflow(FUSION_GROUPS, checkpointer)
+
+def get_checkpointed_workflow():
+    """The workflow compiled with the process-wide checkpointer, or None when CHECKPOINT_ENABLED=0"""
+    checkpointer = get_checkpointer()
+    return _checkpointed_workflow(checkpointer) if checkpointer is not None else None
+
+async def prepare_run(initial_state: ScriptAnalysisState) -> Tuple[Any, ScriptAnalysisState, Optional[Dict[str, Any]]]:
+    """
+    Pick the graph, input state and config for a new run: checkpointed on a
+    thread of its own when checkpointing is enabled, plain otherwise.
+    """
+    workflow = get_checkpointed_workflow()
+    if workflow is None:
+        return analyze_script_workflow, initial_state, None
+    
+    # Every run gets a new thread, so concurrent runs of the same script keep separate
+    # checkpoints. The handle's digest is the script's SHA-256, i.e. checkpoints.script_id(script_content)
+    thread_id = run_thread_id(initial_state.script.digest)
+    initial_state = initial_state.model_copy(update={
+        "processing_metadata": {**initial_state.processing_metadata, "script_id": thread_id}
+    })
+    return workflow, initial_state, thread_config(thread_id)
+
+# Streaming event
+@dataclass
+class WorkflowEvent:
+    """A workflow step that finished, yielded while the other steps keep running"""
+    event: str                                  # "parsing", "extraction", "analysis" or "complete"
+    node: str                                   # Graph node that produced the event
+    elapsed_seconds: float                      # Time since the workflow started
+    analysis: Optional[str] = None              # Analysis name for "analysis" events
+    result: Optional[BaseModel] = None          # Breakdown model, raw data or final state
+    duration_seconds: Optional[float] = None    # Time the node itself took
+    cache_hit: bool = False
+    timed_out: bool = False                     # The node was cancelled by the workflow deadline
+    degraded: bool = False                      # The node ran without the model provider (circuit open)
+    errors: List[str] = None
+    
+    def __post_init__(self):
+        if self.errors is None:
+            self.errors = []
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form of the event"""
+        return {
+            "event": self.event,
+            "node": self.node,
+            "analysis": self.analysis,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "duration_seconds": round(self.duration_seconds, 3) if self.duration_seconds is not None else None,
+            "cache_hit": self.cache_hit,
+            "timed_out": self.timed_out,
+            "degraded": self.degraded,
+            "errors": self.errors,
+            "result": self.result.model_dump(mode="json", exclude={"script"}) if self.result is not None else None
+        }
+
+def build_initial_state(
+    script_content: str,
+    analyses: Optional[Iterable[str]] = None,
+    deps: Optional[ScriptAnalysisDeps] = None
+) -> ScriptAnalysisState:
+    """Create the workflow input state for the requested analyses, with a deadline when deps are given"""
+    requested = resolve_analyses(analyses)
+    
+    # Completion is only tracked for the requested analyses
+    return ScriptAnalysisState(
+        script=store_text(script_content),
+        requested_analyses=requested,
+        analyses_complete={name: False for name in requested},
+        deadline=time.time() + deps.timeout_seconds if deps is not None else None,
         processing_metadata={
             "workflow_start_time": datetime.now().isoformat()
         }
     )
+
+async def stream_analyze_script_workflow(
+    script_content: str,
+    analyses: Optional[Iterable[str]] = None,
+    deps: Optional[ScriptAnalysisDeps] = None
+) -> AsyncIterator[WorkflowEvent]:
+    """
+    Run the workflow and yield each result as soon as its node finishes.
+    
+    Args:
+        script_content: Raw script text
+        analyses: Names of the analyses to run; None runs all
+        deps: Workflow settings; deps.timeout_seconds sets the deadline
+    
+    Yields:
+        WorkflowEvent: One event per finished node, then a final "complete" event with the merged state
+    """
+    workflow, initial_state, config = await prepare_run(build_initial_state(script_content, analyses, deps))
+    start_time = time.perf_counter()
+    final_values = None
+    
+    with pinned(initial_state.script):
+        async for mode, chunk in workflow.astream(initial_state, config, stream_mode=["updates", "values"]):
+            if mode == "values":
+                # Full state after each step - the last one is the final state
+                final_values = chunk
+                continue
+        
+            for node, values in chunk.items():
+                values = values or {}
+                elapsed = time.perf_counter() - start_time
+                metadata = values.get("processing_metadata", {})
+            
+                if node in NODE_ANALYSES or node in NODE_FUSION_GROUPS:
+                    # A fused node reports one event per analysis it ran
+                    specs = [NODE_ANALYSES[node]] if node in NODE_ANALYSES else NODE_FUSION_GROUPS[node].specs
+                    for spec in specs:
+                        yield WorkflowEvent(
+                            event="analysis",
+                            node=node,
+                            analysis=spec.name,
+                            result=values.get(spec.state_field),
+                            duration_seconds=metadata.get(f"{spec.name}_time_seconds"),
+                            cache_hit=metadata.get(f"{spec.name}_cache_hit", False),
+                            timed_out=spec.name in values.get("timed_out", []),
+                            degraded=spec.name in values.get("degraded", []),
+                            elapsed_seconds=elapsed,
+                            errors=values.get("errors", [])
+                        )
+                elif node == "info_gathering":
+                    yield WorkflowEvent(
+                        event="extraction",
+                        node=node,
+                        result=values.get("raw_data"),
+                        duration_seconds=metadata.get("extraction_time_seconds"),
+                        timed_out="info_gathering" in values.get("timed_out", []),
+                        degraded="info_gathering" in values.get("degraded", []),
+                        elapsed_seconds=elapsed,
+                        errors=values.get("errors", [])
+                    )
+                elif node == "script_parsing":
+                    yield WorkflowEvent(
+                        event="parsing",
+                        node=node,
+                        result=values.get("parsed_script"),
+                        duration_seconds=metadata.get("parsing_time_seconds"),
+                        elapsed_seconds=elapsed,
+                        errors=values.get("errors", [])
+                    )
+    
+    final_state = ScriptAnalysisState.model_validate(final_values)
+    yield WorkflowEvent(
+        event="complete",
+        node=END,
+        result=final_state,
+        duration_seconds=time.perf_counter() - start_time,
+        elapsed_seconds=time.perf_counter() - start_time,
+        errors=final_state.errors
+    )
+
+async def run_analyze_script_workflow(
+    script_content: str,
+    analyses: Optional[Iterable[str]] = None,
+    deps: Optional[ScriptAnalysisDeps] = None
+) -> ScriptAnalysisState:
+    """
+    Run the script analysis workflow.
+    
+    Args:
+        script_content: Raw script text
+        analyses: Names of the analyses to run (e.g. {"character", "location"}); None runs all
+        deps: Workflow settings; deps.timeout_seconds sets a deadline after which
+            unfinished steps are cancelled and listed in timed_out
+    
+    Returns:
+        ScriptAnalysisState: Final state with results for the requested analyses
+    """
+    # Initialize state - checkpointed on the script's thread unless CHECKPOINT_ENABLED=0
+    workflow, initial_state, config = await prepare_run(build_initial_state(script_content, analyses, deps))
+    
+    print("🎬 Starting Script Analysis Workflow")
+    print(f"   - Analyses requested: {', '.join(initial_state.requested_analyses) or 'none'}")
+    print("=" * 50)
     
     # Execute the workflow
     try:
-        final_state = await analyze_script_workflow.ainvoke(initial_state)
+        # The compiled graph returns channel values as a dict, rebuild the state model
+        with pinned(initial_state.script):
+            final_state = ScriptAnalysisState.model_validate(await workflow.ainvoke(initial_state, config))
         
         print("\n" + "=" * 50)
         print("🎉 Script Analysis Workflow Completed!")
+        print_workflow_summary(final_state)
+        return final_state
         
-        # Calculate summary statistics
-        successful_analyses = sum(1 for completed in final_state.analyses_complete.values() if completed)
-        failed_analyses = len(final_state.analyses_complete) - successful_analyses
-        
-        # Calculate total time
-        start_time_str = final_state.processing_metadata.get("workflow_start_time")
-        if start_time_str:
-            start_time = datetime.fromisoformat(start_time_str)
-            total_time = (datetime.now() - start_time).total_seconds()
-        else:
-            total_time = final_state.processing_metadata.get("extraction_time_seconds", 0)
-        
-        print(f"📊 Summary:")
-        print(f"   - Total processing time: {total_time:.2f} seconds")
-        print(f"   - Successful analyses: {successful_analyses}")
-        print(f"   - Failed analyses: {failed_analyses}")
-        print(f"   - Extraction completed: {final_state.extraction_complete}")
-        print(f"   - Task completed: {final_state.task_complete}")
-        
-        if final_state.errors:
-            print(f"⚠️  Errors encountered: {len(final_state.errors)}")
-            for error in final_state.errors:
-                print(f"   - {error}")
+    except Exception as e:
+        print(f"❌ Workflow failed: {str(e)}")
+        raise
+
+async def resume_analysis(script_id: str, deps: Optional[ScriptAnalysisDeps] = None) -> ScriptAnalysisState:
+    """
+    Continue a checkpointed run, re-running only what did not finish.
+    
+    Parsing and extraction are reused when they completed, and only the requested
+    analyses whose analyses_complete flag is false are sent to their agents - a run
+    where one analysis failed costs one model call to recover. Nodes that finished
+    in a step the process did not survive are not repeated either.
+    
+    Args:
+        script_id: Thread of the run, recorded as processing_metadata["script_id"]
+            (checkpoints.script_id(script_content) followed by a run id), or the
+            script's checkpoints.script_id alone to resume its latest run
+        deps: Workflow settings; deps.timeout_seconds sets a new deadline
+    
+    Returns:
+        ScriptAnalysisState: Final state, with the earlier run's errors still listed
+    
+    Raises:
+        ValueError: If checkpointing is disabled, the script has no checkpoint, or
+            extraction has to run again and the script text left the blob store
+    """
+    workflow = get_checkpointed_workflow()
+    if workflow is None:
+        raise ValueError("Checkpointing is disabled (CHECKPOINT_ENABLED=0)")
+    if ":" not in script_id:
+        # A bare script hash, e.g. from a process that died before printing its run
+        script_id = await latest_run(workflow.checkpointer, script_id) or script_id
+    config = thread_config(script_id)
+    snapshot = await workflow.aget_state(config)
+    if not snapshot.values:
+        raise ValueError(f"No checkpoint found for run {script_id}")
+    
+    state = ScriptAnalysisState.model_validate(snapshot.values)
+    pending = [name for name in state.requested_analyses if not state.analyses_complete.get(name)]
+    if not state.extraction_complete and not state.script.available():
+        raise ValueError(f"Script text of {script_id} is no longer in the blob store, run the analysis again")
+    print(f"🔁 Resuming script {script_id[:12]}")
+    print(f"   - Extraction completed: {state.extraction_complete}")
+    print(f"   - Analyses to run: {', '.join(pending) or 'none'}")
+    
+    # Continue as if the last completed phase had just finished; the earlier
+    # deadline has passed and its cached context may be gone
+    await workflow.aupdate_state(
+        config,
+        {
+            "deadline": time.time() + deps.timeout_seconds if deps is not None else None,
+            "cached_context": None,
+            "processing_metadata": {"resumed_at": datetime.now().isoformat(), "resumed_analyses": pending}
+        },
+        as_node="info_gathering" if state.extraction_complete else "script_parsing"
+    )
+    
+    try:
+        with pinned(state.script):
+            final_state = ScriptAnalysisState.model_validate(await workflow.ainvoke(None, config))
         
+        print("\n" + "=" * 50)
+        print("🎉 Script Analysis Workflow Resumed and Completed!")
+        print_workflow_summary(final_state)
         return final_state
         
     except Exception as e:
         print(f"❌ Workflow failed: {str(e)}")
         raise
 
+def print_workflow_summary(final_state: ScriptAnalysisState) -> None:
+    """Print timing, completion, projection savings and errors of a finished run"""
+    # Calculate summary statistics
+    successful_analyses = sum(1 for completed in final_state.analyses_complete.values() if completed)
+    failed_analyses = len(final_state.analyses_complete) - successful_analyses
+    
+    # Calculate total time
+    start_time_str = final_state.processing_metadata.get("workflow_start_time")
+    if start_time_str:
+        start_time = datetime.fromisoformat(start_time_str)
+        total_time = (datetime.now() - start_time).total_seconds()
+    else:
+        total_time = final_state.processing_metadata.get("extraction_time_seconds", 0)
+    
+    print(f"📊 Summary:")
+    print(f"   - Total processing time: {total_time:.2f} seconds")
+    print(f"   - Successful analyses: {successful_analyses}")
+    print(f"   - Failed analyses: {failed_analyses}")
+    print(f"   - Extraction completed: {final_state.extraction_complete}")
+    print(f"   - Task completed: {final_state.task_complete}")
+    if final_state.timed_out:
+        print(f"   - Timed out: {', '.join(final_state.timed_out)}")
+    if final_state.degraded:
+        print(f"   - Degraded (model provider unavailable): {', '.join(final_state.degraded)}")
+    
+    projection = final_state.processing_metadata.get("input_projection", {})
+    if projection:
+        saved = sum(report["saved_tokens"] for report in projection.values())
+        full = sum(report["full_tokens"] for report in projection.values())
+        print(f"   - Input tokens saved by projection: ~{saved} of ~{full}")
+    
+    if final_state.errors:
+        print(f"⚠️  Errors encountered: {len(final_state.errors)}")
+        for error in final_state.errors:
+            print(f"   - {error}")
+    
+    if failed_analyses and "script_id" in final_state.processing_metadata:
+        print(f"🔁 Re-run the failed analyses with resume_analysis(\"{final_state.processing_metadata['script_id']}\")")
+
 
 async def main():
     """Main function to demonstrate the workflow."""
@@ -531,23 +968,23 @@ async def main():
     
     if result.character_analysis:
         print(f"\n👥 CHARACTER ANALYSIS:")
-        main_chars = getattr(result.character_analysis, 'main_characters', {})
-        supporting_chars = getattr(result.character_analysis, 'supporting_characters', {})
-        print(f"   Main Characters: {list(main_chars.keys()) if main_chars else 'N/A'}")
-        print(f"   Supporting Characters: {list(supporting_chars.keys()) if supporting_chars else 'N/A'}")
+        main_chars = getattr(result.character_analysis, 'main_characters', [])
+        supporting_chars = getattr(result.character_analysis, 'supporting_characters', [])
+        print(f"   Main Characters: {main_chars if main_chars else 'N/A'}")
+        print(f"   Supporting Characters: {supporting_chars if supporting_chars else 'N/A'}")
     
     if result.location_analysis:
         print(f"\n📍 LOCATION ANALYSIS:")
-        locations_by_type = getattr(result.location_analysis, 'locations_by_type', {})
-        for loc_type, locations in locations_by_type.items():
-            print(f"   {loc_type}: {locations}")
+        locations_by_type = getattr(result.location_analysis, 'locations_by_type', [])
+        for locations in locations_by_type:
+            print(f"   {locations}")
     
     if result.props_analysis:
         print(f"\n🎭 PROPS ANALYSIS:")
-        props_by_category = getattr(result.props_analysis, 'props_by_category', {})
-        for category, props in props_by_category.items():
+        props_by_category = getattr(result.props_analysis, 'props_by_category', [])
+        for props in props_by_category:
             if props:  # Only show non-empty categories
-                print(f"   {category}: {props}")
+                print(f"   {props}")
     
     if result.timeline_analysis:
         print(f"\n⏰ TIMELINE ANALYSIS:")
@@ -0,0 +1,165 @@
+from pydantic import BaseModel
+from typing import Optional, Type
+from dotenv import load_dotenv
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+load_dotenv()
+
+# Cache configuration
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "analysis_cache.sqlite3")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024          # Total size of cached results
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 60 * 60     # Entries older than this are evicted
+EVICTION_INTERVAL = 100                         # Writes between eviction sweeps
+
+def make_cache_key(payload: str, system_prompt: str, output_type: Type[BaseModel], model_name: str) -> str:
+    """
+    Build a content address for an analysis result.
+
+    Args:
+        payload: Serialized input sent to the agent (e.g. RawScriptData JSON)
+        system_prompt: The agent's system prompt
+        output_type: Pydantic model the agent returns
+        model_name: Name of the model serving the agent
+
+    Returns:
+        str: Hex SHA-256 digest identifying the result
+    """
+    schema = json.dumps(output_type.model_json_schema(), sort_keys=True)
+    digest = hashlib.sha256()
+    for part in (payload, system_prompt, schema, model_name):
+        encoded = part.encode("utf-8")
+        # Length prefix keeps the boundaries between parts unambiguous
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+class AnalysisCache:
+    """Persistent SQLite cache of analysis results with size- and age-based eviction"""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                key TEXT PRIMARY KEY,
+                analysis TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_accessed ON analysis_cache (accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached JSON for a key, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.max_age_seconds:
+                self._connection.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE analysis_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, analysis: str, value: str) -> None:
+        """Store the JSON result of an analysis"""
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, analysis, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, analysis, value, len(value.encode("utf-8")), now, now)
+            )
+            self._writes += 1
+            if self._writes % EVICTION_INTERVAL == 1:
+                self._evict(now)
+
+    def get_model(self, key: str, output_type: Type[BaseModel]) -> Optional[BaseModel]:
+        """Return the cached result parsed into its output model"""
+        value = self.get(key)
+        if value is None:
+            return None
+        try:
+            return output_type.model_validate_json(value)
+        except ValueError:
+            # The schema is part of the key, so this only happens on corrupted rows
+            return None
+
+    def set_model(self, key: str, analysis: str, result: BaseModel) -> None:
+        """Store a result model"""
+        self.set(key, analysis, result.model_dump_json())
+
+    def evict(self) -> None:
+        """Drop expired entries, then least recently used ones until under the size limit"""
+        with self._lock:
+            self._evict(time.time())
+
+    def _evict(self, now: float) -> None:
+        self._connection.execute("DELETE FROM analysis_cache WHERE created_at < ?", (now - self.max_age_seconds,))
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM analysis_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        stale_keys = []
+        for key, size in self._connection.execute("SELECT key, size FROM analysis_cache ORDER BY accessed_at"):
+            stale_keys.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._connection.executemany("DELETE FROM analysis_cache WHERE key = ?", stale_keys)
+
+    def clear(self) -> None:
+        """Remove every cached result"""
+        with self._lock:
+            self._connection.execute("DELETE FROM analysis_cache")
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._connection.close()
+
+_analysis_cache: Optional[AnalysisCache] = None
+_analysis_cache_lock = threading.Lock()
+
+def get_analysis_cache() -> Optional[AnalysisCache]:
+    """Return the process-wide analysis cache, or None when disabled via ANALYSIS_CACHE_ENABLED=0"""
+    global _analysis_cache
+    if os.getenv('ANALYSIS_CACHE_ENABLED', '1').lower() in ('0', 'false', 'no'):
+        return None
+
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            _analysis_cache = AnalysisCache(
+                path=os.getenv('ANALYSIS_CACHE_PATH', DEFAULT_CACHE_PATH),
+                max_bytes=int(os.getenv('ANALYSIS_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+                max_age_seconds=float(os.getenv('ANALYSIS_CACHE_MAX_AGE_SECONDS', DEFAULT_MAX_AGE_SECONDS))
+            )
+        return _analysis_cache
@@ -0,0 +1,169 @@
+from pydantic import BaseModel
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+import json
+
+# Import agent modules
+from agents import cost_analysis_agent
+from agents import props_extraction_agent
+from agents import location_analysis_agent
+from agents import character_analysis_agent
+from agents import scene_breakdown_agent
+from agents import timeline_agent
+from agents.info_gathering_agent import CHARS_PER_TOKEN, RawScriptData
+from cost_model import estimate_costs
+from scheduler import build_shooting_schedule
+from script_stats import ScriptStatistics
+
+# Analysis specification
+@dataclass(frozen=True)
+class AnalysisSpec:
+    """Everything the workflow needs to know to run one breakdown analysis"""
+    name: str                       # Key used in requests and analyses_complete
+    label: str                      # Human readable name for logs
+    icon: str                       # Prefix for progress output
+    agent_module: ModuleType        # Module defining the agent, its prompt and model
+    analyze: Callable               # Coroutine function taking RawScriptData and an optional payload
+    get_agent: Callable             # Builds the pydantic-ai Agent on first call and returns it
+    output_type: Type[BaseModel]    # Breakdown model returned by the agent
+    input_fields: Tuple[str, ...]   # RawScriptData fields the agent actually uses
+    derived_inputs: Tuple[str, ...] = ()    # DERIVED_INPUTS computed from the script statistics, also sent
+    finalize: Optional[Callable] = None     # Applied to the output with the script statistics, e.g. to fill computed fields
+    blank: Optional[Callable] = None        # Empty output for finalize to fill when the model cannot be reached
+
+    @property
+    def node_name(self) -> str:
+        """Name of the graph node running this analysis"""
+        return f"{self.name}_node"
+
+    @property
+    def state_field(self) -> str:
+        """ScriptAnalysisState field receiving the result"""
+        return f"{self.name}_analysis"
+
+    @property
+    def system_prompt(self) -> str:
+        return self.agent_module.system_prompt
+
+    def degraded_result(self, statistics: Optional[ScriptStatistics]) -> Optional[BaseModel]:
+        """The part of the output computed locally, for when the model is unavailable; None if there is none"""
+        if self.blank is None or self.finalize is None or statistics is None:
+            return None
+        return self.finalize(self.blank(), statistics)
+
+    @property
+    def model_name(self) -> str:
+        return self.get_agent().model.model_name
+
+# Registry - order is the order results are reported in
+ANALYSIS_SPECS: Dict[str, AnalysisSpec] = {
+    spec.name: spec for spec in (
+        AnalysisSpec("cost", "Cost", "💰", cost_analysis_agent,
+                     cost_analysis_agent.analyze_costs, cost_analysis_agent.get_cost_analysis_agent,
+                     cost_analysis_agent.CostBreakdown,
+                     ("characters", "locations", "scene_count", "estimated_pages"),
+                     derived_inputs=("script_statistics", "cost_estimate"), finalize=cost_analysis_agent.apply_cost_model,
+                     blank=cost_analysis_agent.blank_cost_breakdown),
+        AnalysisSpec("props", "Props", "🎭", props_extraction_agent,
+                     props_extraction_agent.analyze_props, props_extraction_agent.get_props_extraction_agent,
+                     props_extraction_agent.PropsBreakdown,
+                     ("characters", "locations", "action_lines", "dialogue_lines")),
+        AnalysisSpec("location", "Location", "📍", location_analysis_agent,
+                     location_analysis_agent.analyze_locations, location_analysis_agent.get_location_analysis_agent,
+                     location_analysis_agent.LocationBreakdown,
+                     ("locations", "scene_count", "action_lines")),
+        AnalysisSpec("character", "Character", "👥", character_analysis_agent,
+                     character_analysis_agent.analyze_characters, character_analysis_agent.get_character_analysis_agent,
+                     character_analysis_agent.CharacterBreakdown,
+                     ("characters", "dialogue_lines", "action_lines", "language_detected")),
+        AnalysisSpec("scene", "Scene", "🎬", scene_breakdown_agent,
+                     scene_breakdown_agent.analyze_scenes, scene_breakdown_agent.get_scene_breakdown_agent,
+                     scene_breakdown_agent.SceneBreakdown,
+                     ("locations", "scene_count", "estimated_pages", "dialogue_lines", "action_lines")),
+        AnalysisSpec("timeline", "Timeline", "⏰", timeline_agent,
+                     timeline_agent.analyze_timeline, timeline_agent.get_timeline_agent,
+                     timeline_agent.TimelineBreakdown,
+                     ("characters", "locations", "scene_count", "estimated_pages"),
+                     derived_inputs=("script_statistics", "shooting_schedule"), finalize=timeline_agent.apply_schedule,
+                     blank=timeline_agent.blank_timeline_breakdown),
+    )
+}
+
+ALL_ANALYSES = tuple(ANALYSIS_SPECS)
+
+# Payload entries computed from the per-scene statistics rather than extracted by the model, by key
+DERIVED_INPUTS: Dict[str, Callable[[ScriptStatistics], Any]] = {
+    "script_statistics": lambda statistics: statistics.summary(),
+    "shooting_schedule": lambda statistics: build_shooting_schedule(statistics).summary(),
+    "cost_estimate": lambda statistics: estimate_costs(statistics).summary(),
+}
+
+def build_derived_inputs(keys: Iterable[str], statistics: Optional[ScriptStatistics]) -> Dict[str, Any]:
+    """Compute the requested DERIVED_INPUTS once each; none without statistics"""
+    if statistics is None:
+        return {}
+    return {key: DERIVED_INPUTS[key](statistics) for key in dict.fromkeys(keys)}
+
+def resolve_analyses(analyses: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Validate requested analysis names and return them in registry order.
+
+    Args:
+        analyses: Names such as "character" or "location"; None requests all
+
+    Returns:
+        List[str]: Requested names without duplicates
+    """
+    if analyses is None:
+        return list(ALL_ANALYSES)
+
+    if isinstance(analyses, str):
+        analyses = [analyses]
+    requested = set(analyses)
+    unknown = requested - set(ANALYSIS_SPECS)
+    if unknown:
+        raise ValueError(f"Unknown analyses: {sorted(unknown)}. Available: {list(ALL_ANALYSES)}")
+    return [name for name in ALL_ANALYSES if name in requested]
+
+def build_analysis_inputs(
+    raw_data: RawScriptData,
+    analyses: Iterable[str],
+    statistics: Optional[ScriptStatistics] = None
+) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+    """
+    Serialize RawScriptData once and project it down to the fields each analysis uses.
+
+    Args:
+        raw_data: Extracted script data
+        analyses: Names of the analyses that will run
+        statistics: Per-scene statistics; the DERIVED_INPUTS computed from them are
+            added for analyses that use them
+
+    Returns:
+        Tuple of the compact JSON payload per analysis and a report of the
+        estimated token savings per analysis
+    """
+    data = raw_data.model_dump(mode="json")
+    full_chars = len(json.dumps(data, ensure_ascii=False))
+    full_tokens = full_chars // CHARS_PER_TOKEN
+    derived = build_derived_inputs(
+        (key for name in analyses for key in ANALYSIS_SPECS[name].derived_inputs), statistics
+    )
+
+    inputs = {}
+    report = {}
+    for name in analyses:
+        spec = ANALYSIS_SPECS[name]
+        projected = {field: data[field] for field in spec.input_fields}
+        projected.update({key: derived[key] for key in spec.derived_inputs if key in derived})
+        payload = json.dumps(projected, ensure_ascii=False, separators=(",", ":"))
+        projected_tokens = len(payload) // CHARS_PER_TOKEN
+        inputs[name] = payload
+        report[name] = {
+            "full_tokens": full_tokens,
+            "projected_tokens": projected_tokens,
+            "saved_tokens": full_tokens - projected_tokens,
+            "saved_percent": round(100 * (full_tokens - projected_tokens) / full_tokens, 1) if full_tokens else 0.0
+        }
+    return inputs, report
@@ -0,0 +1,229 @@
+from typing import Any, Dict, Iterator, List, Set
+from datetime import datetime
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+from agents_graph2 import ScriptAnalysisState, analyze_script_workflow
+from blob_store import pinned, store_text
+from executor import get_executor
+from utils import close_models
+
+DEFAULT_EXTENSIONS = (".txt", ".fountain")
+DEFAULT_CONCURRENCY = 8
+
+# Helper functions
+def find_scripts(input_dir: str, extensions=DEFAULT_EXTENSIONS, recursive: bool = True) -> Iterator[str]:
+    """Yield script paths under a directory in a stable order"""
+    if recursive:
+        for root, dirs, files in os.walk(input_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(extensions):
+                    yield os.path.join(root, name)
+    else:
+        for name in sorted(os.listdir(input_dir)):
+            path = os.path.join(input_dir, name)
+            if os.path.isfile(path) and name.lower().endswith(extensions):
+                yield path
+
+def script_id_for(path: str, script_content: str) -> str:
+    """Identify a script by path and content, so edited files are analyzed again"""
+    digest = hashlib.sha256(script_content.encode("utf-8")).hexdigest()
+    return f"{os.path.abspath(path)}:{digest}"
+
+def load_progress(progress_path: str) -> Set[str]:
+    """Read the ids of scripts that already completed in a previous run"""
+    completed = set()
+    if not os.path.exists(progress_path):
+        return completed
+    with open(progress_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                completed.add(json.loads(line)["script_id"])
+            except (ValueError, KeyError):
+                # A torn last line from a crash is ignored, that script reruns
+                continue
+    return completed
+
+class JsonlWriter:
+    """Append JSON lines from concurrent tasks, flushed to disk one line at a time"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = asyncio.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    async def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        async with self._lock:
+            # fsync blocks until the disk confirms, so it runs on the thread pool
+            await get_executor().run(self._append, line)
+
+    def _append(self, line: str) -> None:
+        self._file.write(line)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+def failed_steps(state: ScriptAnalysisState) -> List[str]:
+    """Errors of a finished run plus the requested analyses that did not complete"""
+    incomplete = [
+        f"{name} analysis did not complete"
+        for name in state.requested_analyses if not state.analyses_complete.get(name)
+    ]
+    return state.errors + incomplete
+
+# Batch runner
+async def analyze_script_file(path: str, script_content: str, script_id: str) -> Dict[str, Any]:
+    """Run the workflow for one script and build its output record"""
+    start_time = time.perf_counter()
+    initial_state = ScriptAnalysisState(
+        script=store_text(script_content),
+        processing_metadata={
+            "workflow_start_time": datetime.now().isoformat(),
+            "source_path": path
+        }
+    )
+
+    try:
+        with pinned(initial_state.script):
+            final_state = ScriptAnalysisState.model_validate(await analyze_script_workflow.ainvoke(initial_state))
+        # Nodes catch their own exceptions, so a returned state may still hold failed steps
+        failures = failed_steps(final_state)
+        record = {
+            "script_id": script_id,
+            "path": path,
+            "status": "partial" if failures else "ok",
+            "elapsed_seconds": round(time.perf_counter() - start_time, 3),
+            "state": final_state.model_dump(mode="json", exclude={"script"})
+        }
+        if failures:
+            record["error"] = "; ".join(failures)
+        return record
+    except Exception as e:
+        return {
+            "script_id": script_id,
+            "path": path,
+            "status": "error",
+            "elapsed_seconds": round(time.perf_counter() - start_time, 3),
+            "error": str(e)
+        }
+
+async def run_batch(
+    input_dir: str,
+    output_path: str,
+    progress_path: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    extensions=DEFAULT_EXTENSIONS,
+    recursive: bool = True
+) -> Dict[str, int]:
+    """
+    Analyze every script in a directory with bounded concurrency.
+
+    Each finished ScriptAnalysisState is appended to the JSONL output as soon as
+    it completes. Scripts whose every requested analysis completed without
+    errors are recorded in the progress file, so a restarted batch skips them
+    and only reruns failed, partial or unfinished scripts.
+
+    Args:
+        input_dir: Directory containing scripts
+        output_path: JSONL file receiving one record per analyzed script
+        progress_path: JSONL file of completed script ids used for resuming
+        concurrency: Maximum number of workflows running at once
+        extensions: File extensions treated as scripts
+        recursive: Whether to walk subdirectories
+
+    Returns:
+        Dict[str, int]: Counts of succeeded, partial, failed and skipped scripts
+    """
+    concurrency = max(1, concurrency)
+    completed = load_progress(progress_path)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    output = JsonlWriter(output_path)
+    progress = JsonlWriter(progress_path)
+    counts = {"succeeded": 0, "partial": 0, "failed": 0, "skipped": 0}
+
+    async def producer() -> None:
+        for path in find_scripts(input_dir, extensions, recursive):
+            await queue.put(path)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker() -> None:
+        while True:
+            path = await queue.get()
+            if path is None:
+                return
+
+            with open(path, encoding="utf-8", errors="replace") as f:
+                script_content = f.read()
+            script_id = script_id_for(path, script_content)
+            if script_id in completed:
+                counts["skipped"] += 1
+                continue
+
+            record = await analyze_script_file(path, script_content, script_id)
+            await output.write(record)
+            if record["status"] == "ok":
+                await progress.write({"script_id": script_id, "path": path, "completed_at": datetime.now().isoformat()})
+                counts["succeeded"] += 1
+                print(f"✅ {path} ({record['elapsed_seconds']:.1f}s)")
+            elif record["status"] == "partial":
+                counts["partial"] += 1
+                print(f"⚠️  {path}: {record['error']}")
+            else:
+                counts["failed"] += 1
+                print(f"❌ {path}: {record['error']}")
+
+    try:
+        await asyncio.gather(producer(), *(worker() for _ in range(concurrency)))
+    finally:
+        output.close()
+        progress.close()
+        await close_models()
+
+    return counts
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Analyze a directory of scripts and stream results as JSONL")
+    parser.add_argument("input_dir", help="Directory containing scripts")
+    parser.add_argument("-o", "--output", default="analysis_results.jsonl", help="JSONL output file")
+    parser.add_argument("-p", "--progress", default=None, help="Progress file used to resume (default: <output>.progress)")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Workflows running at once")
+    parser.add_argument("-e", "--ext", action="append", default=None, help="Script file extension (repeatable)")
+    parser.add_argument("--no-recursive", action="store_true", help="Do not walk subdirectories")
+    return parser.parse_args(argv)
+
+async def main(argv: List[str] = None):
+    """Command line entry point"""
+    args = parse_args(argv)
+    extensions = tuple(ext if ext.startswith(".") else f".{ext}" for ext in args.ext) if args.ext else DEFAULT_EXTENSIONS
+    progress_path = args.progress or f"{args.output}.progress"
+
+    print(f"🎬 Batch analysis of {args.input_dir} (concurrency {args.concurrency})")
+    start_time = time.perf_counter()
+    counts = await run_batch(
+        args.input_dir,
+        args.output,
+        progress_path,
+        concurrency=args.concurrency,
+        extensions=extensions,
+        recursive=not args.no_recursive
+    )
+    print(f"📊 Done in {time.perf_counter() - start_time:.1f}s - "
+          f"{counts['succeeded']} succeeded, {counts['partial']} partial, {counts['failed']} failed, "
+          f"{counts['skipped']} skipped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
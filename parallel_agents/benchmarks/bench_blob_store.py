@@ -0,0 +1,107 @@
+"""
+Blob store benchmark: memory per workflow with the script in the state vs a handle.
+
+Runs --workflows concurrent workflows on distinct --size character scripts
+against benchmarks/fake_model.py, once with the script text inline in the
+workflow state (BLOB_STORE_ENABLED=0, the state as it was before handles) and
+once with only a blob store handle in it. Each pass is repeated with and
+without checkpoints. Reported per workflow:
+
+  peak KB        - traced memory peak (tracemalloc) / workflows
+  checkpoint KB  - bytes written to the checkpoint database
+  wall s         - wall time of the whole pass
+
+The script texts are built before measuring, so they are not in the peak;
+what is left is what the workflow itself allocates around them.
+
+    python benchmarks/bench_blob_store.py --size 300000 --workflows 10
+"""
+
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import contextlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Cached results would skip the workflow's agents after the first pass
+os.environ["ANALYSIS_CACHE_ENABLED"] = "0"
+os.environ.setdefault("TRACE_EXPORT_PATH", "")
+
+from benchmarks.bench_executor import SCENE
+from benchmarks.fake_model import FakeModel
+from utils import set_model_override
+
+def checkpoint_bytes(path: str) -> int:
+    """Stored size of every checkpoint and write in a SqliteCheckpointSaver database"""
+    with contextlib.closing(sqlite3.connect(path)) as connection:
+        checkpoints = connection.execute("SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints").fetchone()[0]
+        writes = connection.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM checkpoint_writes").fetchone()[0]
+    return checkpoints + writes
+
+async def measure(scripts: List[str], checkpoint_path: Optional[str]) -> Dict[str, Any]:
+    from agents_graph2 import run_analyze_script_workflow
+    from checkpoints import SqliteCheckpointSaver, set_checkpointer
+
+    saver = SqliteCheckpointSaver(checkpoint_path) if checkpoint_path else None
+    set_checkpointer(saver)
+    os.environ["CHECKPOINT_ENABLED"] = "1" if saver is not None else "0"
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        await asyncio.gather(*(run_analyze_script_workflow(script) for script in scripts))
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {"peak_kb": (peak - baseline) / len(scripts) / 1024, "wall_seconds": wall, "checkpoint_kb": 0.0}
+    if saver is not None:
+        saver.close()
+        result["checkpoint_kb"] = checkpoint_bytes(checkpoint_path) / len(scripts) / 1024
+    return result
+
+async def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Compare workflow memory with the script inline in the state and as a blob handle")
+    parser.add_argument("--size", type=int, default=300_000, help="Characters per script")
+    parser.add_argument("--workflows", type=int, default=10, help="Concurrent workflows, each on its own script")
+    parser.add_argument("--latency", default="fixed:0.05", help="Model latency: fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+    args = parser.parse_args(argv)
+
+    fake = FakeModel(latency=args.latency)
+    set_model_override(fake.model)
+
+    base = (SCENE * (args.size // len(SCENE) + 1))[:args.size]
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["BLOB_STORE_PATH"] = os.path.join(directory, "blobs")
+
+        # Warm up imports, agents and the process pool outside the measured passes
+        os.environ["BLOB_STORE_ENABLED"] = "1"
+        await measure([base + "\nWARM UP\n"], None)
+
+        print(f"{args.workflows} workflows x {args.size:,} chars, model latency {fake.latency}")
+        print(f"{'state':<8} {'checkpoints':<12} {'peak KB':>9} {'checkpoint KB':>14} {'wall s':>7}")
+        for checkpointed in (True, False):
+            for mode in ("inline", "handle"):
+                os.environ["BLOB_STORE_ENABLED"] = "1" if mode == "handle" else "0"
+                # Distinct scripts, so the workflows do not share a checkpoint thread or a blob
+                tag = f"{mode}-{checkpointed}"
+                scripts = [f"{base}\nINT. ROOM {tag} {index} - DAY\n" for index in range(args.workflows)]
+                checkpoint_path = os.path.join(directory, f"{tag}.sqlite3") if checkpointed else None
+                fake.reset()
+                result = await measure(scripts, checkpoint_path)
+                print(
+                    f"{mode:<8} {'on' if checkpointed else 'off':<12} {result['peak_kb']:>9.0f} "
+                    f"{result['checkpoint_kb']:>14.0f} {result['wall_seconds']:>7.2f}"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
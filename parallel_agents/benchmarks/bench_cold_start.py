@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark for the script analysis workflow.
+
+Each sample runs in a fresh interpreter and measures:
+
+  import       - `import agents_graph2` (builds and compiles the graph)
+  first_node   - from the start of the import until the first node event of
+                 stream_analyze_script_workflow arrives
+  first_agent  - building one analysis agent on first use (imports pydantic-ai
+                 and resolves the shared model)
+
+It also records whether pydantic-ai was loaded by the import alone, which
+should stay False now that agents are built lazily.
+
+    python benchmarks/bench_cold_start.py --samples 5
+    python benchmarks/bench_cold_start.py --json >> cold_start.jsonl
+"""
+
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_SCRIPT = "INT. OFFICE - DAY\n\nSARAH types.\n\nSARAH\nMorning.\n"
+
+CHILD_CODE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import agents_graph2
+imported = time.perf_counter()
+pydantic_ai_on_import = 'pydantic_ai' in sys.modules
+
+async def first_node():
+    async for event in agents_graph2.stream_analyze_script_workflow(SCRIPT, analyses=[]):
+        return time.perf_counter()
+
+first_event = asyncio.run(first_node())
+
+from analysis_registry import ANALYSIS_SPECS
+agent_start = time.perf_counter()
+ANALYSIS_SPECS['cost'].get_agent()
+agent_built = time.perf_counter()
+
+print(json.dumps({
+    'import': imported - start,
+    'first_node': first_event - start,
+    'first_agent': agent_built - agent_start,
+    'pydantic_ai_on_import': pydantic_ai_on_import,
+}))
+"""
+
+def run_sample() -> Dict[str, float]:
+    """Measure one cold start in a fresh interpreter"""
+    env = dict(os.environ)
+    env.setdefault('GEMINI_KEY', 'benchmark-key')
+    completed = subprocess.run(
+        [sys.executable, "-c", f"SCRIPT = {SAMPLE_SCRIPT!r}\n{CHILD_CODE}"],
+        cwd=PACKAGE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    # The workflow prints progress, the measurements are on the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, object]:
+    """Median and worst time in milliseconds per measurement"""
+    summary = {}
+    for key in ("import", "first_node", "first_agent"):
+        values = [sample[key] * 1000 for sample in samples]
+        summary[f"{key}_median_ms"] = round(statistics.median(values), 1)
+        summary[f"{key}_max_ms"] = round(max(values), 1)
+    summary["pydantic_ai_on_import"] = any(sample["pydantic_ai_on_import"] for sample in samples)
+    summary["samples"] = len(samples)
+    return summary
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Measure import time and time to first node")
+    parser.add_argument("--samples", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--json", action="store_true", help="Print one JSON line instead of a table")
+    args = parser.parse_args(argv)
+
+    # Warm the filesystem and bytecode caches so only interpreter start-up work is measured
+    run_sample()
+    summary = summarize([run_sample() for _ in range(args.samples)])
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+
+    print(f"{'measurement':<14} {'median ms':>10} {'max ms':>10}")
+    for key in ("import", "first_node", "first_agent"):
+        print(f"{key:<14} {summary[f'{key}_median_ms']:>10.1f} {summary[f'{key}_max_ms']:>10.1f}")
+    print(f"pydantic-ai loaded by import: {summary['pydantic_ai_on_import']}")
+
+
+if __name__ == "__main__":
+    main()
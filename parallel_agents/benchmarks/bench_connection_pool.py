@@ -0,0 +1,143 @@
+"""
+Connection reuse benchmark for the shared model client.
+
+Runs workflows shaped like the script analysis graph (one extraction call
+followed by the six-way analysis fan-out) against a local fake Gemini server
+and counts how many TCP connections were opened:
+
+  per_agent - seven GeminiModel instances, each with its own HTTP client
+  default   - one client with httpx's default limits (what pydantic-ai's cached
+              client uses: 20 keep-alive connections, 5s keep-alive expiry)
+  tuned     - the single pooled client from utils.create_http_client()
+
+Locally a new connection only costs a TCP handshake. Against the real API
+each one also costs a TLS handshake, so the connection counts are what matter.
+Use --idle to pause between rounds longer than the default keep-alive expiry.
+
+    python benchmarks/bench_connection_pool.py --workflows 20 --rounds 3 --idle 6
+"""
+
+from typing import Dict, List
+import argparse
+import asyncio
+import httpx
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GEMINI_KEY', 'benchmark-key')
+
+from pydantic_ai import Agent
+from pydantic_ai.models.gemini import GeminiModel
+from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+from agents.info_gathering_agent import RawScriptData
+from analysis_registry import ANALYSIS_SPECS
+from benchmarks.fake_gemini import FakeGeminiServer, RedirectTransport
+from utils import create_http_client, get_pool_settings
+
+AGENT_NAMES = ["info_gathering"] + list(ANALYSIS_SPECS)
+
+def build_agents(models: Dict[str, GeminiModel]) -> Dict[str, Agent]:
+    """Build one agent per workflow step with the same prompts and outputs as the real agents"""
+    agents = {"info_gathering": Agent(models["info_gathering"], output_type=RawScriptData)}
+    for name, spec in ANALYSIS_SPECS.items():
+        agents[name] = Agent(models[name], output_type=spec.output_type, system_prompt=spec.system_prompt)
+    return agents
+
+def per_agent_models(port: int) -> Dict[str, GeminiModel]:
+    """Every agent with its own provider and client"""
+    models = {}
+    for name in AGENT_NAMES:
+        client = create_http_client(transport=RedirectTransport(port))
+        models[name] = GeminiModel("fake-gemini", provider=GoogleGLAProvider(api_key="benchmark-key", http_client=client))
+    return models
+
+def default_models(port: int) -> Dict[str, GeminiModel]:
+    """One client with httpx's default pool limits shared by every agent"""
+    provider = GoogleGLAProvider(api_key="benchmark-key", http_client=create_http_client(transport=RedirectTransport(port)))
+    model = GeminiModel("fake-gemini", provider=provider)
+    return {name: model for name in AGENT_NAMES}
+
+def tuned_models(port: int) -> Dict[str, GeminiModel]:
+    """Registry layout - one client with the tuned pool from get_pool_settings()"""
+    settings = get_pool_settings()
+    transport = RedirectTransport(
+        port,
+        http2=settings['http2'],
+        limits=httpx.Limits(
+            max_connections=settings['max_connections'],
+            max_keepalive_connections=settings['max_keepalive_connections'],
+            keepalive_expiry=settings['keepalive_expiry']
+        )
+    )
+    provider = GoogleGLAProvider(api_key="benchmark-key", http_client=create_http_client(transport=transport))
+    model = GeminiModel("fake-gemini", provider=provider)
+    return {name: model for name in AGENT_NAMES}
+
+async def run_workflow(agents: Dict[str, Agent]) -> float:
+    """One extraction call followed by the six-way fan-out, returns wall time"""
+    start = time.perf_counter()
+    raw_data = (await agents["info_gathering"].run("INT. ROOM - DAY")).output
+    payload = raw_data.model_dump_json()
+    await asyncio.gather(*(agents[name].run(payload) for name in ANALYSIS_SPECS))
+    return time.perf_counter() - start
+
+MODES = {
+    "per_agent": per_agent_models,
+    "default": default_models,
+    "tuned": tuned_models,
+}
+
+async def run_mode(mode: str, server: FakeGeminiServer, workflows: int, rounds: int, idle: float) -> Dict[str, float]:
+    models = MODES[mode](server.port)
+    agents = build_agents(models)
+    server.reset_counters()
+
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for round_number in range(rounds):
+        if round_number and idle:
+            await asyncio.sleep(idle)
+        latencies.extend(await asyncio.gather(*(run_workflow(agents) for _ in range(workflows))))
+    wall = time.perf_counter() - start - idle * (rounds - 1)
+
+    for client in {id(model.client): model.client for model in models.values()}.values():
+        await client.aclose()
+
+    return {
+        "connections": server.connections_opened,
+        "requests": server.requests_served,
+        "requests_per_connection": server.requests_served / max(1, server.connections_opened),
+        "workflow_p50_ms": statistics.median(latencies) * 1000,
+        "workflow_max_ms": max(latencies) * 1000,
+        "busy_seconds": wall,
+    }
+
+async def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Measure connection reuse across the analysis fan-out")
+    parser.add_argument("--workflows", type=int, default=20, help="Concurrent workflows per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Sequential rounds")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake model latency in seconds")
+    parser.add_argument("--idle", type=float, default=0.0, help="Pause between rounds in seconds")
+    args = parser.parse_args(argv)
+
+    server = await FakeGeminiServer(latency_seconds=args.latency).start()
+    try:
+        print(f"Pool settings: {get_pool_settings()}")
+        print(f"{'mode':<12} {'conns':>6} {'reqs':>6} {'reqs/conn':>10} {'p50 ms':>8} {'max ms':>8} {'busy s':>7}")
+        for mode in MODES:
+            result = await run_mode(mode, server, args.workflows, args.rounds, args.idle)
+            print(
+                f"{mode:<12} {result['connections']:>6} {result['requests']:>6} "
+                f"{result['requests_per_connection']:>10.1f} {result['workflow_p50_ms']:>8.1f} "
+                f"{result['workflow_max_ms']:>8.1f} {result['busy_seconds']:>7.2f}"
+            )
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
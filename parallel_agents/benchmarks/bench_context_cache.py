@@ -0,0 +1,102 @@
+"""
+Context caching benchmark: prompt tokens per workflow with and without a shared cached context.
+
+Runs the real workflow with GeminiModel against benchmarks/fake_gemini.py, which
+implements the cachedContents endpoints and counts the prompt characters it
+processes. For each mode it reports, per workflow:
+
+  fresh tokens   - prompt tokens processed at the full rate (including the
+                   one-off upload of the cached context)
+  cached tokens  - prompt tokens read from the cached context instead
+  billed tokens  - fresh + cached * --cached-price, the cost in full-rate tokens
+
+    python benchmarks/bench_context_cache.py --scenes 400 --workflows 5
+"""
+
+from typing import Any, Dict, List
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Caching must be on before the graph is built; result caching would hide the model calls
+os.environ["CONTEXT_CACHE_ENABLED"] = "1"
+os.environ["ANALYSIS_CACHE_ENABLED"] = "0"
+os.environ.setdefault("TRACE_EXPORT_PATH", "")
+
+from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+from benchmarks.fake_gemini import FakeGeminiServer, RedirectTransport
+from context_cache import create_context_cached_model, get_context_cache
+from utils import create_http_client, set_model_override
+
+CHARS_PER_TOKEN = 4
+
+def build_script(scenes: int) -> str:
+    """A long screenplay with a distinct location per scene, so the raw data grows with it"""
+    return "".join(
+        f"{'INT.' if i % 2 else 'EXT.'} LOCATION NUMBER {i} - {'DAY' if i % 3 else 'NIGHT'}\n\n"
+        f"SARAH crosses the room and picks up the phone.\n\n"
+        f"{'MIKE' if i % 2 else 'SARAH'}\nWe are running out of time.\n\n"
+        for i in range(scenes)
+    )
+
+async def measure(server: FakeGeminiServer, script: str, workflows: int) -> Dict[str, Any]:
+    from agents_graph2 import run_analyze_script_workflow
+
+    server.reset_counters()
+    durations: List[float] = []
+    for _ in range(workflows):
+        start = time.perf_counter()
+        await run_analyze_script_workflow(script)
+        durations.append(time.perf_counter() - start)
+    return {
+        "requests": server.requests_served / workflows,
+        "fresh_tokens": server.prompt_chars // CHARS_PER_TOKEN // workflows,
+        "cached_tokens": server.cached_prompt_chars // CHARS_PER_TOKEN // workflows,
+        "latency_ms": statistics.median(durations) * 1000,
+    }
+
+async def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Compare prompt tokens with and without context caching")
+    parser.add_argument("--scenes", type=int, default=400, help="Scenes in the generated script")
+    parser.add_argument("--workflows", type=int, default=5, help="Workflows per mode")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server latency in seconds")
+    parser.add_argument("--cached-price", type=float, default=0.25, help="Price of a cached token relative to a fresh one")
+    args = parser.parse_args(argv)
+
+    server = await FakeGeminiServer(latency_seconds=args.latency).start()
+    provider = GoogleGLAProvider(api_key="benchmark-key", http_client=create_http_client(transport=RedirectTransport(server.port)))
+    set_model_override(create_context_cached_model("fake-gemini", provider))
+
+    script = build_script(args.scenes)
+    context_cache = get_context_cache()
+    min_tokens = context_cache.min_tokens
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # A threshold no payload reaches turns caching off without rebuilding the graph
+        context_cache.min_tokens = sys.maxsize
+        results["separate"] = await measure(server, script, args.workflows)
+        context_cache.min_tokens = min_tokens
+        results["cached"] = await measure(server, script, args.workflows)
+    await provider.client.aclose()
+    await server.stop()
+
+    print(f"{len(script):,} chars, {args.scenes} scenes, {args.workflows} workflows per mode")
+    print(f"{'mode':<10} {'requests':>9} {'fresh tok':>10} {'cached tok':>11} {'billed tok':>11} {'p50 ms':>8}")
+    for mode, result in results.items():
+        billed = result["fresh_tokens"] + result["cached_tokens"] * args.cached_price
+        print(
+            f"{mode:<10} {result['requests']:>9.1f} {result['fresh_tokens']:>10,} {result['cached_tokens']:>11,} "
+            f"{billed:>11,.0f} {result['latency_ms']:>8.1f}"
+        )
+    print(f"context cache: {context_cache.stats()}, left on server: {len(server.cached_contents)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Executor benchmark: parsing long scripts on the event loop vs the process pool.
+
+Parses --workflows copies of a long screenplay concurrently and reports the
+wall time and the worst event-loop stall seen by a heartbeat task. Inline
+parsing blocks every other workflow on the loop while it runs. The process
+pool keeps the loop free and spreads the work across cores.
+
+    python benchmarks/bench_executor.py --workflows 16 --scenes 400
+"""
+
+from typing import Callable, Dict, List
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executor import PROCESS, AgentExecutor
+from script_parser import parse_script
+
+SCENE = """INT. OFFICE - DAY
+
+SARAH sits at her desk, scrolling through emails.
+
+SARAH
+(muttering)
+Another meeting.
+
+MIKE enters with two coffees.
+
+MIKE
+You look like you need this.
+
+CUT TO:
+
+"""
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Return the longest gap between ticks, i.e. the worst event-loop stall"""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        worst = max(worst, now - last - interval)
+        last = now
+    return worst
+
+async def measure(parse: Callable, script: str, workflows: int) -> Dict[str, float]:
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(parse(script) for _ in range(workflows)))
+    wall = time.perf_counter() - start
+    stop.set()
+    return {"wall_seconds": wall, "max_loop_stall_ms": await monitor * 1000}
+
+async def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Compare inline and process pool parsing")
+    parser.add_argument("--workflows", type=int, default=16, help="Scripts parsed concurrently")
+    parser.add_argument("--scenes", type=int, default=400, help="Scenes per script")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Process pool size")
+    args = parser.parse_args(argv)
+
+    script = SCENE * args.scenes
+    executor = AgentExecutor(max_processes=args.processes)
+    executor.register(parse_script, PROCESS)
+
+    async def inline(text: str):
+        return parse_script(text)
+
+    async def pooled(text: str):
+        return await executor.run(parse_script, text)
+
+    # Start the worker processes before measuring
+    await asyncio.gather(*(pooled(SCENE) for _ in range(args.processes)))
+
+    print(f"{len(script):,} chars x {args.workflows} workflows, {args.processes} worker processes")
+    print(f"{'mode':<10} {'wall s':>8} {'max loop stall ms':>18}")
+    for mode, parse in (("inline", inline), ("process", pooled)):
+        result = await measure(parse, script, args.workflows)
+        print(f"{mode:<10} {result['wall_seconds']:>8.2f} {result['max_loop_stall_ms']:>18.1f}")
+    print(f"process pool: {executor.stats()['process']}")
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
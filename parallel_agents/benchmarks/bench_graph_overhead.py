@@ -0,0 +1,319 @@
+"""
+Graph overhead benchmark: throughput, state-merge cost and memory per workflow.
+
+Every agent runs against benchmarks/fake_model.py instead of Gemini, so the
+numbers only move when the workflow code does. Measured:
+
+  overhead     - one workflow at a time with a zero-latency model: everything
+                 the graph, agents and pydantic-ai add on top of the model
+  state_merge  - the same graph replaying recorded node updates, i.e. the cost
+                 of LangGraph channels, our reducers and state validation alone
+  concurrency  - N workflows at once with the configured model latency:
+                 throughput, workflow latency percentiles and traced memory
+                 per workflow (tracemalloc peak / N, in a separate pass)
+  fusion       - model calls, estimated tokens and latency per workflow with
+                 each --fusion group served by one agent call, against the
+                 same workflows run with separate agents
+
+Each run appends one JSON line keyed by the git commit to --results and
+prints the change since the last run recorded for another commit.
+
+    python benchmarks/bench_graph_overhead.py --concurrency 1 10 100 --latency lognormal:0.8:0.4
+"""
+
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PACKAGE_DIR)
+
+# Cached results would turn every run after the first into a lookup
+os.environ["ANALYSIS_CACHE_ENABLED"] = "0"
+os.environ.setdefault("TRACE_EXPORT_PATH", "")
+
+from langgraph.graph import StateGraph, START, END
+
+from analysis_registry import ANALYSIS_SPECS
+from benchmarks.fake_model import FakeModel, LatencyDistribution
+from fusion import FusionGroup, parse_fusion_groups
+from utils import set_model_override
+
+DEFAULT_RESULTS_PATH = os.path.join(PACKAGE_DIR, ".cache", "graph_overhead.jsonl")
+
+SAMPLE_SCRIPT = """INT. COFFEE SHOP - DAY
+
+SARAH, 25, sits at a corner table with her laptop.
+
+SARAH
+(into phone)
+I can't do this anymore, Mom.
+
+The BARISTA approaches with a steaming cup.
+
+BARISTA
+One large coffee, extra shot.
+
+EXT. CITY STREET - NIGHT
+
+MIKE, 30, walks briskly down the sidewalk. A BLACK SUV pulls up beside him.
+
+MIKE
+I have to go.
+"""
+
+def git_commit() -> Dict[str, Any]:
+    """Short commit hash of the tree being measured, and whether it has local changes"""
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=PACKAGE_DIR, capture_output=True, text=True).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "--short", "HEAD") or "unknown",
+                "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except OSError:
+        return {"commit": "unknown", "dirty": False}
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """p50/p95/mean of durations in milliseconds"""
+    ordered = sorted(durations)
+    return {
+        "p50": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+async def timed(run) -> float:
+    start = time.perf_counter()
+    await run()
+    return time.perf_counter() - start
+
+def build_replay_graph(updates: Dict[str, Dict[str, Any]]):
+    """The workflow's graph with every node replaced by its recorded update"""
+    from agents_graph2 import ScriptAnalysisState, route_analyses
+
+    def replay(update: Dict[str, Any]):
+        async def node(state: ScriptAnalysisState) -> Dict[str, Any]:
+            return update
+        return node
+
+    workflow = StateGraph(ScriptAnalysisState)
+    workflow.add_node("script_parsing", replay(updates["script_parsing"]))
+    workflow.add_node("info_gathering", replay(updates["info_gathering"]))
+    for spec in ANALYSIS_SPECS.values():
+        workflow.add_node(spec.node_name, replay(updates.get(spec.node_name, {})))
+    workflow.add_edge(START, "script_parsing")
+    workflow.add_edge("script_parsing", "info_gathering")
+    workflow.add_conditional_edges(
+        "info_gathering",
+        route_analyses,
+        [spec.node_name for spec in ANALYSIS_SPECS.values()] + [END]
+    )
+    for spec in ANALYSIS_SPECS.values():
+        workflow.add_edge(spec.node_name, END)
+    return workflow.compile()
+
+async def measure_overhead(fake: FakeModel, script: str, repeat: int) -> Dict[str, Any]:
+    """Workflow time with a zero-latency model, plus the replayed graph alone"""
+    from agents_graph2 import ScriptAnalysisState, analyze_script_workflow, build_initial_state
+
+    latency = fake.latency
+    fake.latency = LatencyDistribution("fixed", 0.0)
+    latencies, fake.latencies = fake.latencies, {}
+    try:
+        updates: Dict[str, Dict[str, Any]] = {}
+        async for chunk in analyze_script_workflow.astream(build_initial_state(script), stream_mode="updates"):
+            updates.update({node: values or {} for node, values in chunk.items()})
+
+        workflow = [
+            await timed(lambda: analyze_script_workflow.ainvoke(build_initial_state(script)))
+            for _ in range(repeat)
+        ]
+    finally:
+        fake.latency, fake.latencies = latency, latencies
+
+    replay_graph = build_replay_graph(updates)
+    replay, validate = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        values = await replay_graph.ainvoke(build_initial_state(script))
+        replayed = time.perf_counter()
+        ScriptAnalysisState.model_validate(values)
+        replay.append(replayed - start)
+        validate.append(time.perf_counter() - replayed)
+
+    return {
+        "overhead_ms": summarize(workflow),
+        "state_merge_ms": summarize(replay),
+        "final_validate_ms": summarize(validate),
+    }
+
+async def run_concurrent(script: str, concurrency: int, graph=None) -> List[float]:
+    from agents_graph2 import analyze_script_workflow, build_initial_state
+
+    graph = graph or analyze_script_workflow
+    return await asyncio.gather(*(
+        timed(lambda: graph.ainvoke(build_initial_state(script)))
+        for _ in range(concurrency)
+    ))
+
+async def measure_concurrency(fake: FakeModel, script: str, concurrency: int) -> Dict[str, Any]:
+    """Throughput and latency of N concurrent workflows, then their traced memory"""
+    fake.reset()
+    start = time.perf_counter()
+    durations = await run_concurrent(script, concurrency)
+    wall = time.perf_counter() - start
+    model_seconds = fake.model_seconds
+
+    # tracemalloc slows allocation down, so memory gets its own pass
+    fake.reset()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    await run_concurrent(script, concurrency)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_seconds": round(wall, 4),
+        "workflows_per_second": round(concurrency / wall, 3),
+        "latency_ms": summarize(durations),
+        "model_seconds_per_workflow": round(model_seconds / concurrency, 4),
+        "memory_per_workflow_kb": round((peak - baseline) / concurrency / 1024, 1),
+    }
+
+async def measure_fusion(fake: FakeModel, script: str, groups: List[FusionGroup], concurrency: int) -> Dict[str, Any]:
+    """Model calls, estimated tokens and latency per workflow, separate agents vs fused groups"""
+    from agents_graph2 import create_script_analysis_workflow
+
+    result = {"groups": ",".join(group.name for group in groups), "concurrency": concurrency}
+    for mode, fusion_groups in (("separate", []), ("fused", groups)):
+        graph = create_script_analysis_workflow(fusion_groups)
+        fake.reset()
+        durations = await run_concurrent(script, concurrency, graph)
+        result[mode] = {
+            "model_calls_per_workflow": round(fake.calls / concurrency, 2),
+            "input_tokens_per_workflow": fake.input_tokens // concurrency,
+            "output_tokens_per_workflow": fake.output_tokens // concurrency,
+            "latency_ms": summarize(durations),
+        }
+    return result
+
+def load_previous(path: str, commit: str) -> Optional[Dict[str, Any]]:
+    """Most recent recorded run for a different commit"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("commit") != commit:
+                previous = record
+    return previous
+
+def print_comparison(record: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> None:
+    def change(new: float, old: Optional[float]) -> str:
+        if not old:
+            return ""
+        return f" ({(new - old) / old * 100:+.1f}% vs {previous['commit']})"
+
+    def get(source: Optional[Dict[str, Any]], *keys: str) -> Optional[float]:
+        for key in keys:
+            if not isinstance(source, dict):
+                return None
+            source = source.get(key)
+        return source
+
+    print(f"commit {record['commit']}{' (dirty)' if record['dirty'] else ''}, model latency {record['latency']}")
+    for key in ("overhead_ms", "state_merge_ms", "final_validate_ms"):
+        new = record[key]["p50"]
+        print(f"{key:<20} p50 {new:>9.2f} ms{change(new, get(previous, key, 'p50'))}")
+
+    print(f"{'concurrency':>11} {'wf/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'KB/wf':>9}")
+    for level, result in record["concurrency"].items():
+        print(
+            f"{level:>11} {result['workflows_per_second']:>9.2f} {result['latency_ms']['p50']:>9.1f} "
+            f"{result['latency_ms']['p95']:>9.1f} {result['memory_per_workflow_kb']:>9.1f}"
+            f"{change(result['workflows_per_second'], get(previous, 'concurrency', level, 'workflows_per_second'))}"
+        )
+
+    fusion = record.get("fusion")
+    if fusion:
+        print(f"fusion {fusion['groups']} at concurrency {fusion['concurrency']}")
+        print(f"{'mode':>11} {'calls':>9} {'in tok':>9} {'out tok':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        for mode in ("separate", "fused"):
+            result = fusion[mode]
+            print(
+                f"{mode:>11} {result['model_calls_per_workflow']:>9.1f} {result['input_tokens_per_workflow']:>9} "
+                f"{result['output_tokens_per_workflow']:>9} {result['latency_ms']['p50']:>9.1f} {result['latency_ms']['p95']:>9.1f}"
+            )
+
+async def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Measure workflow throughput, state-merge overhead and memory")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100], help="Concurrent workflows per level")
+    parser.add_argument("--latency", default="lognormal:0.8:0.4", help="Model latency: fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--agent-latency", action="append", default=[], metavar="TYPE=LATENCY",
+                        help="Latency for one output type, e.g. TimelineBreakdown=fixed:3")
+    parser.add_argument("--repeat", type=int, default=20, help="Sequential workflows for the overhead measurements")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the latency samples")
+    parser.add_argument("--fusion", default=os.getenv("ANALYSIS_FUSION") or "props+location,cost+timeline",
+                        help="Fusion groups to compare against separate agents; empty skips the comparison")
+    parser.add_argument("--fusion-concurrency", type=int, default=10, help="Concurrent workflows for the fusion comparison")
+    parser.add_argument("--script", help="Script file to analyze instead of the built-in sample")
+    parser.add_argument("--results", default=DEFAULT_RESULTS_PATH, help="JSONL file the run is appended to")
+    args = parser.parse_args(argv)
+
+    script = SAMPLE_SCRIPT
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = f.read()
+
+    # The override must be in place before any agent is built
+    fake = FakeModel(
+        latency=args.latency,
+        latencies=dict(item.split("=", 1) for item in args.agent_latency),
+        seed=args.seed
+    )
+    set_model_override(fake.model)
+
+    # The workflow prints progress for every node, which would drown the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        overhead = await measure_overhead(fake, script, args.repeat)
+        concurrency = {}
+        for level in args.concurrency:
+            concurrency[str(level)] = await measure_concurrency(fake, script, level)
+        fusion_groups = parse_fusion_groups(args.fusion)
+        fusion = await measure_fusion(fake, script, fusion_groups, args.fusion_concurrency) if fusion_groups else None
+
+    record = {
+        **git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "latency": str(fake.latency),
+        "script_chars": len(script),
+        **overhead,
+        "concurrency": concurrency,
+        "fusion": fusion,
+    }
+
+    previous = load_previous(args.results, record["commit"])
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    with open(args.results, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print_comparison(record, previous)
+    print(f"appended to {args.results}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""
+Language detection benchmark: the stop-word detector on 1 MB scripts.
+
+Builds a --size script per language from a short scene and reports the time
+and throughput of language_detect.detect_language next to the substring scan
+it replaced, and the language each of them picks. The substring scan only
+knew English and Malay and matched words inside other words ("ini" in
+"dinner"), so its answer is shown for comparison, not as a reference.
+
+    python benchmarks/bench_language_detect.py --size 1000000 --repeat 5
+"""
+
+from typing import Callable, Dict, List
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language_detect import detect_language
+
+SCENES = {
+    "English": """INT. OFFICE - DAY
+
+SARAH sits at her desk, scrolling through emails.
+
+SARAH
+I told you, the meeting is at ten. Are you coming with me or not?
+
+MIKE enters with two coffees.
+
+MIKE
+You look like you need this. What did they say about the budget?
+
+""",
+    "Malay": """DALAM. PEJABAT - SIANG
+
+AISYAH duduk di meja, membaca e-mel.
+
+AISYAH
+Saya dah cakap, mesyuarat itu pukul sepuluh. Awak nak pergi dengan saya atau tak?
+
+HAFIZ masuk dengan dua cawan kopi.
+
+HAFIZ
+Awak nampak penat lah. Apa yang mereka kata tentang bajet itu?
+
+""",
+    "Indonesian": """INT. KANTOR - PAGI
+
+SARI duduk di meja, membaca email.
+
+SARI
+Saya sudah bilang, rapatnya jam sepuluh. Kamu mau pergi sama saya atau nggak?
+
+BUDI masuk membawa dua gelas kopi.
+
+BUDI
+Kamu kelihatan capek banget. Mereka bilang apa sih soal anggaran itu?
+
+""",
+    "Tamil": """INT. OFFICE - DAY
+
+PRIYA sits at her desk, scrolling through emails.
+
+PRIYA
+Naan sonnen illa, meeting pathu mani ku. Neenga ennoda vareengala illa?
+
+KARTHIK enters with two coffees.
+
+KARTHIK
+Romba tired aa irukku. Budget pathi avanga enna sonnanga?
+
+""",
+    "Chinese": """INT. BANGONGSHI - BAITIAN
+
+LI WEI zuo zai zhuozi qian, kan youjian.
+
+LI WEI
+Wo gen ni shuo guo le, hui shi shi dian kai. Ni gen wo yiqi qu ma?
+
+ZHANG MING na zhe liang bei kafei jin lai.
+
+ZHANG MING
+Ni kan qilai hen lei. Tamen dui yusuan shuo le shenme?
+
+""",
+}
+
+def substring_detect(script_content: str) -> str:
+    """The substring scan detect_language replaced"""
+    text_lower = script_content.lower()
+    malay_words = ['yang', 'dan', 'dengan', 'untuk', 'adalah', 'ini', 'itu', 'saya']
+    english_words = ['the', 'and', 'with', 'for', 'is', 'this', 'that', 'you']
+
+    malay_count = sum(1 for word in malay_words if word in text_lower)
+    english_count = sum(1 for word in english_words if word in text_lower)
+
+    return "Malay" if malay_count > english_count else "English"
+
+def measure(detect: Callable[[str], object], script: str, repeat: int) -> Dict[str, object]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = detect(script)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {"ms": best * 1000, "mb_per_second": len(script) / best / 1e6, "result": result}
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Time language detection on large scripts")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Characters per script")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per script, the fastest is reported")
+    args = parser.parse_args(argv)
+
+    print(f"{args.size:,} chars per script, best of {args.repeat}")
+    print(f"{'script':<11} {'detector':<10} {'ms':>8} {'MB/s':>7} {'language':<11} {'confidence':>10}")
+    for language, scene in SCENES.items():
+        script = (scene * (args.size // len(scene) + 1))[:args.size]
+        stop_words = measure(detect_language, script, args.repeat)
+        substring = measure(substring_detect, script, args.repeat)
+        detection = stop_words["result"]
+        print(
+            f"{language:<11} {'stop-word':<10} {stop_words['ms']:>8.1f} {stop_words['mb_per_second']:>7.1f} "
+            f"{detection.language:<11} {detection.confidence:>10.2f}"
+        )
+        print(
+            f"{'':<11} {'substring':<10} {substring['ms']:>8.1f} {substring['mb_per_second']:>7.1f} "
+            f"{substring['result']:<11} {'-':>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Rate limiter benchmark: how long requests queue for quota at each concurrency.
+
+Runs --concurrency workflows at once against benchmarks/fake_model.py with
+the rate limiter set to --rpm and --tpm, and reports throughput, workflow
+latency, the quota wait of each model request and the request and token
+rates actually reached. The concurrency at which waits start to dominate
+workflow latency is where the quota, not the model, becomes the limit.
+
+    python benchmarks/bench_rate_limiter.py --rpm 600 --tpm 1000000 --concurrency 1 10 30
+"""
+
+from typing import Any, Dict, List
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Cached results would skip the model, and the limiter with it
+os.environ["ANALYSIS_CACHE_ENABLED"] = "0"
+os.environ.setdefault("TRACE_EXPORT_PATH", "")
+os.environ["RATE_LIMIT_ENABLED"] = "1"
+
+from benchmarks.bench_graph_overhead import SAMPLE_SCRIPT, run_concurrent, summarize
+from benchmarks.fake_model import FakeModel
+from utils import set_model_override
+
+async def measure(limiter, fake: FakeModel, script: str, concurrency: int) -> Dict[str, Any]:
+    limiter.reset()
+    fake.reset()
+    start = time.perf_counter()
+    durations = await run_concurrent(script, concurrency)
+    wall = time.perf_counter() - start
+    stats = limiter.stats()
+    return {
+        "workflows_per_second": concurrency / wall,
+        "latency_ms": summarize(durations),
+        "wait_ms": {key: stats[f"wait_{key}_seconds"] * 1000 for key in ("p50", "p95", "p99")},
+        "delayed_share": stats["delayed"] / stats["requests"] if stats["requests"] else 0.0,
+        "requests_per_minute": stats["requests"] / wall * 60,
+        "tokens_per_minute": stats["estimated_tokens"] / wall * 60,
+    }
+
+async def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Measure rate limit waits against a request and token quota")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 30], help="Concurrent workflows per level")
+    parser.add_argument("--rpm", type=float, default=600, help="Requests per minute quota")
+    parser.add_argument("--tpm", type=float, default=1_000_000, help="Tokens per minute quota")
+    parser.add_argument("--burst-seconds", type=float, default=5, help="Seconds of quota that may be spent at once")
+    parser.add_argument("--latency", default="lognormal:0.8:0.4", help="Model latency: fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--script", help="Script file to analyze instead of the built-in sample")
+    args = parser.parse_args(argv)
+
+    os.environ["RATE_LIMIT_RPM"] = str(args.rpm)
+    os.environ["RATE_LIMIT_TPM"] = str(args.tpm)
+    os.environ["RATE_LIMIT_BURST_SECONDS"] = str(args.burst_seconds)
+    from rate_limiter import get_rate_limiter
+
+    script = SAMPLE_SCRIPT
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = f.read()
+
+    # The override must be in place before any agent is built
+    fake = FakeModel(latency=args.latency)
+    set_model_override(fake.model)
+    limiter = get_rate_limiter()
+
+    print(f"quota {args.rpm:g} requests/min, {args.tpm:g} tokens/min, {args.burst_seconds:g}s burst, model latency {fake.latency}")
+    print(f"{'concurrency':>11} {'wf/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'wait p50':>9} {'wait p95':>9} "
+          f"{'wait p99':>9} {'delayed':>8} {'req/min':>8} {'tok/min':>10}")
+    for level in args.concurrency:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = await measure(limiter, fake, script, level)
+        print(
+            f"{level:>11} {result['workflows_per_second']:>7.2f} {result['latency_ms']['p50']:>9.1f} "
+            f"{result['latency_ms']['p95']:>9.1f} {result['wait_ms']['p50']:>9.1f} {result['wait_ms']['p95']:>9.1f} "
+            f"{result['wait_ms']['p99']:>9.1f} {result['delayed_share']:>8.0%} {result['requests_per_minute']:>8.0f} "
+            f"{result['tokens_per_minute']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,158 @@
+"""
+Local stand-in for the Gemini generateContent and cachedContents endpoints,
+used by benchmarks.
+
+It answers every request with a function call whose arguments are generated
+from the declared output tool schema (or JSON text for a responseSchema), so
+real pydantic-ai agents and GeminiModel instances can run against it over
+real TCP connections. Cached contents are kept in memory and counted, so
+prompt sizes with and without context caching can be compared.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import json
+import random
+
+import httpx
+
+def sample_from_schema(schema: Dict[str, Any], defs: Optional[Dict[str, Any]] = None) -> Any:
+    """Build a minimal value that validates against a (Gemini-flavoured) JSON schema"""
+    defs = schema.get("$defs", defs) or {}
+    if "$ref" in schema:
+        return sample_from_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {name: sample_from_schema(prop, defs) for name, prop in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        return [sample_from_schema(schema.get("items", {"type": "string"}), defs)]
+    if schema_type == "integer":
+        return 1
+    if schema_type == "number":
+        return 1.0
+    if schema_type == "boolean":
+        return True
+    return "sample"
+
+class FakeGeminiServer:
+    """Minimal HTTP/1.1 keep-alive server that counts the connections it accepts"""
+
+    def __init__(self, latency_seconds: float = 0.05, jitter_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.connections_opened = 0
+        self.requests_served = 0
+        self.prompt_chars = 0           # Prompt characters processed fresh by generateContent
+        self.cached_prompt_chars = 0    # Prompt characters read from cached contents instead
+        self.cached_contents: Dict[str, int] = {}
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "FakeGeminiServer":
+        self._server = await asyncio.start_server(self._handle_connection, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def reset_counters(self) -> None:
+        self.connections_opened = 0
+        self.requests_served = 0
+        self.prompt_chars = 0
+        self.cached_prompt_chars = 0
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections_opened += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = self._route(method, path.split("?", 1)[0], json.loads(body or b"{}"))
+                response = json.dumps(payload).encode("utf-8")
+
+                await asyncio.sleep(max(0.0, self.latency_seconds + random.uniform(-1, 1) * self.jitter_seconds))
+                self.requests_served += 1
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\nContent-Type: application/json\r\n".encode("latin-1")
+                    + f"Content-Length: {len(response)}\r\n\r\n".encode("latin-1")
+                    + response
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    def _route(self, method: str, path: str, request: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if path.endswith("/cachedContents") and method == "POST":
+            name = f"cachedContents/{len(self.cached_contents) + 1}"
+            chars = len(json.dumps(request.get("contents", []))) + len(json.dumps(request.get("systemInstruction", {})))
+            self.cached_contents[name] = chars
+            # Creating a cache processes its contents once
+            self.prompt_chars += chars
+            return 200, {"name": name, "model": request.get("model"), "usageMetadata": {"totalTokenCount": chars // 4}}
+        if "/cachedContents/" in path:
+            name = "cachedContents/" + path.rsplit("/", 1)[-1]
+            if self.cached_contents.pop(name, None) is None:
+                return 404, {"error": {"code": 404, "message": f"{name} not found"}}
+            return 200, {}
+        if request.get("cachedContent") and request["cachedContent"] not in self.cached_contents:
+            return 404, {"error": {"code": 404, "message": f"{request['cachedContent']} not found"}}
+        return 200, self._respond(request)
+
+    def _respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        tools = request.get("tools") or {}
+        declarations = tools.get("functionDeclarations") or tools.get("function_declarations") or []
+        response_schema = (request.get("generationConfig") or {}).get("responseSchema")
+        if declarations:
+            declaration = declarations[0]
+            part = {"functionCall": {"name": declaration["name"], "args": sample_from_schema(declaration.get("parameters", {}))}}
+        elif response_schema:
+            part = {"text": json.dumps(sample_from_schema(response_schema))}
+        else:
+            part = {"text": "sample"}
+
+        prompt_chars = len(json.dumps(request.get("contents", [])))
+        self.prompt_chars += (
+            prompt_chars + len(json.dumps(request.get("systemInstruction", {}))) + len(json.dumps(tools))
+            + len(json.dumps(response_schema or {}))
+        )
+        self.cached_prompt_chars += self.cached_contents.get(request.get("cachedContent"), 0)
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [part]}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": prompt_chars // 4,
+                "candidatesTokenCount": 50,
+                "totalTokenCount": prompt_chars // 4 + 50
+            },
+            "modelVersion": "fake-gemini"
+        }
+
+class RedirectTransport(httpx.AsyncBaseTransport):
+    """Send every request to the local fake server while keeping a real connection pool"""
+
+    def __init__(self, port: int, **transport_kwargs):
+        self.port = port
+        self._transport = httpx.AsyncHTTPTransport(**transport_kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(scheme="http", host="127.0.0.1", port=self.port)
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,107 @@
+"""
+Deterministic in-process stand-in for the Gemini model, used by benchmarks.
+
+A pydantic-ai FunctionModel that answers every request with a call to the
+agent's output tool, with arguments generated from the tool schema, so each
+agent gets a valid CostBreakdown, PropsBreakdown, RawScriptData, ... back.
+Responses are delayed by a seeded latency distribution, optionally per
+output type. Calls and estimated tokens (characters / CHARS_PER_TOKEN, like
+the input projection report) are counted so runs can be compared on cost:
+
+    model = FakeModel(latency="lognormal:0.8:0.4", latencies={"CostBreakdown": "fixed:2"})
+    set_model_override(model.model)
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import asyncio
+import json
+import math
+import random
+
+from pydantic_ai.messages import ModelMessage, ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from agents.info_gathering_agent import CHARS_PER_TOKEN
+from benchmarks.fake_gemini import sample_from_schema
+
+DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """
+    Model latency in seconds.
+
+    fixed:SECONDS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA
+    """
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        return self.a
+
+    def __str__(self) -> str:
+        if self.kind == "fixed":
+            return f"fixed:{self.a:g}"
+        return f"{self.kind}:{self.a:g}:{self.b:g}"
+
+def parse_latency(value: str) -> LatencyDistribution:
+    """Parse "fixed:0.5", "uniform:0.2:1.5" or "lognormal:0.8:0.4" (a bare number means fixed)"""
+    kind, *params = value.strip().split(":")
+    try:
+        if not params:
+            return LatencyDistribution("fixed", float(kind))
+        numbers = [float(param) for param in params]
+    except ValueError:
+        raise ValueError(f"Invalid latency '{value}'") from None
+    if kind not in DISTRIBUTIONS or len(numbers) != (1 if kind == "fixed" else 2):
+        raise ValueError(f"Invalid latency '{value}', expected fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+    return LatencyDistribution(kind, *numbers)
+
+class FakeModel:
+    """Schema-valid responses after a seeded, configurable delay"""
+
+    def __init__(self, latency: str = "fixed:0", latencies: Optional[Dict[str, str]] = None, seed: int = 0):
+        """
+        Args:
+            latency: Default latency distribution
+            latencies: Distributions per output type name (e.g. {"TimelineBreakdown": "fixed:3"})
+            seed: Seed for the latency samples, so runs are repeatable
+        """
+        self.latency = parse_latency(latency)
+        self.latencies = {name: parse_latency(spec) for name, spec in (latencies or {}).items()}
+        self.seed = seed
+        self.reset()
+        self.model = FunctionModel(self._respond, model_name="fake-gemini")
+
+    def reset(self) -> None:
+        """Restart the latency sequence and zero the counters"""
+        self.rng = random.Random(self.seed)
+        self.calls = 0
+        self.model_seconds = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    async def _respond(self, messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        output_tool = info.output_tools[0] if info.output_tools else None
+        output_type = output_tool.parameters_json_schema.get("title", "") if output_tool else ""
+        delay = self.latencies.get(output_type, self.latency).sample(self.rng)
+        self.calls += 1
+        self.model_seconds += delay
+        # The prompt, the payload and the output tool declaration are all sent with every request
+        prompt_chars = sum(len(str(getattr(part, "content", ""))) for message in messages for part in message.parts)
+        schema_chars = len(json.dumps(output_tool.parameters_json_schema)) if output_tool else 0
+        self.input_tokens += (prompt_chars + schema_chars) // CHARS_PER_TOKEN
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if output_tool is None:
+            return ModelResponse(parts=[TextPart("sample")])
+        args = sample_from_schema(output_tool.parameters_json_schema)
+        self.output_tokens += len(json.dumps(args)) // CHARS_PER_TOKEN
+        return ModelResponse(parts=[ToolCallPart(output_tool.name, args)])
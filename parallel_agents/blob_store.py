@@ -0,0 +1,304 @@
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Iterator, Optional, Set
+from dotenv import load_dotenv
+import asyncio
+import hashlib
+import mmap
+import os
+import sys
+import threading
+import time
+
+from executor import get_executor
+
+load_dotenv()
+
+# Blob store configuration
+DEFAULT_BLOB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "blobs")
+DEFAULT_MIN_CHARS = 16_384                  # Shorter texts are carried inline in their handle
+DEFAULT_MEMORY_MAX_BYTES = 64 * 1024 * 1024 # Memory tier size; older unpinned blobs are dropped past it
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60  # Blob files not stored again for this long are deleted
+
+class BlobNotFoundError(Exception):
+    """Raised when a handle's text is neither in memory nor in the file tier"""
+
+    def __init__(self, digest: str):
+        super().__init__(f"blob {digest[:12]} is no longer in the blob store")
+        self.digest = digest
+
+# State/Output
+class BlobRef(BaseModel):
+    """
+    Handle to a text in the blob store, small enough to copy with the workflow state.
+
+    Texts below the store's min_chars (or all texts, with the store disabled)
+    are carried inline. The digest is also the script_id in checkpoint thread ids.
+    """
+    digest: str = Field(description='Hex SHA-256 of the UTF-8 text, its key in the store')
+    length: int = Field(description='Length of the text in characters')
+    inline: Optional[str] = Field(default=None, description='The text itself when it is not kept in the store')
+
+    def text(self) -> str:
+        """Resolve the handle; large texts are read from memory or mapped from their file"""
+        if self.inline is not None:
+            return self.inline
+        store = get_blob_store()
+        if store is None:
+            raise BlobNotFoundError(self.digest)
+        return store.get(self.digest)
+
+    def available(self) -> bool:
+        """Whether text() can resolve the handle"""
+        if self.inline is not None:
+            return True
+        store = get_blob_store()
+        return store is not None and store.contains(self.digest)
+
+class BlobStore:
+    """
+    Content-addressed store for large texts, in memory with an optional file tier.
+
+    Every text is kept once however many workflows hold its handle. The memory
+    tier keeps recently used blobs up to memory_max_bytes; blobs pinned by a
+    running workflow are never dropped from it. With a path, blobs are also
+    written to one file each and read back through mmap once they have left
+    memory, e.g. to resume a checkpointed run after a restart. Stored from an
+    event loop, the file is written on the executor's thread pool, and the blob
+    stays in memory until it is.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_BLOB_PATH,
+        min_chars: int = DEFAULT_MIN_CHARS,
+        memory_max_bytes: int = DEFAULT_MEMORY_MAX_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS
+    ):
+        self.path = path
+        self.min_chars = min_chars
+        self.memory_max_bytes = memory_max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._pins: Counter = Counter()
+        self._writing: Set[str] = set()
+        self._write_tasks: Set[asyncio.Task] = set()
+        self._counters = {"stored": 0, "deduplicated": 0, "memory_hits": 0, "file_reads": 0, "misses": 0}
+
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def _file(self, digest: str) -> str:
+        return os.path.join(self.path, digest[:2], digest)
+
+    def _remember(self, digest: str, text: str) -> None:
+        # Caller holds the lock
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return
+        self._memory[digest] = text
+        self._memory_bytes += sys.getsizeof(text)
+        for old in list(self._memory):
+            if self._memory_bytes <= self.memory_max_bytes:
+                break
+            # Pinned blobs may be the only copy and blobs being written are not on disk yet;
+            # the others are on disk or no longer needed
+            if old != digest and not self._pins[old] and old not in self._writing:
+                self._memory_bytes -= sys.getsizeof(self._memory.pop(old))
+
+    def put(self, text: str) -> BlobRef:
+        """Store a text and return its handle; short texts are not stored but inlined"""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if len(text) < self.min_chars:
+            return BlobRef(digest=digest, length=len(text), inline=text)
+
+        with self._lock:
+            self._counters["deduplicated" if digest in self._memory else "stored"] += 1
+            # A write already under way also covers this put
+            write = bool(self.path) and digest not in self._writing
+            if write:
+                self._writing.add(digest)
+            self._remember(digest, text)
+        if write:
+            self._schedule_write(digest, data)
+        return BlobRef(digest=digest, length=len(text))
+
+    def _schedule_write(self, digest: str, data: bytes) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to keep responsive
+            try:
+                self._write(digest, data)
+            finally:
+                self._written(digest)
+            return
+        task = loop.create_task(get_executor().run(self._write, digest, data))
+        self._write_tasks.add(task)
+        task.add_done_callback(lambda _: self._written(digest))
+        task.add_done_callback(self._write_tasks.discard)
+
+    def _write(self, digest: str, data: bytes) -> None:
+        file_path = self._file(digest)
+        try:
+            if os.path.exists(file_path):
+                # Storing it again keeps it from expiring
+                os.utime(file_path)
+            else:
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, file_path)
+        except OSError as e:
+            print(f"⚠️  Blob {digest[:12]} kept in memory only: {e}")
+
+    def _written(self, digest: str) -> None:
+        with self._lock:
+            self._writing.discard(digest)
+
+    async def flush(self) -> None:
+        """Wait for the blob files still being written from this event loop"""
+        loop = asyncio.get_running_loop()
+        tasks = [task for task in list(self._write_tasks) if task.get_loop() is loop]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get(self, digest: str) -> str:
+        """Text of a blob, from memory or mapped from its file"""
+        with self._lock:
+            text = self._memory.get(digest)
+            if text is not None:
+                self._memory.move_to_end(digest)
+                self._counters["memory_hits"] += 1
+                return text
+
+        file_path = self._file(digest) if self.path else None
+        if file_path is None or not os.path.exists(file_path):
+            with self._lock:
+                self._counters["misses"] += 1
+            raise BlobNotFoundError(digest)
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                text = ""
+            else:
+                # Decoded straight from the page cache, without reading the file into a buffer first
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                    text = str(view, "utf-8")
+        with self._lock:
+            self._counters["file_reads"] += 1
+            self._remember(digest, text)
+        return text
+
+    def contains(self, digest: str) -> bool:
+        with self._lock:
+            if digest in self._memory:
+                return True
+        return bool(self.path) and os.path.exists(self._file(digest))
+
+    @contextmanager
+    def pinned(self, ref: BlobRef) -> Iterator[BlobRef]:
+        """Keep a blob in memory while a workflow may still resolve its handle"""
+        if ref.inline is not None:
+            yield ref
+            return
+        with self._lock:
+            self._pins[ref.digest] += 1
+        try:
+            yield ref
+        finally:
+            with self._lock:
+                self._pins[ref.digest] -= 1
+                if not self._pins[ref.digest]:
+                    del self._pins[ref.digest]
+
+    def evict(self) -> None:
+        """Delete blob files not stored again for max_age_seconds"""
+        if not self.path:
+            return
+        cutoff = time.time() - self.max_age_seconds
+        for directory, _, files in os.walk(self.path):
+            for name in files:
+                file_path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(file_path) < cutoff:
+                        os.remove(file_path)
+                except OSError:
+                    # Removed or replaced by another process in the meantime
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory tier size, pinned blobs and read counters"""
+        with self._lock:
+            return {
+                "memory_blobs": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "pinned_blobs": len(self._pins),
+                **self._counters,
+            }
+
+    def render_prometheus(self) -> str:
+        """Render memory tier size and blob reads in the Prometheus text exposition format"""
+        stats = self.stats()
+        lines = []
+        for name, kind, value, help_text in (
+            ("script_blob_memory_bytes", "gauge", stats["memory_bytes"], "Size of the texts in the memory tier"),
+            ("script_blob_memory_blobs", "gauge", stats["memory_blobs"], "Blobs in the memory tier"),
+            ("script_blob_pinned_blobs", "gauge", stats["pinned_blobs"], "Blobs held by running workflows"),
+            ("script_blob_stored_total", "counter", stats["stored"], "Texts stored"),
+            ("script_blob_deduplicated_total", "counter", stats["deduplicated"], "Texts stored that were already in memory"),
+            ("script_blob_memory_hits_total", "counter", stats["memory_hits"], "Handles resolved from memory"),
+            ("script_blob_file_reads_total", "counter", stats["file_reads"], "Handles resolved from the file tier"),
+            ("script_blob_misses_total", "counter", stats["misses"], "Handles whose text was gone"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+def get_blob_store() -> Optional[BlobStore]:
+    """
+    Return the process-wide blob store, or None when disabled via BLOB_STORE_ENABLED=0.
+
+    Configured through BLOB_MIN_CHARS, BLOB_MEMORY_MAX_BYTES, BLOB_MAX_AGE_SECONDS
+    and BLOB_STORE_PATH; an empty BLOB_STORE_PATH keeps blobs in memory only.
+    """
+    global _blob_store
+    if os.getenv('BLOB_STORE_ENABLED', '1').lower() in ('0', 'false', 'no'):
+        return None
+
+    with _blob_store_lock:
+        if _blob_store is None:
+            store = BlobStore(
+                path=os.getenv('BLOB_STORE_PATH', DEFAULT_BLOB_PATH) or None,
+                min_chars=int(os.getenv('BLOB_MIN_CHARS', DEFAULT_MIN_CHARS)),
+                memory_max_bytes=int(os.getenv('BLOB_MEMORY_MAX_BYTES', DEFAULT_MEMORY_MAX_BYTES)),
+                max_age_seconds=float(os.getenv('BLOB_MAX_AGE_SECONDS', DEFAULT_MAX_AGE_SECONDS))
+            )
+            store.evict()
+            _blob_store = store
+        return _blob_store
+
+def store_text(text: str) -> BlobRef:
+    """Handle for a text: stored in the blob store when enabled and the text is long enough, inline otherwise"""
+    store = get_blob_store()
+    if store is None:
+        return BlobRef(digest=hashlib.sha256(text.encode("utf-8")).hexdigest(), length=len(text), inline=text)
+    return store.put(text)
+
+@contextmanager
+def pinned(ref: BlobRef) -> Iterator[BlobRef]:
+    """Keep a handle's blob in memory for the duration of a workflow run"""
+    store = get_blob_store()
+    if store is None:
+        yield ref
+        return
+    with store.pinned(ref):
+        yield ref
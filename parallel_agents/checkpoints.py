@@ -0,0 +1,365 @@
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.types import TASKS
+
+from executor import get_executor
+
+load_dotenv()
+
+# Checkpoint store configuration
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "checkpoints.sqlite3")
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60     # Threads not updated for this long are deleted
+
+def script_id(script_content: str) -> str:
+    """Checkpoint thread of a script: hex SHA-256 of its content"""
+    return hashlib.sha256(script_content.encode("utf-8")).hexdigest()
+
+def run_thread_id(script_hash: str) -> str:
+    """
+    Checkpoint thread of one run of a script: its script_id and a random run id,
+    so concurrent runs of the same script never write to the same thread
+    """
+    return f"{script_hash}:{uuid.uuid4().hex[:16]}"
+
+def thread_config(thread_id: str) -> RunnableConfig:
+    """
+    Graph config running (or resuming) a checkpointed workflow on a thread; the
+    script_id is also copied into each checkpoint's metadata, see latest_run()
+    """
+    return {"configurable": {"thread_id": thread_id, "script_id": thread_id.partition(":")[0]}}
+
+async def latest_run(checkpointer: BaseCheckpointSaver, script_hash: str) -> Optional[str]:
+    """Thread of the most recently checkpointed run of a script, or None"""
+    async for checkpoint in checkpointer.alist(None, filter={"script_id": script_hash}, limit=1):
+        return checkpoint.config["configurable"]["thread_id"]
+    return None
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    LangGraph checkpointer keeping every step of a run in a local SQLite file.
+
+    Checkpoints are stored whole, and the writes of nodes that finished in an
+    unfinished step are kept with them, so a run that failed or was killed can
+    be continued without repeating the nodes that already succeeded.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH, max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS, serde=None):
+        super().__init__(serde=serde)
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                checkpoint_type TEXT NOT NULL,
+                checkpoint BLOB NOT NULL,
+                metadata_type TEXT NOT NULL,
+                metadata BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                script_id TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            )
+            """
+        )
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(checkpoints)")]
+        if "script_id" not in columns:
+            # Database from before run ids: its threads are bare script hashes
+            self._connection.execute("ALTER TABLE checkpoints ADD COLUMN script_id TEXT NOT NULL DEFAULT ''")
+            self._connection.execute("UPDATE checkpoints SET script_id = substr(thread_id, 1, instr(thread_id || ':', ':') - 1)")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoint_writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL,
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                value_type TEXT NOT NULL,
+                value BLOB NOT NULL,
+                task_path TEXT NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON checkpoints (created_at)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_script ON checkpoints (script_id, checkpoint_id)")
+
+    # Reading
+    def _writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any, str]]:
+        rows = self._connection.execute(
+            "SELECT task_id, channel, value_type, value, task_path FROM checkpoint_writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+        return [(task_id, channel, (value_type, value), task_path) for task_id, channel, value_type, value, task_path in rows]
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: Tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata = row
+        writes = self._writes(thread_id, checkpoint_ns, checkpoint_id)
+        # Sends are recorded as writes to the TASKS channel of the step that made them
+        sends = []
+        if parent_checkpoint_id:
+            sends = [
+                value for _, channel, value, _ in
+                sorted(self._writes(thread_id, checkpoint_ns, parent_checkpoint_id), key=lambda write: write[3])
+                if channel == TASKS
+            ]
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={
+                **self.serde.loads_typed((checkpoint_type, checkpoint)),
+                "pending_sends": [self.serde.loads_typed(value) for value in sends],
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed(value)) for task_id, channel, value, _ in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Return the checkpoint named by the config, or the latest one of its thread"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._connection.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                # Checkpoint ids are time-ordered
+                row = self._connection.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns)
+                ).fetchone()
+            return self._to_tuple(thread_id, checkpoint_ns, row) if row is not None else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """
+        Checkpoints newest first, optionally of one thread, before a checkpoint or
+        matching metadata. A script_id filter is answered from its indexed column.
+        """
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata FROM checkpoints"
+        conditions, params = [], []
+        filter = dict(filter or {})
+        if "script_id" in filter:
+            conditions.append("script_id = ?")
+            params.append(filter.pop("script_id"))
+        if config is not None:
+            conditions.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            params.append(before_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY checkpoint_id DESC"
+        if limit is not None and not filter:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            tuples = []
+            for thread_id, checkpoint_ns, *row in self._connection.execute(query, params):
+                if limit is not None and len(tuples) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row[4], row[5]))
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+                tuples.append(self._to_tuple(thread_id, checkpoint_ns, row))
+        yield from tuples
+
+    # Writing
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Store a checkpoint after its parent, the checkpoint named by the config"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        # Pending sends are rebuilt from the parent's writes when the checkpoint is read
+        stored = {key: value for key, value in checkpoint.items() if key != "pending_sends"}
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(stored)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+                "checkpoint_type, checkpoint, metadata_type, metadata, created_at, script_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                    checkpoint_type, checkpoint_blob, metadata_type, metadata_blob, time.time(), thread_id.partition(":")[0]
+                )
+            )
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Store the writes of a finished node against the checkpoint its step started from"""
+        rows = []
+        replace = False
+        for idx, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            # Special writes (errors, interrupts) replace earlier ones, regular writes are only stored once
+            replace = replace or idx < 0
+            value_type, value_blob = self.serde.dumps_typed(value)
+            rows.append((
+                config["configurable"]["thread_id"], config["configurable"].get("checkpoint_ns", ""),
+                config["configurable"]["checkpoint_id"], task_id, idx, channel, value_type, value_blob, task_path
+            ))
+        with self._lock:
+            self._connection.executemany(
+                f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO checkpoint_writes (thread_id, checkpoint_ns, "
+                "checkpoint_id, task_id, idx, channel, value_type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete every checkpoint and write of a thread"""
+        with self._lock:
+            self._connection.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._connection.execute("DELETE FROM checkpoint_writes WHERE thread_id = ?", (thread_id,))
+
+    def evict(self) -> None:
+        """Delete threads whose last checkpoint is older than max_age_seconds"""
+        cutoff = time.time() - self.max_age_seconds
+        with self._lock:
+            stale = self._connection.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?", (cutoff,)
+            ).fetchall()
+            self._connection.executemany("DELETE FROM checkpoints WHERE thread_id = ?", stale)
+            self._connection.executemany("DELETE FROM checkpoint_writes WHERE thread_id = ?", stale)
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._connection.close()
+
+    # Async versions - SQLite calls are blocking, so they run on the executor's thread pool
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await get_executor().run(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        tuples = await get_executor().run(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for checkpoint_tuple in tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await get_executor().run(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await get_executor().run(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await get_executor().run(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: Any) -> str:
+        # Same version scheme as the in-memory saver, so the two are interchangeable
+        return InMemorySaver.get_next_version(self, current, channel)
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_checkpointer_lock = threading.Lock()
+
+def set_checkpointer(checkpointer: Optional[BaseCheckpointSaver]) -> None:
+    """
+    Make get_checkpointer() return this checkpointer, e.g. a Postgres saver in production
+    or an InMemorySaver in tests. Set it before the first checkpointed run.
+    """
+    global _checkpointer
+    with _checkpointer_lock:
+        _checkpointer = checkpointer
+
+def get_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """
+    Return the process-wide checkpointer, or None when disabled via CHECKPOINT_ENABLED=0.
+
+    Defaults to a SqliteCheckpointSaver at CHECKPOINT_PATH, whose threads expire
+    after CHECKPOINT_MAX_AGE_SECONDS.
+    """
+    global _checkpointer
+    if os.getenv('CHECKPOINT_ENABLED', '1').lower() in ('0', 'false', 'no'):
+        return None
+
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            saver = SqliteCheckpointSaver(
+                path=os.getenv('CHECKPOINT_PATH', DEFAULT_CHECKPOINT_PATH),
+                max_age_seconds=float(os.getenv('CHECKPOINT_MAX_AGE_SECONDS', DEFAULT_MAX_AGE_SECONDS))
+            )
+            saver.evict()
+            _checkpointer = saver
+        return _checkpointer
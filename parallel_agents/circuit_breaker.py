@@ -0,0 +1,270 @@
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from dotenv import load_dotenv
+import os
+import threading
+import time
+
+from tracing import percentile
+
+load_dotenv()
+
+# Circuit states
+CLOSED = "closed"           # Calls go through and are counted
+OPEN = "open"               # Calls are rejected without touching the network
+HALF_OPEN = "half_open"     # One probe call decides whether to close again
+
+DEFAULT_WINDOW_SECONDS = 60.0       # Outcomes considered for the error rate
+DEFAULT_MIN_CALLS = 10              # Calls in the window before the circuit can trip
+DEFAULT_ERROR_RATE = 0.5            # Share of failed calls that trips the circuit
+DEFAULT_SLOW_CALL_SECONDS = 60.0    # Calls slower than this count as failures
+DEFAULT_OPEN_SECONDS = 30.0         # Time an open circuit waits before letting a probe through
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a model whose circuit is open"""
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"circuit for {key} is open, next probe in {retry_after:.0f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    Rolling error rate and latency of one model provider.
+
+    Failed calls, and calls slower than slow_call_seconds, count as failures.
+    Once at least min_calls in the window and error_rate of them failed, the
+    circuit opens and calls are rejected for open_seconds. Then a single probe
+    call is let through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        slow_call_seconds: float = DEFAULT_SLOW_CALL_SECONDS,
+        open_seconds: float = DEFAULT_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.key = key
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool, float]] = deque()  # (time, failed, latency)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counters = {"opened": 0, "rejected": 0, "probes": 0}
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] < now - self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        self._counters["opened"] += 1
+        print(f"🔌 Circuit for {self.key} opened, calls fail fast for {self.open_seconds:.0f}s")
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def is_open(self) -> bool:
+        """Whether a call now would be rejected, without taking the probe slot"""
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            if self._state == OPEN and self.clock() - self._opened_at < self.open_seconds:
+                return True
+            return self._probe_in_flight
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through"""
+        with self._lock:
+            return max(0.0, self._opened_at + self.open_seconds - self.clock())
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; after the open period the first caller becomes the probe"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self.clock() - self._opened_at < self.open_seconds:
+                self._counters["rejected"] += 1
+                return False
+            if self._probe_in_flight:
+                self._counters["rejected"] += 1
+                return False
+            self._state = HALF_OPEN
+            self._probe_in_flight = True
+            self._counters["probes"] += 1
+            return True
+
+    def record(self, failed: bool, latency: float) -> None:
+        """Record the outcome of an allowed call"""
+        failed = failed or latency > self.slow_call_seconds
+        with self._lock:
+            now = self.clock()
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._open(now)
+                    return
+                self._state = CLOSED
+                self._probe_in_flight = False
+                self._outcomes.clear()
+                print(f"🔌 Circuit for {self.key} closed, probe succeeded")
+            self._outcomes.append((now, failed, latency))
+            self._prune(now)
+            failures = sum(1 for _, outcome, _ in self._outcomes if outcome)
+            if (
+                self._state == CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and failures >= self.error_rate * len(self._outcomes)
+            ):
+                self._open(now)
+
+    def abandon(self) -> None:
+        """An allowed call was cancelled before it finished; free the probe slot"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = OPEN
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """State, windowed error rate and latency, and transition counters"""
+        state = self.state
+        with self._lock:
+            self._prune(self.clock())
+            latencies = sorted(latency for _, _, latency in self._outcomes)
+            failures = sum(1 for _, failed, _ in self._outcomes if failed)
+            return {
+                "state": state,
+                "calls": len(self._outcomes),
+                "failures": failures,
+                "error_rate": failures / len(self._outcomes) if self._outcomes else 0.0,
+                "p50_seconds": percentile(latencies, 0.5) if latencies else 0.0,
+                "p90_seconds": percentile(latencies, 0.9) if latencies else 0.0,
+                **self._counters,
+            }
+
+class CircuitBreakers:
+    """One circuit breaker per model provider, sharing a configuration"""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(key, **self.settings)
+            return self._breakers[key]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {key: breaker.stats() for key, breaker in breakers.items()}
+
+    def render_prometheus(self) -> str:
+        """Render circuit states and counters in the Prometheus text exposition format"""
+        stats = self.stats()
+        lines = [
+            "# HELP script_model_circuit_open Whether the model's circuit is rejecting calls (1) or not (0)",
+            "# TYPE script_model_circuit_open gauge",
+        ]
+        lines.extend(f'script_model_circuit_open{{model="{key}"}} {int(s["state"] == OPEN)}' for key, s in stats.items())
+        lines.append("# HELP script_model_circuit_error_rate Failed or slow share of the calls in the window")
+        lines.append("# TYPE script_model_circuit_error_rate gauge")
+        lines.extend(f'script_model_circuit_error_rate{{model="{key}"}} {s["error_rate"]:.3f}' for key, s in stats.items())
+        for counter, help_text in (
+            ("opened", "Times the circuit opened"),
+            ("rejected", "Calls rejected without touching the network"),
+            ("probes", "Half-open probe calls let through"),
+        ):
+            metric = f"script_model_circuit_{counter}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f'{metric}{{model="{key}"}} {s[counter]}' for key, s in stats.items())
+        return "\n".join(lines) + "\n"
+
+_circuit_breakers: Optional[CircuitBreakers] = None
+
+def get_circuit_breakers() -> Optional[CircuitBreakers]:
+    """
+    Return the process-wide circuit breakers, or None unless CIRCUIT_BREAKER_ENABLED is set.
+
+    Configured through CIRCUIT_WINDOW_SECONDS, CIRCUIT_MIN_CALLS, CIRCUIT_ERROR_RATE,
+    CIRCUIT_SLOW_CALL_SECONDS and CIRCUIT_OPEN_SECONDS.
+    """
+    global _circuit_breakers
+    if os.getenv('CIRCUIT_BREAKER_ENABLED', '0').lower() in ('0', 'false', 'no', ''):
+        return None
+    if _circuit_breakers is None:
+        _circuit_breakers = CircuitBreakers(
+            window_seconds=float(os.getenv('CIRCUIT_WINDOW_SECONDS', DEFAULT_WINDOW_SECONDS)),
+            min_calls=int(os.getenv('CIRCUIT_MIN_CALLS', DEFAULT_MIN_CALLS)),
+            error_rate=float(os.getenv('CIRCUIT_ERROR_RATE', DEFAULT_ERROR_RATE)),
+            slow_call_seconds=float(os.getenv('CIRCUIT_SLOW_CALL_SECONDS', DEFAULT_SLOW_CALL_SECONDS)),
+            open_seconds=float(os.getenv('CIRCUIT_OPEN_SECONDS', DEFAULT_OPEN_SECONDS))
+        )
+    return _circuit_breakers
+
+def model_key(model: Any) -> str:
+    """Circuit key of a (possibly wrapped) model: provider system and model name"""
+    return f"{getattr(model, 'system', 'model')}:{model.model_name}"
+
+def circuit_is_open(model: Any) -> bool:
+    """Whether requests to a model are currently being rejected by its circuit"""
+    breakers = get_circuit_breakers()
+    return breakers is not None and breakers.get(model_key(model)).is_open()
+
+def is_provider_failure(error: BaseException) -> bool:
+    """Whether an error says the provider is unhealthy, as opposed to a request the provider rejected"""
+    status_code = getattr(error, "status_code", None)
+    return status_code is None or status_code >= 500 or status_code in (408, 429)
+
+# Model
+def protect_model(model):
+    """Wrap a pydantic-ai model so its requests go through the model's circuit breaker"""
+    return _circuit_breaker_model_class()(model)
+
+@lru_cache(maxsize=None)
+def _circuit_breaker_model_class():
+    # Built on first use so importing this module does not load pydantic-ai
+    from pydantic_ai.models.wrapper import WrapperModel
+
+    class CircuitBreakerModel(WrapperModel):
+        """Model wrapper failing fast while the provider's circuit is open"""
+
+        async def request(self, messages, *args, **kwargs):
+            breakers = get_circuit_breakers()
+            if breakers is None:
+                return await super().request(messages, *args, **kwargs)
+            breaker = breakers.get(model_key(self))
+            if not breaker.allow():
+                raise CircuitOpenError(breaker.key, breaker.retry_after())
+            start = time.perf_counter()
+            try:
+                response = await super().request(messages, *args, **kwargs)
+            except Exception as e:
+                breaker.record(is_provider_failure(e), time.perf_counter() - start)
+                raise
+            except BaseException:
+                breaker.abandon()
+                raise
+            breaker.record(False, time.perf_counter() - start)
+            return response
+
+    return CircuitBreakerModel
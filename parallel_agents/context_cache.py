@@ -0,0 +1,275 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional, Tuple
+from pydantic import BaseModel, Field
+from dotenv import load_dotenv
+import json
+import os
+import threading
+
+from agents.info_gathering_agent import CHARS_PER_TOKEN
+
+load_dotenv()
+
+DEFAULT_TTL_SECONDS = 600       # Lifetime of a context when the workflow has no deadline
+DEFAULT_MIN_TOKENS = 4096       # Gemini rejects explicit caches smaller than this
+TTL_MARGIN_SECONDS = 60         # Kept past the workflow deadline so late retries still find the context
+
+# Prompt
+# Cached with the script data; each agent's own instructions follow in its request
+context_preamble = """
+    You are a film production analysis expert. The extracted script data below is shared by several
+    analyses. The next message gives the analysis to perform and the output format to use.
+    """
+
+def context_prompt(input_fields: Tuple[str, ...]) -> str:
+    """User prompt sent instead of the payload when the script data is in the cached context"""
+    return f"Analyze the extracted script data from the cached context. Relevant fields: {', '.join(input_fields)}."
+
+# Cached context
+class CachedContext(BaseModel):
+    """A script data payload uploaded once and shared by the analysis agents of one workflow run"""
+    name: str = Field(description="Provider resource name, e.g. cachedContents/abc123")
+    model_name: str = Field(description="Model the context was created for; other models cannot use it")
+    token_count: int = Field(default=0, description="Tokens stored in the context")
+    expire_time: Optional[str] = Field(default=None, description="When the provider deletes the context")
+
+@dataclass(frozen=True)
+class ActiveContext:
+    """The cached context an agent call should reference, and the prompt replacing its payload"""
+    context: CachedContext
+    prompt: str
+
+_active_context: ContextVar[Optional[ActiveContext]] = ContextVar("active_context", default=None)
+
+def current_context() -> Optional[ActiveContext]:
+    """Return the cached context agent calls in this context should reference"""
+    return _active_context.get()
+
+@contextmanager
+def use_context(context: Optional[CachedContext], prompt: str) -> Iterator[None]:
+    """Make agent calls inside the block reference a cached context (no-op for None)"""
+    if context is None:
+        yield
+        return
+    token = _active_context.set(ActiveContext(context, prompt))
+    try:
+        yield
+    finally:
+        _active_context.reset(token)
+
+def _unwrap(model: Any) -> Any:
+    while hasattr(model, "wrapped"):
+        model = model.wrapped
+    return model
+
+def supports_cached_context(model: Any) -> bool:
+    """Whether a (possibly wrapped) model can send requests against a cached context"""
+    return getattr(_unwrap(model), "supports_cached_context", False)
+
+def _endpoint(model: Any) -> Tuple[Any, str]:
+    """HTTP client and cachedContents base URL of a Gemini model"""
+    client = _unwrap(model).client
+    # The model's base URL points at .../v1beta/models/, cachedContents lives next to it
+    return client, str(client.base_url).rsplit("models/", 1)[0]
+
+# Context cache
+class ContextCache:
+    """
+    Creates and deletes Gemini cached contents through the cachedContents API.
+
+    Each workflow run uploads its full script data once; the analysis agents
+    then send only their instructions and reference the context. Contexts
+    are deleted when the run finishes and expire on their own after the TTL
+    if it never does.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, min_tokens: int = DEFAULT_MIN_TOKENS):
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self._lock = threading.Lock()
+        self._counters = {"created": 0, "released": 0, "failed": 0, "skipped": 0, "cached_tokens": 0}
+        self._endpoints: Dict[str, Tuple[Any, str]] = {}   # Where each live context was created
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    async def create(self, payload: str, model: Any, ttl_seconds: Optional[float] = None) -> Optional[CachedContext]:
+        """
+        Upload a payload as a cached context for a model.
+
+        Args:
+            payload: Script data every analysis agent would otherwise receive
+            model: Model the agents run on; contexts are only created for models that support them
+            ttl_seconds: Lifetime; defaults to the configured TTL
+
+        Returns:
+            The context, or None if the model cannot use one, the payload is too
+            small to be cached or the upload failed (agents then send the payload as usual)
+        """
+        if not supports_cached_context(model) or len(payload) // CHARS_PER_TOKEN < self.min_tokens:
+            self._count("skipped")
+            return None
+
+        client, base_url = _endpoint(model)
+        ttl = max(1, int(ttl_seconds if ttl_seconds is not None else self.ttl_seconds))
+        body = {
+            "model": f"models/{model.model_name}",
+            "systemInstruction": {"role": "user", "parts": [{"text": context_preamble}]},
+            "contents": [{"role": "user", "parts": [{"text": f"Extracted script data (JSON):\n{payload}"}]}],
+            "ttl": f"{ttl}s",
+            "displayName": f"script-analysis-{datetime.now():%Y%m%d-%H%M%S}",
+        }
+        try:
+            response = await client.post(f"{base_url}cachedContents", content=json.dumps(body),
+                                         headers={"Content-Type": "application/json"})
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            self._count("failed")
+            print(f"⚠️ Could not create a cached context, agents will resend the script data: {e}")
+            return None
+
+        context = CachedContext(
+            name=data["name"],
+            model_name=model.model_name,
+            token_count=int(data.get("usageMetadata", {}).get("totalTokenCount", len(payload) // CHARS_PER_TOKEN)),
+            expire_time=data.get("expireTime")
+        )
+        self._count("created")
+        self._count("cached_tokens", context.token_count)
+        with self._lock:
+            self._endpoints[context.name] = (client, base_url)
+        return context
+
+    async def release(self, context: CachedContext) -> None:
+        """Delete a context; one that already expired is ignored"""
+        with self._lock:
+            endpoint = self._endpoints.pop(context.name, None)
+        if endpoint is None:
+            from utils import get_model
+
+            # Created by another process (e.g. before a restart) - use the shared model's endpoint
+            endpoint = _endpoint(get_model(context.model_name))
+        client, base_url = endpoint
+        try:
+            response = await client.delete(f"{base_url}{context.name}")
+            if response.status_code != 404:
+                response.raise_for_status()
+            self._count("released")
+        except Exception as e:
+            print(f"⚠️ Could not delete cached context {context.name}, it expires at {context.expire_time}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Contexts created, released, failed and skipped, and tokens cached"""
+        with self._lock:
+            return dict(self._counters)
+
+    def render_prometheus(self) -> str:
+        """Render the counters in the Prometheus text exposition format"""
+        stats = self.stats()
+        lines = []
+        for counter, help_text in (
+            ("created", "Cached contexts created"),
+            ("released", "Cached contexts deleted at the end of their workflow"),
+            ("failed", "Cached context uploads that failed"),
+            ("skipped", "Workflows that sent the script data to each agent instead"),
+            ("cached_tokens", "Tokens uploaded to cached contexts"),
+        ):
+            metric = f"script_context_cache_{counter}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {stats[counter]}")
+        return "\n".join(lines) + "\n"
+
+_context_cache: Optional[ContextCache] = None
+
+def get_context_cache() -> Optional[ContextCache]:
+    """
+    Return the process-wide context cache, or None unless CONTEXT_CACHE_ENABLED is set.
+
+    Configured through CONTEXT_CACHE_TTL_SECONDS and CONTEXT_CACHE_MIN_TOKENS.
+    """
+    global _context_cache
+    if os.getenv('CONTEXT_CACHE_ENABLED', '0').lower() in ('0', 'false', 'no', ''):
+        return None
+    if _context_cache is None:
+        _context_cache = ContextCache(
+            ttl_seconds=float(os.getenv('CONTEXT_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+            min_tokens=int(os.getenv('CONTEXT_CACHE_MIN_TOKENS', DEFAULT_MIN_TOKENS))
+        )
+    return _context_cache
+
+# Model
+def create_context_cached_model(model_name: str, provider: Any):
+    """A GeminiModel that sends requests against the active cached context, when there is one"""
+    return _context_cached_model_class()(model_name, provider=provider)
+
+@lru_cache(maxsize=None)
+def _context_cached_model_class():
+    # Built on first use so importing this module does not load pydantic-ai
+    from dataclasses import replace
+    from pydantic_ai.exceptions import ModelHTTPError
+    from pydantic_ai.messages import SystemPromptPart, TextPart, ToolCallPart
+    from pydantic_ai.models import check_allow_model_requests
+    from pydantic_ai.models.gemini import GeminiModel, _gemini_response_ta, _settings_to_generation_config
+
+    class ContextCachedGeminiModel(GeminiModel):
+        """
+        GeminiModel that references the workflow's cached context.
+
+        Gemini does not accept a system instruction or tools next to cachedContent,
+        so the agent's system prompt is sent as the first user message and the
+        output tool's schema becomes the response schema. The JSON reply is turned
+        back into an output tool call for pydantic-ai to validate. Relies on
+        GeminiModel internals of the pydantic-ai version pinned in requirements.txt;
+        tests/test_context_cache.py fails when an upgrade changes them.
+        """
+        supports_cached_context = True
+
+        async def request(self, messages, model_settings, model_request_parameters):
+            active = current_context()
+            # Only first requests use the context - retries carry a tool call history it cannot describe
+            if (
+                active is None
+                or active.context.model_name != self.model_name
+                or len(messages) != 1
+                or len(model_request_parameters.output_tools) != 1
+            ):
+                return await super().request(messages, model_settings, model_request_parameters)
+
+            check_allow_model_requests()
+            output_tool = model_request_parameters.output_tools[0]
+            system_prompt = "\n".join(
+                part.content for part in messages[0].parts if isinstance(part, SystemPromptPart)
+            )
+            generation_config = dict(_settings_to_generation_config(model_settings or {}))
+            generation_config.update(responseMimeType="application/json", responseSchema=output_tool.parameters_json_schema)
+            body = {
+                "cachedContent": active.context.name,
+                "contents": [{"role": "user", "parts": [{"text": system_prompt}, {"text": active.prompt}]}],
+                "generationConfig": generation_config,
+            }
+
+            response = await self.client.post(
+                f"/{self.model_name}:generateContent",
+                content=json.dumps(body),
+                headers={"Content-Type": "application/json"},
+                timeout=(model_settings or {}).get("timeout", self.client.timeout)
+            )
+            if response.status_code != 200:
+                if 400 <= response.status_code < 500:
+                    # Expired or rejected context - send the full request instead
+                    print(f"⚠️ Cached context {active.context.name} unusable ({response.status_code}), resending the script data")
+                    return await super().request(messages, model_settings, model_request_parameters)
+                raise ModelHTTPError(status_code=response.status_code, model_name=self.model_name, body=response.text)
+
+            model_response = self._process_response(_gemini_response_ta.validate_json(response.content))
+            text = "".join(part.content for part in model_response.parts if isinstance(part, TextPart))
+            return replace(model_response, parts=[ToolCallPart(output_tool.name, text)])
+
+    return ContextCachedGeminiModel
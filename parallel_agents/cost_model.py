@@ -0,0 +1,278 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+import json
+import os
+
+from scheduler import ShootingSchedule, build_shooting_schedule
+from script_stats import MAX_SUMMARY_LOCATIONS, ScriptStatistics
+
+load_dotenv()
+
+CAST_TIERS = ("lead", "supporting", "day_player")
+CAST_TIER_LABELS = {"lead": "lead", "supporting": "supporting role", "day_player": "day player"}
+
+# Rate table
+class RateTable(BaseModel):
+    """Rates the cost model prices a schedule with; override any of them in a JSON file named by COST_RATES_PATH"""
+    currency: str = Field(default="USD", description='Currency of every rate')
+    location_day_rates: Dict[str, float] = Field(
+        default={"INT": 2500.0, "EXT": 3500.0, "INT/EXT": 4500.0},
+        description='Rental, permits and site costs per location per shoot day, by heading type'
+    )
+    night_multiplier: float = Field(default=1.5, description='Applied to location and crew costs on night work')
+    crew_base: int = Field(default=25, description='Core crew on every shoot day')
+    crew_exterior_extra: int = Field(default=6, description='Extra grip, electric and locations crew on days with exteriors')
+    crew_night_extra: int = Field(default=4, description='Extra electric crew on days with night scenes')
+    crew_day_rate: float = Field(default=450.0, description='Average crew rate per person per day')
+    cast_day_rates: Dict[str, float] = Field(
+        default={"lead": 5000.0, "supporting": 1500.0, "day_player": 1100.0},
+        description='Rate per actor per shoot day, by cast tier'
+    )
+    lead_count: int = Field(default=2, description='Characters with the most scenes billed as leads')
+    supporting_min_scenes: int = Field(default=5, description='Scenes a character needs to be billed as supporting')
+    equipment_day_rate: float = Field(default=6000.0, description='Camera, grip and electric package per shoot day')
+    night_lighting_day_rate: float = Field(default=3000.0, description='Additional lighting package per day with night scenes')
+    company_move_cost: float = Field(default=2500.0, description='Each move between locations within a day')
+    post_cost_per_page: float = Field(default=4000.0, description='Editing, sound, color and deliverables per script page')
+    contingency: float = Field(default=0.10, description='Share of the subtotal added as contingency')
+    estimate_spread: float = Field(default=0.15, description='Relative width of the reported budget range')
+    budget_tiers: Dict[str, float] = Field(
+        default={"low": 500_000.0, "medium": 3_000_000.0, "high": 15_000_000.0},
+        description='Upper bound of each budget tier, ascending; anything above is premium'
+    )
+
+def load_rate_table(path: Optional[str] = None) -> RateTable:
+    """Rate table from a JSON file of overrides (COST_RATES_PATH by default); the defaults when there is none"""
+    path = path if path is not None else os.getenv('COST_RATES_PATH', '')
+    if not path:
+        return RateTable()
+    with open(path, "r", encoding="utf-8") as f:
+        return RateTable(**json.load(f))
+
+_rate_table: Optional[RateTable] = None
+
+def get_rate_table() -> RateTable:
+    """Return the process-wide rate table, loaded on first use"""
+    global _rate_table
+    if _rate_table is None:
+        _rate_table = load_rate_table()
+    return _rate_table
+
+# State/Output
+class CostLineItem(BaseModel):
+    """One budget line"""
+    category: str = Field(description='Locations, Crew, Equipment, Cast, Company moves, Post-production or Contingency')
+    item: str = Field(description='What the line pays for')
+    quantity: float = Field(description='Units priced')
+    unit: str = Field(description='Unit of the quantity, e.g. day or page')
+    amount: float = Field(description='Cost of the line')
+
+class CostEstimate(BaseModel):
+    """Budget computed from the shooting schedule and a rate table"""
+    currency: str = Field(description='Currency of every amount')
+    line_items: List[CostLineItem] = Field(description='Budget lines, grouped by category')
+    total: float = Field(description='Sum of the line items, contingency included')
+    low: float = Field(description='Lower end of the budget range')
+    high: float = Field(description='Upper end of the budget range')
+    budget_tier: str = Field(description='low, medium, high or premium')
+    shoot_days: int = Field(description='Shoot days of the schedule priced')
+    crew_base: int = Field(description='Core crew size')
+    crew_max: int = Field(description='Largest crew on any day')
+    crew_average: float = Field(description='Average crew size per day')
+    night_exterior_share: float = Field(description='Share of the pages that are night exteriors')
+    cast_days: Dict[str, int] = Field(description='Shoot days per speaking character')
+    cast_tiers: Dict[str, str] = Field(description='Tier per speaking character')
+
+    def money(self, amount: float) -> str:
+        return f"{amount:,.0f} {self.currency}"
+
+    def category_totals(self) -> Dict[str, float]:
+        """Total per category, largest first"""
+        totals: Dict[str, float] = {}
+        for line in self.line_items:
+            totals[line.category] = totals.get(line.category, 0.0) + line.amount
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact view of the estimate for agent payloads"""
+        return {
+            "total": round(self.total),
+            "range": [round(self.low), round(self.high)],
+            "currency": self.currency,
+            "budget_tier": self.budget_tier,
+            "shoot_days": self.shoot_days,
+            "crew_max": self.crew_max,
+            "by_category": {category: round(amount) for category, amount in self.category_totals().items()},
+        }
+
+    def breakdown_fields(self) -> Dict[str, Any]:
+        """The CostBreakdown fields the estimate provides - everything but the suggestions"""
+        lines = self.line_items
+        post = sum(line.amount for line in lines if line.category == "Post-production")
+        post_level = (
+            "high" if self.night_exterior_share >= 0.25 else "medium" if self.night_exterior_share >= 0.10 else "low"
+        )
+        talent = []
+        for tier in CAST_TIERS:
+            names = [name for name, name_tier in self.cast_tiers.items() if name_tier == tier]
+            if not names:
+                continue
+            amount = sum(line.amount for line in lines if line.category == "Cast" and line.item.startswith(f"{tier} "))
+            shown = ", ".join(f"{name} ({self.cast_days[name]}d)" for name in names[:MAX_SUMMARY_LOCATIONS])
+            more = f" and {len(names) - MAX_SUMMARY_LOCATIONS} more" if len(names) > MAX_SUMMARY_LOCATIONS else ""
+            talent.append(
+                f"{len(names)} {CAST_TIER_LABELS[tier]}{'s' if len(names) > 1 else ''}: {shown}{more} - "
+                f"{sum(self.cast_days[name] for name in names)} actor days, {self.money(amount)}"
+            )
+        subtotal = self.total - sum(line.amount for line in lines if line.category == "Contingency")
+        return {
+            "estimated_budget_range": f"{self.budget_tier} ({self.money(self.low)} - {self.money(self.high)})",
+            "estimated_shoot_days": self.shoot_days,
+            "crew_size_recommendation": (
+                f"{self.crew_base} core crew, up to {self.crew_max} on exterior and night days "
+                f"({self.crew_average:.0f} on average)"
+            ),
+            "location_costs": [
+                f"{line.item}: {line.quantity:g} {line.unit}{'s' if line.quantity != 1 else ''}, {self.money(line.amount)}"
+                for line in lines if line.category == "Locations"
+            ],
+            "equipment_costs": [
+                f"{line.item}: {line.quantity:g} {line.unit}{'s' if line.quantity != 1 else ''}, {self.money(line.amount)}"
+                for line in lines if line.category == "Equipment"
+            ],
+            "talent_requirements": talent,
+            "post_production_complexity": (
+                f"{post_level}: {self.money(post)}, {self.night_exterior_share:.0%} of the pages are night exteriors"
+            ),
+            "total_cost_drivers": [
+                f"{category}: {self.money(amount)} ({amount / subtotal:.0%})" if category != "Contingency"
+                else f"{category}: {self.money(amount)}"
+                for category, amount in self.category_totals().items()
+            ] if subtotal else [],
+        }
+
+def estimate_costs(
+    statistics: ScriptStatistics,
+    rates: Optional[RateTable] = None,
+    schedule: Optional[ShootingSchedule] = None
+) -> CostEstimate:
+    """
+    Price a script from its per-scene statistics.
+
+    Every line item is computed with array operations over the scheduled
+    scenes, so a script is quoted in milliseconds and the same script always
+    gets the same figures.
+
+    Args:
+        statistics: Per-scene statistics of the parsed script
+        rates: Rate table; defaults to the one configured by COST_RATES_PATH
+        schedule: Shooting schedule to price; built from the statistics when not given
+
+    Returns:
+        CostEstimate: Line items per location, crew, equipment, cast tier, moves and post
+    """
+    import numpy as np
+
+    rates = rates if rates is not None else get_rate_table()
+    schedule = schedule if schedule is not None else build_shooting_schedule(statistics)
+    arrays = statistics.arrays()
+    eighths = arrays["page_eighths"]
+    night = arrays["is_night"]
+    interior = arrays["is_interior"]
+    exterior = arrays["is_exterior"]
+    count = statistics.scene_count
+    day_count = len(schedule.days)
+
+    # Shoot day (0-based) of every scene
+    scene_index = {number: i for i, number in enumerate(statistics.scene_numbers)}
+    day_of_scene = np.zeros(count, dtype=np.int64)
+    for day in schedule.days:
+        day_of_scene[[scene_index[number] for number in day.scene_numbers]] = day.day - 1
+
+    # Per day: any exterior, any night
+    day_exterior = np.bincount(day_of_scene, weights=exterior, minlength=day_count) > 0
+    day_night = np.bincount(day_of_scene, weights=night, minlength=day_count) > 0
+    day_multiplier = np.where(day_night, rates.night_multiplier, 1.0)
+    crew = rates.crew_base + rates.crew_exterior_extra * day_exterior + rates.crew_night_extra * day_night
+
+    # Per (location, day) visit: heading type and night work decide the rate
+    location_names, location_index = np.unique(np.asarray(statistics.locations), return_inverse=True)
+    visits, visit_index = np.unique(location_index * day_count + day_of_scene, return_inverse=True)
+    visit_interior = np.bincount(visit_index, weights=interior) > 0
+    visit_exterior = np.bincount(visit_index, weights=exterior) > 0
+    visit_night = np.bincount(visit_index, weights=night) > 0
+    visit_rate = np.where(
+        visit_interior & visit_exterior, rates.location_day_rates["INT/EXT"],
+        np.where(visit_exterior, rates.location_day_rates["EXT"], rates.location_day_rates["INT"])
+    ) * np.where(visit_night, rates.night_multiplier, 1.0)
+    visit_location = visits // day_count
+    location_cost = np.bincount(visit_location, weights=visit_rate, minlength=len(location_names))
+    location_days = np.bincount(visit_location, minlength=len(location_names))
+    location_ext = np.bincount(visit_location, weights=visit_exterior, minlength=len(location_names)) > 0
+    location_int = np.bincount(visit_location, weights=visit_interior, minlength=len(location_names)) > 0
+
+    # Per character: scenes decide the tier, distinct shoot days the cost
+    cast_scene = np.fromiter((i for i, names in enumerate(statistics.cast) for _ in names), dtype=np.int64)
+    cast_names, cast_index = np.unique(
+        np.asarray([name for names in statistics.cast for name in names], dtype=str), return_inverse=True
+    )
+    character_scenes = np.bincount(np.unique(cast_index * count + cast_scene) // count, minlength=len(cast_names))
+    character_days = np.bincount(
+        np.unique(cast_index * day_count + day_of_scene[cast_scene]) // day_count, minlength=len(cast_names)
+    )
+    by_scenes = np.argsort(-character_scenes, kind="stable")
+    tier_of = np.where(character_scenes >= rates.supporting_min_scenes, 1, 2)
+    tier_of[by_scenes[:rates.lead_count]] = 0
+    tier_rates = np.asarray([rates.cast_day_rates[tier] for tier in CAST_TIERS])
+    tier_days = np.bincount(tier_of, weights=character_days, minlength=len(CAST_TIERS))
+    tier_cost = np.bincount(tier_of, weights=character_days * tier_rates[tier_of], minlength=len(CAST_TIERS))
+
+    pages = float(eighths.sum()) / 8
+    night_days = int(day_night.sum())
+    lines = []
+    for i in np.argsort(-location_cost, kind="stable"):
+        kind = "INT/EXT" if location_int[i] and location_ext[i] else "EXT" if location_ext[i] else "INT"
+        lines.append(CostLineItem(category="Locations", item=f"{location_names[i]} ({kind})",
+                                  quantity=int(location_days[i]), unit="day", amount=float(location_cost[i])))
+    crew_label = f"{rates.crew_base}-{int(crew.max())}" if crew.max() > rates.crew_base else str(rates.crew_base)
+    lines.append(CostLineItem(category="Crew", item=f"Crew of {crew_label}",
+                              quantity=int(crew.sum()), unit="person day",
+                              amount=float((crew * rates.crew_day_rate * day_multiplier).sum())))
+    lines.append(CostLineItem(category="Equipment", item="Camera, grip and electric package",
+                              quantity=day_count, unit="day", amount=day_count * rates.equipment_day_rate))
+    if night_days:
+        lines.append(CostLineItem(category="Equipment", item="Night lighting package",
+                                  quantity=night_days, unit="day", amount=night_days * rates.night_lighting_day_rate))
+    for tier_number, tier in enumerate(CAST_TIERS):
+        if tier_days[tier_number]:
+            lines.append(CostLineItem(category="Cast", item=f"{tier} cast", quantity=int(tier_days[tier_number]),
+                                      unit="actor day", amount=float(tier_cost[tier_number])))
+    if schedule.company_moves:
+        lines.append(CostLineItem(category="Company moves", item="Moves between locations within a day",
+                                  quantity=schedule.company_moves, unit="move",
+                                  amount=schedule.company_moves * rates.company_move_cost))
+    lines.append(CostLineItem(category="Post-production", item="Editing, sound, color and deliverables",
+                              quantity=pages, unit="page", amount=pages * rates.post_cost_per_page))
+    subtotal = sum(line.amount for line in lines)
+    lines.append(CostLineItem(category="Contingency", item=f"{rates.contingency:.0%} of the subtotal",
+                              quantity=1, unit="budget", amount=subtotal * rates.contingency))
+
+    total = subtotal * (1 + rates.contingency)
+    tier = next((name for name, bound in rates.budget_tiers.items() if total < bound), "premium")
+    night_exterior_eighths = int(eighths[night & exterior].sum())
+    return CostEstimate(
+        currency=rates.currency,
+        line_items=lines,
+        total=total,
+        low=total * (1 - rates.estimate_spread),
+        high=total * (1 + rates.estimate_spread),
+        budget_tier=tier,
+        shoot_days=day_count,
+        crew_base=rates.crew_base,
+        crew_max=int(crew.max()),
+        crew_average=float(crew.mean()),
+        night_exterior_share=night_exterior_eighths / int(eighths.sum()) if eighths.sum() else 0.0,
+        cast_days={str(cast_names[i]): int(character_days[i]) for i in by_scenes},
+        cast_tiers={str(cast_names[i]): CAST_TIERS[tier_of[i]] for i in by_scenes}
+    )
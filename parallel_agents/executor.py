@@ -0,0 +1,247 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from dotenv import load_dotenv
+import asyncio
+import functools
+import inspect
+import multiprocessing
+import os
+import threading
+import time
+
+from tracing import percentile
+
+load_dotenv()
+
+# Execution kinds
+ASYNC = "async"       # Coroutine functions, awaited on the event loop
+THREAD = "thread"     # Blocking I/O, run on the bounded thread pool
+PROCESS = "process"   # CPU-bound pure functions, run on the process pool
+KINDS = (ASYNC, THREAD, PROCESS)
+
+WAIT_WINDOW = 1000    # Wait times kept per pool for the percentiles
+
+@dataclass(frozen=True)
+class RegisteredCallable:
+    """A callable and the pool it was classified into"""
+    func: Callable
+    kind: str
+    name: str
+
+def classify(func: Callable) -> str:
+    """Async for coroutine functions (including partials of them), thread for everything else"""
+    target = func
+    while isinstance(target, functools.partial):
+        target = target.func
+    if inspect.iscoroutinefunction(target) or inspect.iscoroutinefunction(getattr(target, "__call__", None)):
+        return ASYNC
+    return THREAD
+
+def _run_timed(func: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Tuple[float, Any]:
+    """Run func in a worker, returning when it started so the caller can compute queue wait"""
+    return time.time(), func(*args, **kwargs)
+
+class PoolStats:
+    """Queue and wait time counters for one pool"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.wait_times: Deque[float] = deque(maxlen=WAIT_WINDOW)
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls submitted but still waiting for a free worker"""
+        return max(0, self.in_flight - self.workers) if self.workers else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        wait_times = sorted(self.wait_times)
+        return {
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "wait_seconds": {
+                "p50": percentile(wait_times, 0.5),
+                "p95": percentile(wait_times, 0.95),
+                "max": wait_times[-1] if wait_times else 0.0,
+            },
+        }
+
+class AgentExecutor:
+    """
+    Runs agent functions and other work on the right pool.
+
+    Callables are classified once, when registered (or on their first run):
+    coroutine functions are awaited on the event loop, blocking callables go
+    to a bounded thread pool and callables registered as PROCESS go to a
+    process pool so CPU-bound parsing runs across cores.
+    """
+
+    def __init__(self, max_threads: Optional[int] = None, max_processes: Optional[int] = None):
+        self.max_threads = max_threads or min(32, (os.cpu_count() or 1) + 4)
+        # 0 processes disables the process pool, PROCESS callables then run on threads
+        self.max_processes = (os.cpu_count() or 1) if max_processes is None else max_processes
+        self._lock = threading.Lock()
+        self._registry: Dict[Any, RegisteredCallable] = {}
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._stats = {
+            ASYNC: PoolStats(0),
+            THREAD: PoolStats(self.max_threads),
+            PROCESS: PoolStats(self.max_processes),
+        }
+
+    def register(self, func: Callable, kind: Optional[str] = None) -> RegisteredCallable:
+        """
+        Classify a callable once and remember the pool it runs on.
+
+        Args:
+            func: Function to run; PROCESS callables must be picklable module-level functions
+            kind: ASYNC, THREAD or PROCESS; inferred from the function when omitted
+        """
+        kind = kind or classify(func)
+        if kind not in KINDS:
+            raise ValueError(f"Unknown execution kind '{kind}', expected one of {', '.join(KINDS)}")
+        if kind == PROCESS and not self.max_processes:
+            kind = THREAD
+        registered = RegisteredCallable(func, kind, getattr(func, "__qualname__", repr(func)))
+        with self._lock:
+            self._registry[func] = registered
+        return registered
+
+    def _resolve(self, func: Callable) -> RegisteredCallable:
+        with self._lock:
+            registered = self._registry.get(func)
+        if registered is not None:
+            return registered
+        # Bound methods and lambdas are new objects on every call, classify them without keeping them
+        if inspect.ismethod(func) or getattr(func, "__name__", None) == "<lambda>":
+            return RegisteredCallable(func, classify(func), getattr(func, "__qualname__", repr(func)))
+        return self.register(func)
+
+    def _pool(self, kind: str) -> Executor:
+        with self._lock:
+            if kind == THREAD:
+                if self._thread_pool is None:
+                    self._thread_pool = ThreadPoolExecutor(self.max_threads, thread_name_prefix="agent-executor")
+                return self._thread_pool
+            if self._process_pool is None:
+                # spawn, because forking a process that already runs threads (HTTP pool, SQLite) is unsafe
+                self._process_pool = ProcessPoolExecutor(
+                    self.max_processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+
+    async def run(self, func: Callable, *args, timeout_seconds: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a callable on its pool and return its result.
+
+        Args:
+            func: Async function, blocking function or registered PROCESS function
+            timeout_seconds: Budget for the call; the caller stops waiting (and a queued
+                pool call is cancelled) once it runs out
+
+        Raises:
+            asyncio.TimeoutError: If the budget ran out
+        """
+        if timeout_seconds is not None:
+            if timeout_seconds <= 0:
+                raise asyncio.TimeoutError("no time budget left")
+            return await asyncio.wait_for(self.run(func, *args, **kwargs), timeout_seconds)
+
+        registered = self._resolve(func)
+        stats = self._stats[registered.kind]
+        with self._lock:
+            stats.submitted += 1
+            stats.in_flight += 1
+            stats.max_queue_depth = max(stats.max_queue_depth, stats.queue_depth)
+
+        try:
+            if registered.kind == ASYNC:
+                result = await func(*args, **kwargs)
+                wait_time = 0.0
+            else:
+                submitted_at = time.time()
+                loop = asyncio.get_running_loop()
+                started_at, result = await loop.run_in_executor(
+                    self._pool(registered.kind), _run_timed, func, args, kwargs
+                )
+                wait_time = max(0.0, started_at - submitted_at)
+                if inspect.iscoroutine(result):
+                    # A plain function returning a coroutine - await it here and keep it on the loop from now on
+                    self.register(func, ASYNC)
+                    result = await result
+        except BaseException:
+            with self._lock:
+                stats.in_flight -= 1
+                stats.failed += 1
+            raise
+
+        with self._lock:
+            stats.in_flight -= 1
+            stats.completed += 1
+            stats.wait_times.append(wait_time)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Submitted, in-flight, queue depth and wait time per pool"""
+        with self._lock:
+            return {kind: stats.to_dict() for kind, stats in self._stats.items()}
+
+    def render_prometheus(self) -> str:
+        """Render queue depth and wait times in the Prometheus text exposition format"""
+        stats = self.stats()
+        lines = [
+            "# HELP script_executor_queue_depth Calls waiting for a free worker",
+            "# TYPE script_executor_queue_depth gauge",
+        ]
+        lines += [f'script_executor_queue_depth{{pool="{kind}"}} {pool["queue_depth"]}' for kind, pool in stats.items()]
+        lines += [
+            "# HELP script_executor_in_flight Calls submitted and not finished",
+            "# TYPE script_executor_in_flight gauge",
+        ]
+        lines += [f'script_executor_in_flight{{pool="{kind}"}} {pool["in_flight"]}' for kind, pool in stats.items()]
+        lines += [
+            "# HELP script_executor_wait_seconds Time calls waited for a worker (rolling window)",
+            "# TYPE script_executor_wait_seconds summary",
+        ]
+        for kind, pool in stats.items():
+            lines.append(f'script_executor_wait_seconds{{pool="{kind}",quantile="0.5"}} {pool["wait_seconds"]["p50"]}')
+            lines.append(f'script_executor_wait_seconds{{pool="{kind}",quantile="0.95"}} {pool["wait_seconds"]["p95"]}')
+            lines.append(f'script_executor_wait_seconds_count{{pool="{kind}"}} {pool["completed"]}')
+        return "\n".join(lines) + "\n"
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools = [self._thread_pool, self._process_pool]
+            self._thread_pool = None
+            self._process_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait)
+
+_executor: Optional[AgentExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> AgentExecutor:
+    """Return the process-wide executor (sized by EXECUTOR_MAX_THREADS and EXECUTOR_MAX_PROCESSES)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_threads = os.getenv('EXECUTOR_MAX_THREADS')
+            max_processes = os.getenv('EXECUTOR_MAX_PROCESSES')
+            _executor = AgentExecutor(
+                max_threads=int(max_threads) if max_threads else None,
+                max_processes=int(max_processes) if max_processes else None
+            )
+        return _executor
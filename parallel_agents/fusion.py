@@ -0,0 +1,164 @@
+from pydantic import BaseModel, Field, create_model
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
+from dotenv import load_dotenv
+import json
+import os
+
+from agents.info_gathering_agent import RawScriptData
+from analysis_registry import ANALYSIS_SPECS, ALL_ANALYSES, AnalysisSpec, build_derived_inputs
+from script_stats import ScriptStatistics
+from utils import get_model
+
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
+
+load_dotenv()
+
+# Prompt
+fusion_preamble = """
+    You are a film production analysis expert performing several analyses of the same script in one pass.
+    The extracted script data is given once. Fill in every section of the output, following the
+    instructions for that section below. Keep the sections independent - do not merge or skip any.
+    """
+
+# Combined output type and agent - one per group, built on first use
+@lru_cache(maxsize=None)
+def fused_output_type(names: Tuple[str, ...]) -> Type[BaseModel]:
+    """Output model with one field per analysis in the group, holding that analysis' breakdown"""
+    specs = [ANALYSIS_SPECS[name] for name in names]
+    model_name = "".join(spec.output_type.__name__.replace("Breakdown", "") for spec in specs) + "Breakdown"
+    return create_model(
+        model_name,
+        __doc__=f"Combined {', '.join(spec.name for spec in specs)} analysis",
+        **{spec.name: (spec.output_type, Field(description=f"{spec.label} analysis")) for spec in specs}
+    )
+
+@lru_cache(maxsize=None)
+def fused_system_prompt(names: Tuple[str, ...]) -> str:
+    sections = [
+        f"\n    ## {ANALYSIS_SPECS[name].label} analysis (output field '{name}')\n{ANALYSIS_SPECS[name].system_prompt}"
+        for name in names
+    ]
+    return fusion_preamble + "".join(sections)
+
+@lru_cache(maxsize=None)
+def get_fused_agent(names: Tuple[str, ...]) -> "Agent":
+    """Build the agent for a fusion group on first use"""
+    from pydantic_ai import Agent
+
+    return Agent(
+        get_model(),
+        output_type=fused_output_type(names),
+        system_prompt=fused_system_prompt(names)
+    )
+
+# Fusion group
+@dataclass(frozen=True)
+class FusionGroup:
+    """
+    Several analyses served by one agent call.
+
+    Exposes the same attributes as AnalysisSpec where the workflow needs them
+    (name, label, analyze, output_type, system_prompt, model_name), so caching
+    and hedging treat a group like any other analysis.
+    """
+    names: Tuple[str, ...]
+
+    @property
+    def specs(self) -> List[AnalysisSpec]:
+        return [ANALYSIS_SPECS[name] for name in self.names]
+
+    @property
+    def name(self) -> str:
+        return "+".join(self.names)
+
+    @property
+    def label(self) -> str:
+        return " + ".join(spec.label for spec in self.specs)
+
+    @property
+    def icon(self) -> str:
+        return "".join(spec.icon for spec in self.specs)
+
+    @property
+    def node_name(self) -> str:
+        """Name of the graph node running the group"""
+        return f"{'_'.join(self.names)}_node"
+
+    @property
+    def input_fields(self) -> Tuple[str, ...]:
+        """RawScriptData fields any analysis in the group uses, in first-use order"""
+        return tuple(dict.fromkeys(field for spec in self.specs for field in spec.input_fields))
+
+    @property
+    def derived_inputs(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(key for spec in self.specs for key in spec.derived_inputs))
+
+    @property
+    def output_type(self) -> Type[BaseModel]:
+        return fused_output_type(self.names)
+
+    @property
+    def system_prompt(self) -> str:
+        return fused_system_prompt(self.names)
+
+    def get_agent(self) -> "Agent":
+        return get_fused_agent(self.names)
+
+    @property
+    def model_name(self) -> str:
+        return self.get_agent().model.model_name
+
+    def covers(self, requested: List[str]) -> bool:
+        """Whether every analysis in the group was requested; partly requested groups run separately"""
+        return set(self.names) <= set(requested)
+
+    def build_payload(self, raw_data: RawScriptData, statistics: Optional[ScriptStatistics] = None) -> str:
+        """Compact JSON of the fields the group uses, sent once for all of its analyses"""
+        data = raw_data.model_dump(mode="json")
+        projected = {field: data[field] for field in self.input_fields}
+        projected.update(build_derived_inputs(self.derived_inputs, statistics))
+        return json.dumps(projected, ensure_ascii=False, separators=(",", ":"))
+
+    async def analyze(self, raw_data: RawScriptData, payload: Optional[str] = None) -> BaseModel:
+        """Run every analysis in the group with one model call"""
+        return await self.get_agent().run(payload if payload is not None else self.build_payload(raw_data))
+
+    def split(self, result: BaseModel, statistics: Optional[ScriptStatistics] = None) -> Dict[str, Any]:
+        """Breakdown per analysis name from a combined result, finalized with the script statistics when given"""
+        breakdowns = {}
+        for spec in self.specs:
+            breakdown = getattr(result, spec.name)
+            if spec.finalize is not None and statistics is not None:
+                breakdown = spec.finalize(breakdown, statistics)
+            breakdowns[spec.name] = breakdown
+        return breakdowns
+
+def parse_fusion_groups(value: str) -> List[FusionGroup]:
+    """
+    Parse fusion groups such as "props+location,cost+timeline".
+
+    Raises:
+        ValueError: For unknown analyses, groups of one or analyses in two groups
+    """
+    groups = []
+    seen = set()
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        names = [name.strip() for name in item.split("+") if name.strip()]
+        unknown = set(names) - set(ANALYSIS_SPECS)
+        if unknown:
+            raise ValueError(f"Unknown analyses in fusion group '{item}': {sorted(unknown)}. Available: {list(ALL_ANALYSES)}")
+        if len(set(names)) < 2:
+            raise ValueError(f"Fusion group '{item}' needs at least two analyses")
+        if seen & set(names):
+            raise ValueError(f"Analyses {sorted(seen & set(names))} appear in more than one fusion group")
+        seen.update(names)
+        # Registry order, so "location+props" and "props+location" are the same group
+        groups.append(FusionGroup(tuple(name for name in ALL_ANALYSES if name in names)))
+    return groups
+
+def get_fusion_groups() -> List[FusionGroup]:
+    """Fusion groups configured by ANALYSIS_FUSION (e.g. "props+location,cost+timeline"); none by default"""
+    return parse_fusion_groups(os.getenv('ANALYSIS_FUSION', ''))
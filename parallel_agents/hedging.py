@@ -0,0 +1,196 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from dotenv import load_dotenv
+import asyncio
+import os
+import threading
+import time
+
+from tracing import current_span, percentile
+
+load_dotenv()
+
+DEFAULT_QUANTILE = 0.9          # Hedge once a call is slower than this share of recent calls
+DEFAULT_MIN_SAMPLES = 20        # Calls observed before an agent can be hedged
+DEFAULT_BUDGET = 0.05           # Share of an agent's calls that may be duplicated
+DEFAULT_MIN_DELAY_SECONDS = 0.5 # Never hedge earlier than this
+DEFAULT_WINDOW = 200            # Latencies kept per agent
+
+class AgentHedgeStats:
+    """Observed latencies and hedge counters for one agent"""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hedge_rate": self.hedges_fired / self.calls if self.calls else 0.0,
+        }
+
+class Hedger:
+    """
+    Speculative duplicate requests for slow agent calls.
+
+    A call that has not returned by the agent's observed latency quantile is
+    sent again; whichever copy finishes first wins and the other is cancelled.
+    Each agent may only duplicate a bounded share of its calls.
+    """
+
+    def __init__(
+        self,
+        quantile: float = DEFAULT_QUANTILE,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        budget: float = DEFAULT_BUDGET,
+        budgets: Optional[Dict[str, float]] = None,
+        min_delay_seconds: float = DEFAULT_MIN_DELAY_SECONDS,
+        window: int = DEFAULT_WINDOW
+    ):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.budget = budget
+        self.budgets = budgets or {}
+        self.min_delay_seconds = min_delay_seconds
+        self.window = window
+        self._lock = threading.Lock()
+        self._agents: Dict[str, AgentHedgeStats] = {}
+
+    def _stats(self, agent: str) -> AgentHedgeStats:
+        if agent not in self._agents:
+            self._agents[agent] = AgentHedgeStats(self.window)
+        return self._agents[agent]
+
+    def hedge_delay(self, agent: str) -> Optional[float]:
+        """Seconds to wait before hedging a call, or None while too few calls were observed"""
+        with self._lock:
+            latencies = sorted(self._stats(agent).latencies)
+        if len(latencies) < self.min_samples:
+            return None
+        return max(self.min_delay_seconds, percentile(latencies, self.quantile))
+
+    def _take_budget(self, agent: str) -> bool:
+        """Count a hedge against the agent's budget if it still has room"""
+        with self._lock:
+            stats = self._stats(agent)
+            if stats.hedges_fired + 1 > self.budgets.get(agent, self.budget) * stats.calls:
+                return False
+            stats.hedges_fired += 1
+            return True
+
+    def _record(self, agent: str, latency: float, hedge_won: bool = False) -> None:
+        with self._lock:
+            stats = self._stats(agent)
+            stats.latencies.append(latency)
+            stats.hedges_won += hedge_won
+
+    async def run(self, agent: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run an agent call, hedging it if it is slower than usual.
+
+        Args:
+            agent: Name the latency history and budget are kept under
+            call: Zero-argument coroutine function; called a second time for the hedge
+
+        Returns:
+            The result of whichever copy finished first successfully
+        """
+        with self._lock:
+            self._stats(agent).calls += 1
+        delay = self.hedge_delay(agent)
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(call())
+        hedge = None
+
+        try:
+            if delay is None:
+                result = await primary
+                self._record(agent, time.perf_counter() - start)
+                return result
+
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self._take_budget(agent):
+                result = await primary
+                self._record(agent, time.perf_counter() - start)
+                return result
+
+            print(f"🐢 {agent} slower than {delay:.2f}s, sending a hedged request")
+            hedge = asyncio.ensure_future(call())
+            span = current_span()
+            if span is not None:
+                span.hedged = True
+
+            # First successful copy wins; a copy that fails only loses if the other fails too
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    hedge_won = task is hedge
+                    # A hedge win still records the elapsed time, a lower bound of the primary's latency
+                    self._record(agent, time.perf_counter() - start, hedge_won)
+                    if span is not None:
+                        span.hedge_won = hedge_won
+                    return task.result()
+            raise error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, hedges fired and hedges won per agent"""
+        with self._lock:
+            return {agent: stats.to_dict() for agent, stats in self._agents.items()}
+
+    def render_prometheus(self) -> str:
+        """Render the hedge counters in the Prometheus text exposition format"""
+        stats = self.stats()
+        lines = []
+        for metric, key, help_text in (
+            ("script_agent_hedges_fired_total", "hedges_fired", "Duplicate requests sent for slow agent calls"),
+            ("script_agent_hedges_won_total", "hedges_won", "Hedged requests that finished before the original"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for agent, agent_stats in stats.items():
+                lines.append(f'{metric}{{agent="{agent}"}} {agent_stats[key]}')
+        return "\n".join(lines) + "\n"
+
+def parse_budgets(value: str) -> Dict[str, float]:
+    """Parse per-agent budgets such as "cost=0.1,timeline=0.02" """
+    budgets = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        agent, _, budget = item.partition("=")
+        budgets[agent.strip()] = float(budget)
+    return budgets
+
+_hedger: Optional[Hedger] = None
+
+def get_hedger() -> Optional[Hedger]:
+    """
+    Return the process-wide hedger, or None unless HEDGING_ENABLED is set.
+
+    Configured through HEDGE_QUANTILE, HEDGE_MIN_SAMPLES, HEDGE_BUDGET,
+    HEDGE_BUDGETS (per agent, e.g. "cost=0.1,timeline=0.02") and
+    HEDGE_MIN_DELAY_SECONDS.
+    """
+    global _hedger
+    if os.getenv('HEDGING_ENABLED', '0').lower() in ('0', 'false', 'no', ''):
+        return None
+    if _hedger is None:
+        _hedger = Hedger(
+            quantile=float(os.getenv('HEDGE_QUANTILE', DEFAULT_QUANTILE)),
+            min_samples=int(os.getenv('HEDGE_MIN_SAMPLES', DEFAULT_MIN_SAMPLES)),
+            budget=float(os.getenv('HEDGE_BUDGET', DEFAULT_BUDGET)),
+            budgets=parse_budgets(os.getenv('HEDGE_BUDGETS', '')),
+            min_delay_seconds=float(os.getenv('HEDGE_MIN_DELAY_SECONDS', DEFAULT_MIN_DELAY_SECONDS))
+        )
+    return _hedger
@@ -0,0 +1,140 @@
+from pydantic import BaseModel, Field
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+import re
+
+# Languages in tie-break order - Malay before Indonesian, as the two share most function words
+LANGUAGES = ("English", "Malay", "Indonesian", "Tamil", "Chinese")
+DEFAULT_LANGUAGE = "English"
+BLOCK_CHARS = 64 * 1024     # Text tokenized at a time, so long scripts are never lowercased whole
+
+# Function words per language. Words several languages share count for each of
+# them, so Malay and Indonesian are told apart by the words only one of them uses.
+# Romanized Chinese (Hanyu Pinyin) leaves out syllables that are also English
+# words ("he", "you", "men", "women").
+STOP_WORDS: Dict[str, Tuple[str, ...]] = {
+    "English": (
+        "the", "and", "to", "of", "a", "is", "in", "you", "that", "it", "i", "with", "for", "this",
+        "on", "are", "was", "what", "he", "she", "we", "they", "my", "your", "not", "be", "have",
+        "do", "at", "me", "but", "his", "her", "just", "there", "from", "here", "get", "know",
+    ),
+    "Malay": (
+        "yang", "dan", "dengan", "untuk", "adalah", "ini", "itu", "saya", "di", "ke", "ada", "tidak",
+        "akan", "dia", "kita", "kami", "sudah", "belum", "mereka", "apa", "juga", "pergi",
+        "awak", "tak", "boleh", "sahaja", "kerana", "mahu", "hendak", "kereta", "macam", "sikit",
+        "lah", "betul", "pun", "encik", "cik", "abang", "nak", "tu",
+    ),
+    "Indonesian": (
+        "yang", "dan", "dengan", "untuk", "adalah", "ini", "itu", "saya", "di", "ke", "ada", "tidak",
+        "akan", "dia", "kita", "kami", "sudah", "belum", "mereka", "apa", "juga", "pergi",
+        "kamu", "bisa", "saja", "karena", "mau", "nggak", "gak", "banget", "mobil", "gimana",
+        "aja", "dong", "kok", "sih", "bapak", "ibu", "kenapa", "sekali",
+    ),
+    "Tamil": (
+        "naan", "nee", "neenga", "avan", "aval", "avanga", "enna", "illa", "illai", "inga", "anga",
+        "romba", "oru", "seri", "sari", "vaa", "poo", "vandhu", "irukku", "irukken", "theriyum",
+        "sollu", "pannu", "ennoda", "unnoda", "amma", "appa", "yen", "eppadi", "ippo",
+    ),
+    "Chinese": (
+        "de", "shi", "bu", "wo", "ni", "ta", "le", "zai", "zhe", "na", "hen", "ma", "ne", "ba",
+        "dou", "ye", "jiu", "hai", "mei", "shenme", "meiyou", "zhege", "nage", "nimen", "tamen",
+        "xiexie", "duibuqi", "zenme", "weishenme", "keyi", "zhidao", "xianzai", "dajia", "haode",
+    ),
+}
+
+# Precomputed lookup: token -> indices of the languages it counts for
+LOOKUP: Dict[str, Tuple[int, ...]] = {}
+for _index, _language in enumerate(LANGUAGES):
+    for _word in STOP_WORDS[_language]:
+        LOOKUP[_word] = LOOKUP.get(_word, ()) + (_index,)
+
+TAMIL = LANGUAGES.index("Tamil")
+CHINESE = LANGUAGES.index("Chinese")
+
+# Latin words (with accented and tone-marked letters), runs of Tamil script, single Han characters
+TOKEN_PATTERN = re.compile(r"[a-z\u00e0-\u024f]+|[\u0b80-\u0bff]+|[\u4e00-\u9fff]")
+
+# Pinyin tone marks folded away, so "nǐ hǎo" matches like "ni hao"
+TONE_FOLD = str.maketrans("āáǎàēéěèīíǐìōóǒòūúǔùǖǘǚǜü", "aaaaeeeeiiiioooouuuuuuuuu")
+
+# State/Output
+class LanguageDetection(BaseModel):
+    """Primary language of a text and the share of function-word hits per language"""
+    language: str = Field(description='Language with the most hits, DEFAULT_LANGUAGE when there are none')
+    confidence: float = Field(description="The language's share of all hits, 0 to 1")
+    scores: Dict[str, float] = Field(description='Share of all hits per language, in LANGUAGES order')
+    tokens: int = Field(description='Words scanned')
+    hits: int = Field(description='Words found in a function-word list or written in Tamil or Han script')
+
+class LanguageCounter:
+    """
+    Function-word counts over text fed in pieces.
+
+    Each piece is lowercased and split on whitespace once, and the chunks are
+    counted with a Counter. Only distinct chunks are then tokenized (dropping
+    punctuation, splitting Han text into characters) and looked up, so the
+    per-word work does not grow with the length of the script. A chunk cut
+    off at the end of a piece is carried over to the next one.
+    """
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self._carry = ""
+
+    def feed(self, text: str) -> None:
+        text = self._carry + text
+        cut = max(text.rfind(" "), text.rfind("\n")) + 1
+        self._carry = text[cut:]
+        self.counts.update(text[:cut].lower().split())
+
+    def result(self) -> LanguageDetection:
+        if self._carry:
+            self.counts.update(self._carry.lower().split())
+            self._carry = ""
+
+        hits = [0] * len(LANGUAGES)
+        tokens = 0
+        matched = 0
+        for chunk, count in self.counts.items():
+            for token in TOKEN_PATTERN.findall(chunk):
+                tokens += count
+                first = token[0]
+                if "\u0b80" <= first <= "\u0bff":
+                    languages = (TAMIL,)
+                elif "\u4e00" <= first <= "\u9fff":
+                    languages = (CHINESE,)
+                else:
+                    languages = LOOKUP.get(token if token.isascii() else token.translate(TONE_FOLD), ())
+                if languages:
+                    matched += count
+                for index in languages:
+                    hits[index] += count
+
+        total = sum(hits)
+        if not total:
+            return LanguageDetection(
+                language=DEFAULT_LANGUAGE,
+                confidence=0.0,
+                scores={language: 0.0 for language in LANGUAGES},
+                tokens=tokens,
+                hits=0
+            )
+        best = max(range(len(LANGUAGES)), key=lambda index: (hits[index], -index))
+        return LanguageDetection(
+            language=LANGUAGES[best],
+            confidence=round(hits[best] / total, 4),
+            scores={language: round(hits[index] / total, 4) for index, language in enumerate(LANGUAGES)},
+            tokens=tokens,
+            hits=matched
+        )
+
+def detect_language(text: str, block_chars: int = BLOCK_CHARS) -> LanguageDetection:
+    """Detect the primary language of a script in one pass over its text"""
+    return detect_language_stream(text[start:start + block_chars] for start in range(0, len(text), block_chars))
+
+def detect_language_stream(pieces: Iterable[str]) -> LanguageDetection:
+    """Detect the primary language of text read in pieces, e.g. a file read in blocks"""
+    counter = LanguageCounter()
+    for piece in pieces:
+        counter.feed(piece)
+    return counter.result()
@@ -0,0 +1,298 @@
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Optional
+from dotenv import load_dotenv
+import asyncio
+import json
+import os
+import threading
+import time
+
+from agents.info_gathering_agent import CHARS_PER_TOKEN
+from tracing import QUANTILES, current_span, percentile
+
+load_dotenv()
+
+# Defaults match the gemini-2.0-flash tier 1 quota; set them to your project's limits
+DEFAULT_REQUESTS_PER_MINUTE = 2000
+DEFAULT_TOKENS_PER_MINUTE = 4_000_000
+DEFAULT_BURST_SECONDS = 10.0        # Bucket size, in seconds of quota that may be spent at once
+DEFAULT_OUTPUT_TOKENS = 1000        # Response tokens assumed per request until usage is known
+DEFAULT_WINDOW = 1000               # Waits kept for the rolling percentiles
+
+class TokenBucket:
+    """
+    Capacity refilled continuously at rate_per_minute.
+
+    The level may go below zero when a request turns out larger than estimated;
+    later requests then wait until the debt is paid back.
+    """
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.clock = clock
+        self.level = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until amount is available; amounts above the capacity only need a full bucket"""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+@dataclass(eq=False)
+class _Waiter:
+    tokens: int
+    loop: asyncio.AbstractEventLoop
+    turn: asyncio.Future = field(repr=False)
+
+class RateLimiter:
+    """
+    Process-wide token buckets on requests and tokens per minute, with a FIFO queue.
+
+    Every model request takes one request and its estimated tokens. Requests
+    are served strictly in arrival order: a large request at the head of the
+    queue is not overtaken by smaller ones behind it, so no workflow starves.
+    Once the response arrives the estimate is corrected with the usage the
+    model reported.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+        burst_seconds: float = DEFAULT_BURST_SECONDS,
+        output_tokens: int = DEFAULT_OUTPUT_TOKENS,
+        window: int = DEFAULT_WINDOW,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.output_tokens = output_tokens
+        self._requests = TokenBucket(requests_per_minute, burst_seconds, clock)
+        self._tokens = TokenBucket(tokens_per_minute, burst_seconds, clock)
+        self._lock = threading.Lock()
+        self._queue: Deque[_Waiter] = deque()
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._counters = {
+            "requests": 0,
+            "delayed": 0,
+            "wait_seconds": 0.0,
+            "estimated_tokens": 0,
+            "reported_tokens": 0,
+            "max_queue_depth": 0,
+        }
+
+    def reset(self) -> None:
+        """Refill the buckets and zero the counters"""
+        with self._lock:
+            self._requests.level = self._requests.capacity
+            self._tokens.level = self._tokens.capacity
+            self._waits.clear()
+            self._counters.update({key: 0 for key in self._counters})
+
+    def estimate_tokens(self, messages: Any, model_settings: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Tokens a request will count against the quota: its prompt (system prompt,
+        instructions and the serialized script data, at CHARS_PER_TOKEN) plus the
+        response, taken as max_tokens when set and output_tokens otherwise
+        """
+        prompt_chars = 0
+        for message in messages:
+            for part in message.parts:
+                content = getattr(part, "content", "")
+                prompt_chars += len(content if isinstance(content, str) else json.dumps(content, default=str))
+        max_tokens = (model_settings or {}).get("max_tokens")
+        return prompt_chars // CHARS_PER_TOKEN + (max_tokens or self.output_tokens)
+
+    def _wake_head(self) -> None:
+        # Caller holds the lock
+        if self._queue:
+            head = self._queue[0]
+            head.loop.call_soon_threadsafe(_set_turn, head.turn)
+
+    def _leave(self, waiter: _Waiter) -> None:
+        with self._lock:
+            was_head = bool(self._queue) and self._queue[0] is waiter
+            try:
+                self._queue.remove(waiter)
+            except ValueError:
+                return
+            if was_head:
+                self._wake_head()
+
+    async def acquire(self, tokens: int) -> float:
+        """
+        Wait for one request and tokens worth of quota, in arrival order.
+
+        Returns:
+            Seconds spent waiting
+        """
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(tokens, loop, loop.create_future())
+        start = time.perf_counter()
+        with self._lock:
+            self._queue.append(waiter)
+            self._counters["max_queue_depth"] = max(self._counters["max_queue_depth"], len(self._queue))
+            if self._queue[0] is waiter:
+                waiter.turn.set_result(None)
+
+        try:
+            # Only the head of the queue watches the buckets
+            await waiter.turn
+            while True:
+                with self._lock:
+                    delay = max(self._requests.time_until(1), self._tokens.time_until(tokens))
+                    if delay <= 0:
+                        self._requests.take(1)
+                        self._tokens.take(tokens)
+                        self._queue.popleft()
+                        self._wake_head()
+                        break
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._leave(waiter)
+            raise
+
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._waits.append(waited)
+            self._counters["requests"] += 1
+            self._counters["delayed"] += waited > 0.001
+            self._counters["wait_seconds"] += waited
+            self._counters["estimated_tokens"] += tokens
+        return waited
+
+    def settle(self, estimated_tokens: int, reported_tokens: Optional[int]) -> None:
+        """Correct a request's estimate with the tokens the model reported"""
+        if not reported_tokens:
+            return
+        with self._lock:
+            self._counters["reported_tokens"] += reported_tokens
+            difference = reported_tokens - estimated_tokens
+            if difference > 0:
+                self._tokens.take(difference)
+            else:
+                self._tokens.give_back(-difference)
+
+    def release(self, tokens: int) -> None:
+        """Give back the quota of a request that never reached the provider"""
+        with self._lock:
+            self._requests.give_back(1)
+            self._tokens.give_back(tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """Configured quota, queue depth, wait percentiles and token counters"""
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "queue_depth": len(self._queue),
+                **{f"wait_p{int(quantile * 100)}_seconds": percentile(waits, quantile) for quantile in QUANTILES},
+                **self._counters,
+            }
+
+    def render_prometheus(self) -> str:
+        """Render wait times, queue depth and quota use in the Prometheus text exposition format"""
+        stats = self.stats()
+        metric = "script_rate_limit_wait_seconds"
+        lines = [
+            f"# HELP {metric} Time model requests waited for rate limit quota (rolling window)",
+            f"# TYPE {metric} summary",
+        ]
+        lines.extend(
+            f'{metric}{{quantile="{quantile}"}} {stats[f"wait_p{int(quantile * 100)}_seconds"]:.4f}'
+            for quantile in QUANTILES
+        )
+        lines.append(f"{metric}_sum {stats['wait_seconds']:.4f}")
+        lines.append(f"{metric}_count {stats['requests']}")
+        for name, kind, value, help_text in (
+            ("script_rate_limit_queue_depth", "gauge", stats["queue_depth"], "Model requests waiting for quota"),
+            ("script_rate_limit_max_queue_depth", "gauge", stats["max_queue_depth"], "Longest queue seen"),
+            ("script_rate_limit_requests_per_minute", "gauge", stats["requests_per_minute"], "Configured request quota"),
+            ("script_rate_limit_tokens_per_minute", "gauge", stats["tokens_per_minute"], "Configured token quota"),
+            ("script_rate_limit_delayed_total", "counter", stats["delayed"], "Model requests that had to wait"),
+            ("script_rate_limit_estimated_tokens_total", "counter", stats["estimated_tokens"], "Tokens estimated before sending"),
+            ("script_rate_limit_reported_tokens_total", "counter", stats["reported_tokens"], "Tokens reported by the model"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+def _set_turn(turn: asyncio.Future) -> None:
+    if not turn.done():
+        turn.set_result(None)
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Return the process-wide rate limiter, or None unless RATE_LIMIT_ENABLED is set.
+
+    Configured through RATE_LIMIT_RPM, RATE_LIMIT_TPM, RATE_LIMIT_BURST_SECONDS
+    and RATE_LIMIT_OUTPUT_TOKENS.
+    """
+    global _rate_limiter
+    if os.getenv('RATE_LIMIT_ENABLED', '0').lower() in ('0', 'false', 'no', ''):
+        return None
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                requests_per_minute=float(os.getenv('RATE_LIMIT_RPM', DEFAULT_REQUESTS_PER_MINUTE)),
+                tokens_per_minute=float(os.getenv('RATE_LIMIT_TPM', DEFAULT_TOKENS_PER_MINUTE)),
+                burst_seconds=float(os.getenv('RATE_LIMIT_BURST_SECONDS', DEFAULT_BURST_SECONDS)),
+                output_tokens=int(os.getenv('RATE_LIMIT_OUTPUT_TOKENS', DEFAULT_OUTPUT_TOKENS))
+            )
+        return _rate_limiter
+
+# Model
+def rate_limit_model(model):
+    """Wrap a pydantic-ai model so its requests wait for quota from the shared rate limiter"""
+    return _rate_limited_model_class()(model)
+
+@lru_cache(maxsize=None)
+def _rate_limited_model_class():
+    # Built on first use so importing this module does not load pydantic-ai
+    from pydantic_ai.models.wrapper import WrapperModel
+    from circuit_breaker import CircuitOpenError, circuit_is_open
+
+    class RateLimitedModel(WrapperModel):
+        """Model wrapper holding each request until the quota allows it"""
+
+        async def request(self, messages, model_settings, *args, **kwargs):
+            limiter = get_rate_limiter()
+            # Requests the circuit breaker is about to reject do not queue for quota
+            if limiter is None or circuit_is_open(self):
+                return await super().request(messages, model_settings, *args, **kwargs)
+            tokens = limiter.estimate_tokens(messages, model_settings)
+            waited = await limiter.acquire(tokens)
+            span = current_span()
+            if span is not None:
+                span.rate_limit_wait_seconds += waited
+            try:
+                response = await super().request(messages, model_settings, *args, **kwargs)
+            except CircuitOpenError:
+                limiter.release(tokens)
+                raise
+            limiter.settle(tokens, response.usage.total_tokens)
+            return response
+
+    return RateLimitedModel
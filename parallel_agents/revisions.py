@@ -0,0 +1,302 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+import asyncio
+import difflib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from agents.info_gathering_agent import (
+    RawScriptData,
+    detect_script_language,
+    extract_script_data,
+    merge_raw_script_data,
+    raw_data_from_parsed_script,
+)
+from agents_graph2 import ScriptAnalysisState, analyze_script_workflow, build_initial_state
+from analysis_registry import ANALYSIS_SPECS, build_analysis_inputs, resolve_analyses
+from blob_store import pinned
+from executor import get_executor
+from script_parser import ParsedScript, parse_script
+from script_stats import compute_script_statistics
+
+load_dotenv()
+
+DEFAULT_REVISION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "revisions.sqlite3")
+MAX_CONCURRENT_SCENE_EXTRACTIONS = 4
+
+executor = get_executor()
+
+# State/Output
+class RevisionReport(BaseModel):
+    """What changed between two drafts and what had to be recomputed"""
+    script_id: str = Field(description='Identifier the drafts are stored under')
+    previous_revision_found: bool = Field(description='Whether a previous draft was stored')
+    scenes_total: int = Field(description='Scenes in the new draft (including any preamble)')
+    scenes_unchanged: int = Field(description='Scenes identical to a scene of the previous draft')
+    scenes_added: List[str] = Field(description='Headings of new or modified scenes')
+    scenes_removed: List[str] = Field(description='Headings of scenes no longer in the draft')
+    scenes_reextracted: int = Field(description='Scenes sent through extraction again')
+    analyses_rerun: List[str] = Field(description='Analyses whose projected input changed')
+    analyses_reused: List[str] = Field(description='Analyses carried over from the previous draft')
+    elapsed_seconds: float = Field(description='Wall time of the incremental run')
+
+class SceneUnit(BaseModel):
+    """A slice of the script diffed as one unit"""
+    heading: str
+    text: str
+    content_hash: str
+
+# Scene splitting
+def split_into_scene_units(script_content: str, parsed_script: ParsedScript) -> List[SceneUnit]:
+    """Slice the script into scenes (plus any text before the first heading) with content hashes"""
+    slices = []
+    if parsed_script.scenes:
+        first_offset = parsed_script.scenes[0].start_offset
+        if script_content[:first_offset].strip():
+            slices.append(("(preamble)", script_content[:first_offset]))
+        for scene in parsed_script.scenes:
+            slices.append((scene.heading, script_content[scene.start_offset:scene.end_offset]))
+    elif script_content.strip():
+        slices.append(("(whole script)", script_content))
+
+    return [
+        SceneUnit(heading=heading, text=text, content_hash=_scene_hash(text))
+        for heading, text in slices
+    ]
+
+def _scene_hash(text: str) -> str:
+    """Hash a scene ignoring trailing whitespace, so reflowed blank space is not a change"""
+    normalized = "\n".join(line.rstrip() for line in text.strip().splitlines())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+# Revision store
+class RevisionStore:
+    """SQLite store of the latest draft per script and of per-scene extraction results"""
+
+    def __init__(self, path: str = DEFAULT_REVISION_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS revisions (
+                script_id TEXT PRIMARY KEY,
+                scene_hashes TEXT NOT NULL,
+                scene_headings TEXT NOT NULL,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scene_extractions (
+                content_hash TEXT PRIMARY KEY,
+                raw_data TEXT NOT NULL
+            )
+            """
+        )
+
+    def load_revision(self, script_id: str) -> Optional[Tuple[List[str], List[str], ScriptAnalysisState]]:
+        """Return (scene hashes, scene headings, state) of the stored draft"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT scene_hashes, scene_headings, state FROM revisions WHERE script_id = ?", (script_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        scene_hashes, scene_headings, state = row
+        return json.loads(scene_hashes), json.loads(scene_headings), ScriptAnalysisState.model_validate_json(state)
+
+    def save_revision(self, script_id: str, units: List[SceneUnit], state: ScriptAnalysisState) -> None:
+        """Replace the stored draft of a script"""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO revisions (script_id, scene_hashes, scene_headings, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    script_id,
+                    json.dumps([unit.content_hash for unit in units]),
+                    json.dumps([unit.heading for unit in units]),
+                    state.model_dump_json(),
+                    time.time()
+                )
+            )
+
+    def load_scene_extractions(self, content_hashes: Iterable[str]) -> Dict[str, RawScriptData]:
+        """Return the stored per-scene extraction results for the given hashes"""
+        content_hashes = list(set(content_hashes))
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit on long scripts
+            for i in range(0, len(content_hashes), 500):
+                batch = content_hashes[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT content_hash, raw_data FROM scene_extractions WHERE content_hash IN ({placeholders})", batch
+                ).fetchall()
+                for content_hash, raw_data in rows:
+                    found[content_hash] = RawScriptData.model_validate_json(raw_data)
+        return found
+
+    def save_scene_extractions(self, extractions: Dict[str, RawScriptData]) -> None:
+        """Store per-scene extraction results by content hash"""
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO scene_extractions (content_hash, raw_data) VALUES (?, ?)",
+                [(content_hash, raw_data.model_dump_json()) for content_hash, raw_data in extractions.items()]
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+_revision_store: Optional[RevisionStore] = None
+
+def get_revision_store() -> RevisionStore:
+    """Return the process-wide revision store (path from REVISION_STORE_PATH)"""
+    global _revision_store
+    if _revision_store is None:
+        _revision_store = RevisionStore(os.getenv('REVISION_STORE_PATH', DEFAULT_REVISION_PATH))
+    return _revision_store
+
+# Incremental extraction
+async def extract_scene_units(units: List[SceneUnit], structured: bool) -> Dict[str, RawScriptData]:
+    """Extract raw data for each scene unit, deterministically when the script is in screenplay format"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCENE_EXTRACTIONS)
+
+    async def extract_unit(unit: SceneUnit) -> Tuple[str, RawScriptData]:
+        if structured:
+            language = await detect_script_language(unit.text)
+            return unit.content_hash, raw_data_from_parsed_script(parse_script(unit.text), unit.text, language)
+        async with semaphore:
+            return unit.content_hash, await extract_script_data(unit.text)
+
+    results = await asyncio.gather(*(extract_unit(unit) for unit in units))
+    return dict(results)
+
+def diff_scenes(previous_hashes: List[str], previous_headings: List[str], units: List[SceneUnit]) -> Tuple[List[str], List[str]]:
+    """Return the headings of added/modified and of removed scenes between two drafts"""
+    matcher = difflib.SequenceMatcher(a=previous_hashes, b=[unit.content_hash for unit in units], autojunk=False)
+    added = []
+    removed = []
+    for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+        if tag in ("replace", "delete"):
+            removed.extend(previous_headings[a_start:a_end])
+        if tag in ("replace", "insert"):
+            added.extend(unit.heading for unit in units[b_start:b_end])
+    return added, removed
+
+async def run_incremental_analysis(
+    script_id: str,
+    script_content: str,
+    analyses: Optional[Iterable[str]] = None,
+    store: Optional[RevisionStore] = None
+) -> Tuple[ScriptAnalysisState, RevisionReport]:
+    """
+    Analyze a new draft of a script, recomputing only what changed since the stored draft.
+
+    Scenes are diffed by content hash. Only new or modified scenes are extracted
+    again, the stored RawScriptData is rebuilt from the per-scene results, and
+    only analyses whose projected input changed are sent to their agents.
+
+    Args:
+        script_id: Stable identifier for the script across drafts
+        script_content: Full text of the new draft
+        analyses: Names of the analyses to run; None runs all
+        store: Revision store to use; defaults to the process-wide store
+
+    Returns:
+        Tuple of the merged ScriptAnalysisState and a RevisionReport
+    """
+    store = store or get_revision_store()
+    requested = resolve_analyses(analyses)
+    start_time = time.perf_counter()
+
+    parsed_script = parse_script(script_content)
+    units = split_into_scene_units(script_content, parsed_script)
+    previous = await executor.run(store.load_revision, script_id)
+
+    # Re-extract only scenes without a stored extraction
+    known = await executor.run(store.load_scene_extractions, [unit.content_hash for unit in units])
+    changed_units = [unit for unit in units if unit.content_hash not in known]
+    if changed_units:
+        extracted = await extract_scene_units(changed_units, parsed_script.is_structured)
+        await executor.run(store.save_scene_extractions, extracted)
+        known.update(extracted)
+
+    # Page and scene counts come from the whole draft, as in a full run - per-scene
+    # page estimates are rounded up and would add up to at least a page per scene
+    raw_data = merge_raw_script_data(
+        [known[unit.content_hash] for unit in units],
+        script_length=len(script_content),
+        estimated_pages=parsed_script.estimated_pages,
+        scene_count=len(parsed_script.scenes)
+    )
+
+    # Re-run only analyses whose projected input changed or that have no previous result
+    inputs, _ = build_analysis_inputs(raw_data, requested, compute_script_statistics(parsed_script))
+    previous_state = previous[2] if previous else None
+    rerun = []
+    reused = []
+    for name in requested:
+        spec = ANALYSIS_SPECS[name]
+        if (
+            previous_state is not None
+            and previous_state.analyses_complete.get(name)
+            and getattr(previous_state, spec.state_field) is not None
+            and previous_state.analysis_inputs.get(name) == inputs[name]
+        ):
+            reused.append(name)
+        else:
+            rerun.append(name)
+
+    initial_state = build_initial_state(script_content, rerun).model_copy(update={
+        "raw_data": raw_data,
+        "extraction_complete": True
+    })
+    with pinned(initial_state.script):
+        result = await analyze_script_workflow.ainvoke(initial_state)
+    final_state = ScriptAnalysisState.model_validate(result)
+
+    # Carry unchanged results over from the previous draft
+    update = {
+        "requested_analyses": requested,
+        "analyses_complete": {
+            name: name in reused or final_state.analyses_complete.get(name, False) for name in requested
+        },
+        "analysis_inputs": {**final_state.analysis_inputs, **{name: inputs[name] for name in reused}}
+    }
+    for name in reused:
+        field = ANALYSIS_SPECS[name].state_field
+        update[field] = getattr(previous_state, field)
+    final_state = final_state.model_copy(update=update)
+
+    if previous:
+        added, removed = diff_scenes(previous[0], previous[1], units)
+    else:
+        added, removed = [unit.heading for unit in units], []
+
+    report = RevisionReport(
+        script_id=script_id,
+        previous_revision_found=previous is not None,
+        scenes_total=len(units),
+        scenes_unchanged=len(units) - len(added),
+        scenes_added=added,
+        scenes_removed=removed,
+        scenes_reextracted=len(changed_units),
+        analyses_rerun=rerun,
+        analyses_reused=reused,
+        elapsed_seconds=round(time.perf_counter() - start_time, 3)
+    )
+    final_state.processing_metadata["revision_report"] = report.model_dump()
+
+    await executor.run(store.save_revision, script_id, units, final_state)
+    return final_state, report
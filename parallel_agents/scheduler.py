@@ -0,0 +1,426 @@
+from collections import Counter
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+import os
+
+from script_stats import MAX_SUMMARY_LOCATIONS, ScriptStatistics, format_eighths
+
+load_dotenv()
+
+DEFAULT_PAGES_PER_DAY = 5.0     # Typical feature film pace
+MAX_SEARCH_PASSES = 10          # Local search stops earlier once a pass finds no improvement
+
+# Relative costs the scheduler minimizes
+DAY_COST = 100                  # Every shoot day
+COMPANY_MOVE_COST = 30          # Every extra location visited on a day
+DAY_NIGHT_SWITCH_COST = 40      # Day and night scenes on the same day
+CAST_DAY_COST = 2               # Every speaking actor called on a day
+
+# State/Output
+class ScheduledSetup(BaseModel):
+    """Scenes sharing a location, interior/exterior and day/night, which shoot under one lighting setup"""
+    location: str = Field(description='Location, upper-cased')
+    interior: str = Field(description='INT, EXT or INT/EXT')
+    night: bool = Field(description='Night setup')
+    scene_numbers: List[int] = Field(description='Scenes in the setup, in script order')
+    page_eighths: int = Field(description='Total length in eighths of a page')
+    days: List[int] = Field(description='Shoot days the setup is scheduled on')
+
+    @property
+    def label(self) -> str:
+        return f"{self.location} ({self.interior} {'NIGHT' if self.night else 'DAY'})"
+
+class ShootDay(BaseModel):
+    """One shoot day of the schedule"""
+    day: int = Field(description='1-based shoot day')
+    scene_numbers: List[int] = Field(description='Scenes shot on the day, grouped by setup')
+    locations: List[str] = Field(description='Locations visited, in shooting order')
+    page_eighths: int = Field(description='Pages shot, in eighths')
+    night_scenes: int = Field(description='Night scenes shot on the day')
+    cast: List[str] = Field(description='Speaking characters called')
+
+class ShootingSchedule(BaseModel):
+    """Shoot days packed under a pages-per-day limit"""
+    pages_per_day: float = Field(description='Daily page limit the days were packed under')
+    total_eighths: int = Field(description='Script length in eighths of a page')
+    days: List[ShootDay] = Field(description='Shoot days in shooting order')
+    setups: List[ScheduledSetup] = Field(description='Setups in shooting order')
+    company_moves: int = Field(description='Location changes within a day, summed over all days')
+    day_night_switches: int = Field(description='Days mixing day and night scenes')
+    cost: int = Field(description='Value of the objective the schedule minimizes')
+
+    def shooting_schedule_estimate(self) -> List[str]:
+        """Overall estimate followed by the days each setup needs"""
+        lines = [
+            f"{_plural(len(self.days), 'shoot day')} for {format_eighths(self.total_eighths)} pages at up to "
+            f"{self.pages_per_day:g} pages per day ({_plural(self.company_moves, 'company move')}, "
+            f"{_plural(self.day_night_switches, 'day')} mixing day and night work)"
+        ]
+        lines.extend(
+            f"{setup.label}: {format_eighths(setup.page_eighths)} pages, {_plural(len(setup.scene_numbers), 'scene')} - "
+            f"day{'s' if len(setup.days) > 1 else ''} {format_day_ranges(setup.days)}"
+            for setup in self.setups
+        )
+        return lines
+
+    def scene_grouping_recommendations(self) -> List[str]:
+        """The scenes to shoot together on each day"""
+        limit = round(self.pages_per_day * 8)
+        return [
+            f"Day {day.day}: scenes {', '.join(map(str, day.scene_numbers))} - {' / '.join(day.locations)}, "
+            f"{format_eighths(day.page_eighths)} pages{' (over the daily limit)' if day.page_eighths > limit else ''}"
+            f"{', night' if day.night_scenes == len(day.scene_numbers) else ', day and night' if day.night_scenes else ''}"
+            f"{', cast: ' + ', '.join(day.cast) if day.cast else ''}"
+            for day in self.days
+        ]
+
+    def location_shooting_order(self) -> List[str]:
+        """Locations in the order they are first shot, with the days spent there"""
+        days_by_location: Dict[str, List[int]] = {}
+        for day in self.days:
+            for location in day.locations:
+                days_by_location.setdefault(location, []).append(day.day)
+        return [
+            f"{position}. {location} - day{'s' if len(days) > 1 else ''} {format_day_ranges(days)}"
+            for position, (location, days) in enumerate(days_by_location.items(), 1)
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact view of the schedule for agent payloads; the full schedule grows with the scene count"""
+        limit = round(self.pages_per_day * 8)
+        return {
+            "shoot_days": len(self.days),
+            "pages_per_day": self.pages_per_day,
+            "company_moves": self.company_moves,
+            "days_mixing_day_and_night": self.day_night_switches,
+            "days_over_page_limit": [day.day for day in self.days if day.page_eighths > limit],
+            "location_order": self.location_shooting_order()[:MAX_SUMMARY_LOCATIONS],
+        }
+
+    def timeline_fields(self) -> Dict[str, List[str]]:
+        """The TimelineBreakdown fields the schedule provides"""
+        return {
+            "shooting_schedule_estimate": self.shooting_schedule_estimate(),
+            "scene_grouping_recommendations": self.scene_grouping_recommendations(),
+            "location_shooting_order": self.location_shooting_order(),
+        }
+
+def _plural(count: int, noun: str) -> str:
+    return f"{count} {noun}{'' if count == 1 else 's'}"
+
+def format_day_ranges(days: Iterable[int]) -> str:
+    """Compact day list, e.g. [1, 2, 3, 5] -> "1-3, 5" """
+    ranges: List[List[int]] = []
+    for day in sorted(set(days)):
+        if ranges and day == ranges[-1][1] + 1:
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return ", ".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+def schedule_pages_per_day() -> float:
+    """Daily page limit from SCHEDULE_PAGES_PER_DAY"""
+    return float(os.getenv('SCHEDULE_PAGES_PER_DAY', DEFAULT_PAGES_PER_DAY))
+
+
+# Search state
+class _Scenes:
+    """Per-scene columns the search reads, and the setup of each scene"""
+
+    def __init__(self, statistics: ScriptStatistics):
+        self.numbers = statistics.scene_numbers
+        self.eighths = statistics.page_eighths
+        self.location = statistics.locations
+        self.night = [int(night) for night in statistics.is_night]
+        self.cast = [tuple(dict.fromkeys(names)) for names in statistics.cast]
+        self.interior = [
+            "INT/EXT" if interior and exterior else "INT" if interior else "EXT"
+            for interior, exterior in zip(statistics.is_interior, statistics.is_exterior)
+        ]
+        self.setups: Dict[Tuple[str, str, int], List[int]] = {}
+        for i in range(len(self.numbers)):
+            self.setups.setdefault(self.setup(i), []).append(i)
+
+    def setup(self, i: int) -> Tuple[str, str, int]:
+        return self.location[i], self.interior[i], self.night[i]
+
+class _Day:
+    """Scenes on one day, with the counters its cost is computed from"""
+
+    def __init__(self, scenes: _Scenes, by_location: Dict[str, Dict["_Day", None]]):
+        self.scenes = scenes
+        self.by_location = by_location          # Shared index of the days each location is on, in insertion order
+        self.members: Dict[int, None] = {}      # Ordered set of scene indexes
+        self.load = 0
+        self.locations: Counter = Counter()
+        self.cast: Counter = Counter()
+        self.night = 0
+
+    def add(self, i: int) -> None:
+        scenes = self.scenes
+        self.members[i] = None
+        self.load += scenes.eighths[i]
+        self.night += scenes.night[i]
+        for name in scenes.cast[i]:
+            self.cast[name] += 1
+        location = scenes.location[i]
+        self.locations[location] += 1
+        if self.locations[location] == 1:
+            self.by_location.setdefault(location, {})[self] = None
+
+    def remove(self, i: int) -> None:
+        scenes = self.scenes
+        del self.members[i]
+        self.load -= scenes.eighths[i]
+        self.night -= scenes.night[i]
+        for name in scenes.cast[i]:
+            self.cast[name] -= 1
+            if not self.cast[name]:
+                del self.cast[name]
+        location = scenes.location[i]
+        self.locations[location] -= 1
+        if not self.locations[location]:
+            del self.locations[location]
+            del self.by_location[location][self]
+
+    def cost(self) -> int:
+        if not self.members:
+            return 0
+        return (
+            DAY_COST
+            + COMPANY_MOVE_COST * (len(self.locations) - 1)
+            + (DAY_NIGHT_SWITCH_COST if 0 < self.night < len(self.members) else 0)
+            + CAST_DAY_COST * len(self.cast)
+        )
+
+    def add_delta(self, i: int) -> int:
+        """Cost change of adding scene i, without adding it"""
+        before = self.cost()
+        self.add(i)
+        after = self.cost()
+        self.remove(i)
+        return after - before
+
+    def remove_delta(self, i: int) -> int:
+        """Cost change of removing scene i, without removing it"""
+        before = self.cost()
+        self.remove(i)
+        after = self.cost()
+        self.add(i)
+        return after - before
+
+class _Search:
+    """Greedy packing of scenes into days followed by local search on the total cost"""
+
+    def __init__(self, scenes: _Scenes, capacity: int):
+        self.scenes = scenes
+        self.capacity = capacity
+        self.days: List[_Day] = []
+        self.day_of: Dict[int, _Day] = {}
+        self.by_location: Dict[str, Dict[_Day, None]] = {}
+
+    def fits(self, day: _Day, i: int, leaving: int = 0) -> bool:
+        return day.load - leaving + self.scenes.eighths[i] <= self.capacity
+
+    def place(self, i: int, day: _Day) -> None:
+        day.add(i)
+        self.day_of[i] = day
+
+    def move(self, i: int, target: _Day) -> None:
+        self.day_of[i].remove(i)
+        self.place(i, target)
+
+    def new_day(self) -> _Day:
+        day = _Day(self.scenes, self.by_location)
+        self.days.append(day)
+        return day
+
+    def best_day(self, i: int, candidates: Iterable[_Day], exclude: Optional[_Day] = None) -> Tuple[Optional[_Day], int]:
+        """Candidate day with room where adding scene i costs least, and that cost"""
+        best, best_delta = None, 0
+        for day in candidates:
+            if day is exclude or not day.members or not self.fits(day, i):
+                continue
+            delta = day.add_delta(i)
+            if best is None or delta < best_delta:
+                best, best_delta = day, delta
+        return best, best_delta
+
+    def pack(self, order: List[int]) -> None:
+        """Greedy construction: each scene joins the cheapest day with room, or opens a new one"""
+        current: Optional[_Day] = None
+        for i in order:
+            # The day being filled and the days already at this location are the likely cheapest
+            candidates = list(self.by_location.get(self.scenes.location[i], ()))
+            if current is not None:
+                candidates.append(current)
+            day, delta = self.best_day(i, candidates)
+            new_day_cost = DAY_COST + CAST_DAY_COST * len(self.scenes.cast[i])
+            if day is None or delta >= new_day_cost:
+                # Fill gaps left on earlier days before opening another one
+                day, delta = self.best_day(i, self.days)
+            if day is None or delta >= new_day_cost:
+                day = current = self.new_day()
+            self.place(i, day)
+
+    def relocate(self) -> bool:
+        """Move single scenes to a day already at their location when that lowers the cost"""
+        improved = False
+        for i in range(len(self.scenes.numbers)):
+            source = self.day_of[i]
+            candidates = self.by_location.get(self.scenes.location[i], ())
+            target, delta = self.best_day(i, list(candidates), exclude=source)
+            if target is not None and delta + source.remove_delta(i) < 0:
+                self.move(i, target)
+                improved = True
+        return improved
+
+    def swap(self) -> bool:
+        """Exchange a scene that is alone at its location for one on a day already there, when that lowers the cost"""
+        improved = False
+        eighths = self.scenes.eighths
+        for i in range(len(self.scenes.numbers)):
+            a = self.day_of[i]
+            if a.locations[self.scenes.location[i]] > 1:
+                continue
+            for b in list(self.by_location.get(self.scenes.location[i], ())):
+                if b is a:
+                    continue
+                for j in list(b.members):
+                    if self.scenes.location[j] == self.scenes.location[i]:
+                        continue
+                    if a.load - eighths[i] + eighths[j] > self.capacity or b.load - eighths[j] + eighths[i] > self.capacity:
+                        continue
+                    before = a.cost() + b.cost()
+                    self.move(i, b)
+                    self.move(j, a)
+                    if a.cost() + b.cost() < before:
+                        improved = True
+                        break
+                    self.move(j, b)
+                    self.move(i, a)
+                if self.day_of[i] is not a:
+                    break
+        return improved
+
+    def close_days(self) -> bool:
+        """Spread the scenes of lightly loaded days over the others when that saves the day"""
+        improved = False
+        for day in sorted(self.days, key=lambda day: day.load):
+            if not day.members or day.load * 2 > self.capacity:
+                continue
+            moved = []
+            change = 0
+            for i in list(day.members):
+                change += day.remove_delta(i)
+                target, delta = self.best_day(i, self.days, exclude=day)
+                if target is None:
+                    break
+                change += delta
+                self.move(i, target)
+                moved.append(i)
+            if not day.members and change < 0:
+                improved = True
+                continue
+            for i in reversed(moved):
+                self.move(i, day)
+        self.days = [day for day in self.days if day.members]
+        return improved
+
+    def total_cost(self) -> int:
+        return sum(day.cost() for day in self.days)
+
+def build_shooting_schedule(statistics: ScriptStatistics, pages_per_day: Optional[float] = None) -> ShootingSchedule:
+    """
+    Pack the scenes of a script into shoot days.
+
+    Scenes are grouped into setups (location, interior/exterior, day/night) and
+    packed greedily under the daily page limit, then improved by local search
+    (moving and swapping scenes, closing lightly loaded days) on a cost that
+    counts shoot days, company moves, day/night switches and actor days.
+    Deterministic for the same statistics and limit.
+
+    Args:
+        statistics: Per-scene statistics of the parsed script
+        pages_per_day: Daily page limit; defaults to SCHEDULE_PAGES_PER_DAY
+
+    Returns:
+        ShootingSchedule: Days in shooting order; a scene longer than the limit gets a day of its own
+    """
+    pages_per_day = pages_per_day if pages_per_day is not None else schedule_pages_per_day()
+    scenes = _Scenes(statistics)
+    search = _Search(scenes, max(1, round(pages_per_day * 8)))
+
+    # Setups of a location stay together. Locations with exteriors come first so interiors
+    # remain as weather cover, then the biggest; within a location exteriors, then day before night.
+    # Scenes with the same cast stay next to each other within a setup
+    location_eighths: Counter = Counter()
+    location_exterior = set()
+    location_first: Dict[str, int] = {}
+    for i, location in enumerate(scenes.location):
+        location_eighths[location] += scenes.eighths[i]
+        location_first.setdefault(location, i)
+        if scenes.interior[i] != "INT":
+            location_exterior.add(location)
+    setup_rank = {
+        key: rank for rank, key in enumerate(sorted(
+            scenes.setups,
+            key=lambda key: (
+                key[0] not in location_exterior, -location_eighths[key[0]], location_first[key[0]],
+                key[1] == "INT", key[2]
+            )
+        ))
+    }
+    order = sorted(range(len(scenes.numbers)), key=lambda i: (setup_rank[scenes.setup(i)], sorted(scenes.cast[i]), i))
+    search.pack(order)
+    for _ in range(MAX_SEARCH_PASSES):
+        improved = search.relocate()
+        improved = search.swap() or improved
+        improved = search.close_days() or improved
+        if not improved:
+            break
+
+    # Shooting order: by each day's main setup, scenes within a day grouped by setup
+    def main_setup(day: _Day) -> int:
+        pages: Counter = Counter()
+        for i in day.members:
+            pages[setup_rank[scenes.setup(i)]] += scenes.eighths[i]
+        return min(pages, key=lambda rank: (-pages[rank], rank))
+
+    days = sorted(search.days, key=lambda day: (main_setup(day), min(day.members)))
+    shoot_days = []
+    setup_days: Dict[Tuple[str, str, int], List[int]] = {}
+    for number, day in enumerate(days, 1):
+        members = sorted(day.members, key=lambda i: (setup_rank[scenes.setup(i)], i))
+        for i in members:
+            setup_days.setdefault(scenes.setup(i), []).append(number)
+        shoot_days.append(ShootDay(
+            day=number,
+            scene_numbers=[scenes.numbers[i] for i in members],
+            locations=list(dict.fromkeys(scenes.location[i] for i in members)),
+            page_eighths=day.load,
+            night_scenes=day.night,
+            cast=list(dict.fromkeys(name for i in members for name in scenes.cast[i]))
+        ))
+
+    setups = [
+        ScheduledSetup(
+            location=key[0],
+            interior=key[1],
+            night=bool(key[2]),
+            scene_numbers=[scenes.numbers[i] for i in scenes.setups[key]],
+            page_eighths=sum(scenes.eighths[i] for i in scenes.setups[key]),
+            days=sorted(set(setup_days[key]))
+        )
+        for key in sorted(scenes.setups, key=lambda key: (min(setup_days[key]), setup_rank[key]))
+    ]
+    return ShootingSchedule(
+        pages_per_day=pages_per_day,
+        total_eighths=sum(scenes.eighths),
+        days=shoot_days,
+        setups=setups,
+        company_moves=sum(len(day.locations) - 1 for day in search.days),
+        day_night_switches=sum(1 for day in search.days if 0 < day.night < len(day.members)),
+        cost=search.total_cost()
+    )
@@ -0,0 +1,285 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+import re
+
+# Element types emitted by the tokenizer
+SCENE_HEADING = "scene_heading"
+CHARACTER = "character"
+PARENTHETICAL = "parenthetical"
+DIALOGUE = "dialogue"
+ACTION = "action"
+TRANSITION = "transition"
+
+# Layout of a formatted screenplay page, used to estimate page length
+LINES_PER_PAGE = 55
+ACTION_WIDTH = 61
+DIALOGUE_WIDTH = 35
+MAX_SAMPLE_LINES = 10
+
+TIMES_OF_DAY = frozenset({
+    "DAY", "NIGHT", "DAWN", "DUSK", "MORNING", "AFTERNOON", "EVENING", "SUNRISE", "SUNSET",
+    "CONTINUOUS", "LATER", "MOMENTS LATER", "SAME", "SAME TIME", "MAGIC HOUR"
+})
+
+# Precompiled patterns
+# The prefix is matched case-sensitively - "Interior lights flicker" or "Est. time is ten"
+# in action and dialogue are not headings
+SCENE_HEADING_PATTERN = re.compile(
+    r'^(?:\d+[A-Z]?[ \t.]+)?'
+    r'(INT\.?[ \t]*/[ \t]*EXT\.?|EXT\.?[ \t]*/[ \t]*INT\.?|I/E\.?|INT\.|EXT\.|INTERIOR\b|EXTERIOR\b|EST\.)'
+    r'[ \t]*(.*)$'
+)
+TRANSITION_PATTERN = re.compile(
+    r"^>?[ \t]*(?:[A-Z][A-Z .']*[ \t]TO:|FADE IN:?|FADE OUT\.?|FADE TO BLACK\.?|CUT TO BLACK\.?|THE END\.?)$"
+)
+CHARACTER_CUE_PATTERN = re.compile(
+    r"^([A-Z][A-Z0-9 .'&\-]*?)[ \t]*((?:\([^)]*\)[ \t]*)*)\^?$"
+)
+PARENTHETICAL_PATTERN = re.compile(r'^\(.*\)$')
+SCENE_NUMBER_SUFFIX_PATTERN = re.compile(r'[ \t]+\d+[A-Z]?$')
+DASH_PATTERN = re.compile(r'[ \t]*[-–—]+[ \t]*')
+MAX_CUE_WORDS = 4
+
+# Token
+class ScriptToken(NamedTuple):
+    """A single classified screenplay line"""
+    kind: str
+    line_number: int
+    text: str
+    character: Optional[str] = None
+
+# State/Output
+class ParsedScene(BaseModel):
+    """Structure of a single scene"""
+    scene_number: int = Field(description='1-based scene position in the script')
+    heading: str = Field(description='Full scene heading text')
+    interior: str = Field(description='INT, EXT or INT/EXT')
+    location: str = Field(description='Location part of the heading')
+    time_of_day: str = Field(description='Time of day from the heading, empty when missing')
+    start_line: int = Field(description='Line offset of the heading (0-based)')
+    end_line: int = Field(description='Line offset where the next scene starts (exclusive)')
+    start_offset: int = Field(description='Character offset of the heading')
+    end_offset: int = Field(description='Character offset where the next scene starts (exclusive)')
+    speaking_characters: List[str] = Field(description='Characters with dialogue, in order of first cue')
+    dialogue_counts: Dict[str, int] = Field(description='Dialogue blocks per speaking character')
+    dialogue_line_count: int = Field(description='Number of dialogue lines')
+    action_line_count: int = Field(description='Number of action lines')
+    parenthetical_count: int = Field(description='Number of parentheticals')
+    transitions: List[str] = Field(description='Transitions inside the scene')
+    page_lines: int = Field(description='Estimated formatted lines the scene occupies on the page')
+
+class ParsedScript(BaseModel):
+    """Structure of a whole script produced by the deterministic parser"""
+    scenes: List[ParsedScene] = Field(description='Scenes in script order')
+    characters: List[str] = Field(description='Speaking characters in order of first cue')
+    dialogue_counts: Dict[str, int] = Field(description='Dialogue blocks per speaking character')
+    dialogue_samples: List[str] = Field(description='First few dialogue lines')
+    action_samples: List[str] = Field(description='First few action lines')
+    total_lines: int = Field(description='Number of lines in the script')
+    page_lines: int = Field(description='Estimated formatted lines for the whole script')
+    estimated_pages: int = Field(description='Estimated page count')
+
+    @property
+    def is_structured(self) -> bool:
+        """Whether the script follows screenplay format closely enough to skip LLM extraction"""
+        return bool(self.scenes) and bool(self.characters)
+
+# Tokenizer
+def tokenize_script(lines: Iterable[str]) -> Iterator[ScriptToken]:
+    """
+    Classify screenplay lines in a single streaming pass.
+
+    A small state machine tracks whether we are inside a dialogue block. An
+    all-caps line is only a character cue when dialogue follows it directly, so
+    the tokenizer holds at most one line of lookahead.
+
+    Args:
+        lines: Script lines (with or without line endings)
+
+    Yields:
+        ScriptToken: One token per non-blank line
+    """
+    in_dialogue = False
+    pending_cue = None  # (line_number, text, name) waiting for the next line
+
+    for line_number, raw_line in enumerate(lines):
+        line = raw_line.strip()
+
+        if pending_cue is not None:
+            cue_line, cue_text, cue_name = pending_cue
+            pending_cue = None
+            if line and not SCENE_HEADING_PATTERN.match(line):
+                yield ScriptToken(CHARACTER, cue_line, cue_text, cue_name)
+                in_dialogue = True
+            else:
+                yield ScriptToken(ACTION, cue_line, cue_text)
+
+        if not line:
+            in_dialogue = False
+            continue
+
+        if in_dialogue:
+            if PARENTHETICAL_PATTERN.match(line):
+                yield ScriptToken(PARENTHETICAL, line_number, line)
+                continue
+            if not SCENE_HEADING_PATTERN.match(line) and not TRANSITION_PATTERN.match(line):
+                yield ScriptToken(DIALOGUE, line_number, line)
+                continue
+            in_dialogue = False
+
+        if SCENE_HEADING_PATTERN.match(line):
+            yield ScriptToken(SCENE_HEADING, line_number, line)
+            continue
+
+        if TRANSITION_PATTERN.match(line):
+            yield ScriptToken(TRANSITION, line_number, line)
+            continue
+
+        cue_match = CHARACTER_CUE_PATTERN.match(line)
+        if cue_match and len(cue_match.group(1).split()) <= MAX_CUE_WORDS:
+            pending_cue = (line_number, line, cue_match.group(1).strip())
+            continue
+
+        yield ScriptToken(ACTION, line_number, line)
+
+    if pending_cue is not None:
+        cue_line, cue_text, _ = pending_cue
+        yield ScriptToken(ACTION, cue_line, cue_text)
+
+def split_scene_heading(heading: str) -> tuple:
+    """Split a scene heading into (interior, location, time_of_day)"""
+    match = SCENE_HEADING_PATTERN.match(heading.strip())
+    if not match:
+        return "", heading.strip(), ""
+
+    prefix = match.group(1).upper().replace(" ", "").replace("\t", "")
+    if "/" in prefix:
+        interior = "INT/EXT"
+    elif prefix.startswith(("INT", "EST")):
+        interior = "INT" if prefix.startswith("INT") else "EXT"
+    else:
+        interior = "EXT"
+
+    rest = SCENE_NUMBER_SUFFIX_PATTERN.sub("", match.group(2)).strip(" \t.-")
+    parts = DASH_PATTERN.split(rest)
+    if len(parts) > 1 and parts[-1].upper().strip(" .") in TIMES_OF_DAY:
+        return interior, " - ".join(parts[:-1]).strip(), parts[-1].upper().strip(" .")
+    return interior, rest, ""
+
+def _wrapped_lines(text: str, width: int) -> int:
+    """Number of printed lines a piece of text occupies at a given column width"""
+    return max(1, -(-len(text) // width))
+
+# Parser
+def parse_script(script_content: str) -> ParsedScript:
+    """
+    Parse a screenplay into a structured scene list in one pass.
+
+    Args:
+        script_content: Raw script text
+
+    Returns:
+        ParsedScript: Scenes with line offsets, speaking characters and dialogue counts
+    """
+    lines = script_content.splitlines(keepends=True)
+
+    # Character offset of every line start, so scenes can be sliced back out
+    line_offsets = [0] * (len(lines) + 1)
+    position = 0
+    for index, line in enumerate(lines):
+        line_offsets[index] = position
+        position += len(line)
+    line_offsets[len(lines)] = position
+
+    scenes = []
+    characters = {}
+    dialogue_samples = []
+    action_samples = []
+    current = None
+    current_speaker = None
+    script_page_lines = 0
+    previous_line = -1
+
+    def close_scene(end_line: int) -> None:
+        if current is not None:
+            current["end_line"] = end_line
+            current["end_offset"] = line_offsets[end_line]
+            current["speaking_characters"] = list(current["dialogue_counts"])
+            scenes.append(ParsedScene(**current))
+
+    for token in tokenize_script(lines):
+        # Blank lines between elements take one printed line each
+        page_lines = 1 if token.line_number - previous_line > 1 else 0
+        previous_line = token.line_number
+
+        if token.kind == SCENE_HEADING:
+            close_scene(token.line_number)
+            interior, location, time_of_day = split_scene_heading(token.text)
+            current = {
+                "scene_number": len(scenes) + 1,
+                "heading": token.text,
+                "interior": interior,
+                "location": location,
+                "time_of_day": time_of_day,
+                "start_line": token.line_number,
+                "end_line": token.line_number + 1,
+                "start_offset": line_offsets[token.line_number],
+                "end_offset": line_offsets[token.line_number + 1],
+                "speaking_characters": [],
+                "dialogue_counts": {},
+                "dialogue_line_count": 0,
+                "action_line_count": 0,
+                "parenthetical_count": 0,
+                "transitions": [],
+                "page_lines": 0,
+            }
+            current_speaker = None
+            page_lines += 1
+
+        elif token.kind == CHARACTER:
+            current_speaker = token.character
+            characters[current_speaker] = characters.get(current_speaker, 0) + 1
+            if current is not None:
+                current["dialogue_counts"][current_speaker] = current["dialogue_counts"].get(current_speaker, 0) + 1
+            page_lines += 1
+
+        elif token.kind == DIALOGUE:
+            if len(dialogue_samples) < MAX_SAMPLE_LINES:
+                dialogue_samples.append(token.text[:100])
+            if current is not None:
+                current["dialogue_line_count"] += 1
+            page_lines += _wrapped_lines(token.text, DIALOGUE_WIDTH)
+
+        elif token.kind == PARENTHETICAL:
+            if current is not None:
+                current["parenthetical_count"] += 1
+            page_lines += _wrapped_lines(token.text, DIALOGUE_WIDTH)
+
+        elif token.kind == TRANSITION:
+            if current is not None:
+                current["transitions"].append(token.text)
+            page_lines += 1
+
+        else:
+            if len(action_samples) < MAX_SAMPLE_LINES:
+                action_samples.append(token.text[:100])
+            if current is not None:
+                current["action_line_count"] += 1
+            page_lines += _wrapped_lines(token.text, ACTION_WIDTH)
+
+        if current is not None:
+            current["page_lines"] += page_lines
+        script_page_lines += page_lines
+
+    close_scene(len(lines))
+
+    return ParsedScript(
+        scenes=scenes,
+        characters=list(characters),
+        dialogue_counts=characters,
+        dialogue_samples=dialogue_samples,
+        action_samples=action_samples,
+        total_lines=len(lines),
+        page_lines=script_page_lines,
+        estimated_pages=max(1, round(script_page_lines / LINES_PER_PAGE))
+    )
@@ -0,0 +1,125 @@
+from pydantic import BaseModel, Field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from script_parser import LINES_PER_PAGE, ParsedScript
+
+# numpy is imported on first use, like pydantic-ai, so importing the graph stays cheap
+if TYPE_CHECKING:
+    import numpy as np
+
+# Times of day that need a night (or low light) setup
+NIGHT_TIMES = ("NIGHT", "EVENING", "DUSK", "SUNSET")
+# Headings that continue the previous scene's time of day
+CONTINUATION_TIMES = ("", "CONTINUOUS", "LATER", "MOMENTS LATER", "SAME", "SAME TIME")
+MAX_SUMMARY_LOCATIONS = 10
+
+# State/Output
+class ScriptStatistics(BaseModel):
+    """Per-scene metrics computed from the parsed script, one list entry per scene in script order"""
+    scene_numbers: List[int] = Field(description='Scene number of each entry')
+    locations: List[str] = Field(description='Location of each scene, upper-cased')
+    page_eighths: List[int] = Field(description='Scene length in eighths of a page (at least 1)')
+    dialogue_ratio: List[float] = Field(description='Dialogue lines / (dialogue + action lines), 0 for silent scenes')
+    cast_size: List[int] = Field(description='Speaking characters in the scene')
+    cast: List[List[str]] = Field(description='Names of the speaking characters in the scene')
+    is_night: List[bool] = Field(description='Night setup, continuations inherit the previous scene')
+    is_interior: List[bool] = Field(description='INT or INT/EXT heading')
+    is_exterior: List[bool] = Field(description='EXT or INT/EXT heading')
+
+    @property
+    def scene_count(self) -> int:
+        return len(self.scene_numbers)
+
+    def arrays(self) -> Dict[str, "np.ndarray"]:
+        """The per-scene lists as NumPy arrays, for vectorized consumers"""
+        import numpy as np
+
+        return {
+            "page_eighths": np.asarray(self.page_eighths, dtype=np.int64),
+            "dialogue_ratio": np.asarray(self.dialogue_ratio, dtype=np.float64),
+            "cast_size": np.asarray(self.cast_size, dtype=np.int64),
+            "is_night": np.asarray(self.is_night, dtype=bool),
+            "is_interior": np.asarray(self.is_interior, dtype=bool),
+            "is_exterior": np.asarray(self.is_exterior, dtype=bool),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Exact totals for the agent payloads, so the model does not have to estimate them"""
+        import numpy as np
+
+        arrays = self.arrays()
+        eighths = arrays["page_eighths"]
+        location_names, location_index = np.unique(np.asarray(self.locations), return_inverse=True)
+        location_eighths = np.bincount(location_index, weights=eighths).astype(np.int64)
+        top = np.argsort(-location_eighths, kind="stable")[:MAX_SUMMARY_LOCATIONS]
+
+        return {
+            "scene_count": self.scene_count,
+            "total_pages": format_eighths(int(eighths.sum())),
+            "day_scenes": int((~arrays["is_night"]).sum()),
+            "night_scenes": int(arrays["is_night"].sum()),
+            "interior_scenes": int(arrays["is_interior"].sum()),
+            "exterior_scenes": int(arrays["is_exterior"].sum()),
+            "night_exterior_scenes": int((arrays["is_night"] & arrays["is_exterior"]).sum()),
+            "unique_locations": len(location_names),
+            "mean_dialogue_ratio": round(float(arrays["dialogue_ratio"].mean()), 3),
+            "max_speaking_cast": int(arrays["cast_size"].max()),
+            "pages_by_location": {
+                str(location_names[i]): format_eighths(int(location_eighths[i])) for i in top
+            },
+        }
+
+def format_eighths(eighths: int) -> str:
+    """Page length the way schedules write it, e.g. 13 -> "1 5/8" """
+    pages, rest = divmod(eighths, 8)
+    if not rest:
+        return str(pages)
+    return f"{pages} {rest}/8" if pages else f"{rest}/8"
+
+def compute_script_statistics(parsed_script: Optional[ParsedScript]) -> Optional[ScriptStatistics]:
+    """
+    Compute per-scene statistics from a parsed script in one vectorized pass.
+
+    Args:
+        parsed_script: Output of the screenplay parser
+
+    Returns:
+        ScriptStatistics, or None when the parser found no scenes
+    """
+    import numpy as np
+
+    if parsed_script is None or not parsed_script.scenes:
+        return None
+    scenes = parsed_script.scenes
+    count = len(scenes)
+
+    # One pass over the scenes into columns, everything after is array arithmetic
+    counts = np.array(
+        [(scene.page_lines, scene.dialogue_line_count, scene.action_line_count, len(scene.speaking_characters))
+         for scene in scenes],
+        dtype=np.int64
+    ).reshape(count, 4)
+    time_of_day = np.array([scene.time_of_day for scene in scenes], dtype=object)
+    interior = np.array([scene.interior for scene in scenes], dtype=object)
+    page_lines, dialogue, action, cast_size = counts.T
+
+    page_eighths = np.maximum(1, np.rint(page_lines * 8 / LINES_PER_PAGE)).astype(np.int64)
+    spoken = dialogue + action
+    dialogue_ratio = np.divide(dialogue, spoken, out=np.zeros(count), where=spoken > 0)
+
+    # Continuations take the day/night of the closest earlier scene that states one
+    stated = ~np.isin(time_of_day, CONTINUATION_TIMES)
+    source = np.maximum.accumulate(np.where(stated, np.arange(count), 0))
+    is_night = np.isin(time_of_day, NIGHT_TIMES)[source] & stated[source]
+
+    return ScriptStatistics(
+        scene_numbers=[scene.scene_number for scene in scenes],
+        locations=[scene.location.upper() for scene in scenes],
+        page_eighths=page_eighths.tolist(),
+        dialogue_ratio=np.round(dialogue_ratio, 3).tolist(),
+        cast_size=cast_size.tolist(),
+        cast=[list(scene.speaking_characters) for scene in scenes],
+        is_night=is_night.tolist(),
+        is_interior=np.isin(interior, ("INT", "INT/EXT")).tolist(),
+        is_exterior=np.isin(interior, ("EXT", "INT/EXT")).tolist()
+    )
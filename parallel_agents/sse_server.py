@@ -0,0 +1,85 @@
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+from sse_starlette.sse import EventSourceResponse
+import argparse
+import json
+
+from agents_graph2 import ScriptAnalysisDeps, stream_analyze_script_workflow
+from analysis_registry import ALL_ANALYSES, resolve_analyses
+from tracing import get_tracer
+from hedging import get_hedger
+from executor import get_executor
+from context_cache import get_context_cache
+from circuit_breaker import get_circuit_breakers
+from rate_limiter import get_rate_limiter
+from blob_store import get_blob_store
+from utils import close_models
+
+async def analyze_stream(request: Request):
+    """
+    Stream analysis results as server-sent events.
+
+    Expects a JSON body {"script": "...", "analyses": ["character", ...], "timeout_seconds": 30}.
+    Each finished node is sent as an event named after its type
+    (parsing, extraction, analysis, complete) with the result as JSON data.
+    Steps still running when timeout_seconds runs out are cancelled and
+    reported with "timed_out": true.
+    """
+    try:
+        body = await request.json()
+        script_content = body["script"]
+        analyses = resolve_analyses(body.get("analyses"))
+        deps = None
+        if body.get("timeout_seconds") is not None:
+            deps = ScriptAnalysisDeps(script_content=script_content, timeout_seconds=float(body["timeout_seconds"]))
+    except (ValueError, KeyError, TypeError) as e:
+        return JSONResponse({"error": f"Invalid request: {e}"}, status_code=400)
+
+    async def event_source():
+        try:
+            async for event in stream_analyze_script_workflow(script_content, analyses, deps):
+                yield {"event": event.event, "data": json.dumps(event.to_dict(), ensure_ascii=False)}
+        except Exception as e:
+            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+
+    return EventSourceResponse(event_source(), ping=15)
+
+async def list_analyses(request: Request):
+    """List the analyses that can be requested"""
+    return JSONResponse({"analyses": list(ALL_ANALYSES)})
+
+async def metrics(request: Request):
+    """Per-agent latency percentiles, token usage, retries, cache hits, rate limit waits, blob store use and executor queues in Prometheus text format"""
+    tracer = get_tracer()
+    hedger = get_hedger()
+    context_cache = get_context_cache()
+    circuit_breakers = get_circuit_breakers()
+    rate_limiter = get_rate_limiter()
+    blob_store = get_blob_store()
+    body = tracer.render_prometheus() if tracer is not None else ""
+    body += hedger.render_prometheus() if hedger is not None else ""
+    body += context_cache.render_prometheus() if context_cache is not None else ""
+    body += circuit_breakers.render_prometheus() if circuit_breakers is not None else ""
+    body += rate_limiter.render_prometheus() if rate_limiter is not None else ""
+    body += blob_store.render_prometheus() if blob_store is not None else ""
+    body += get_executor().render_prometheus()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+app = Starlette(routes=[
+    Route("/analyze/stream", analyze_stream, methods=["POST"]),
+    Route("/analyses", list_analyses, methods=["GET"]),
+    Route("/metrics", metrics, methods=["GET"]),
+], on_shutdown=[close_models])
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local server-sent events endpoint for script analysis")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# No network, no result cache, no trace files and no state left under .cache
+os.environ.setdefault("GEMINI_KEY", "test")
+os.environ["ANALYSIS_CACHE_ENABLED"] = "0"
+os.environ["TRACE_EXPORT_PATH"] = ""
+os.environ["CHECKPOINT_ENABLED"] = "0"
+os.environ["BLOB_STORE_PATH"] = ""
+
+import pytest
+from pydantic_ai.models.test import TestModel
+
+from utils import set_model_override
+
+# Agents keep the model they were built with, so the override goes in before any test builds one
+set_model_override(TestModel())
+
+SAMPLE_SCRIPT = """INT. COFFEE SHOP - DAY
+
+SARAH, 25, sits at a corner table with her laptop.
+
+SARAH
+(into phone)
+I can't do this anymore, Mom.
+
+The BARISTA approaches with a steaming cup.
+
+BARISTA
+One large coffee, extra shot.
+
+EXT. CITY STREET - NIGHT
+
+MIKE, 30, walks briskly down the sidewalk. A BLACK SUV pulls up beside him.
+
+MIKE
+I have to go.
+"""
+
+@pytest.fixture
+def sample_script() -> str:
+    return SAMPLE_SCRIPT
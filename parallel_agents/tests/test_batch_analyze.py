@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+import batch_analyze
+from agents_graph2 import ScriptAnalysisState
+
+class FakeWorkflow:
+    """Stands in for the compiled graph, failing the cost analysis of scripts containing FAIL"""
+
+    async def ainvoke(self, state: ScriptAnalysisState):
+        failed = "FAIL" in state.script.text()
+        return state.model_copy(update={
+            "analyses_complete": {name: not (failed and name == "cost") for name in state.requested_analyses},
+            "errors": ["Error in cost analysis: boom"] if failed else []
+        })
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def test_partial_runs_are_not_recorded_as_completed(tmp_path, monkeypatch, sample_script):
+    monkeypatch.setattr(batch_analyze, "analyze_script_workflow", FakeWorkflow())
+    scripts = tmp_path / "scripts"
+    scripts.mkdir()
+    (scripts / "good.txt").write_text(sample_script, encoding="utf-8")
+    (scripts / "bad.txt").write_text(sample_script + "\nFAIL\n", encoding="utf-8")
+    output, progress = tmp_path / "out.jsonl", tmp_path / "out.jsonl.progress"
+
+    counts = asyncio.run(batch_analyze.run_batch(str(scripts), str(output), str(progress), concurrency=2))
+
+    assert counts == {"succeeded": 1, "partial": 1, "failed": 0, "skipped": 0}
+    records = {record["path"].rsplit("/", 1)[-1]: record for record in read_jsonl(output)}
+    assert records["good.txt"]["status"] == "ok"
+    assert records["bad.txt"]["status"] == "partial"
+    assert "cost analysis did not complete" in records["bad.txt"]["error"]
+    assert [record["path"] for record in read_jsonl(progress)] == [records["good.txt"]["path"]]
+
+    # A rerun skips the completed script and retries the partial one
+    counts = asyncio.run(batch_analyze.run_batch(str(scripts), str(output), str(progress), concurrency=2))
+    assert counts == {"succeeded": 0, "partial": 1, "failed": 0, "skipped": 1}
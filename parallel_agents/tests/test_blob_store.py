@@ -0,0 +1,41 @@
+import asyncio
+import os
+
+import blob_store
+from agents_graph2 import ScriptAnalysisState, analyze_script_workflow
+from blob_store import BlobStore, pinned
+
+def test_put_on_an_event_loop_writes_the_file_off_the_loop(tmp_path):
+    store = BlobStore(path=str(tmp_path), min_chars=10, memory_max_bytes=0)
+    text = "INT. OFFICE - DAY\n" * 100
+
+    async def put_and_flush():
+        ref = store.put(text)
+        # Not on disk yet, so kept in memory despite the size limit
+        assert store.get(ref.digest) == text
+        await store.flush()
+        return ref
+
+    ref = asyncio.run(put_and_flush())
+
+    assert os.path.exists(os.path.join(str(tmp_path), ref.digest[:2], ref.digest))
+    # Written, so the next blob pushes it out of memory and it is read back from its file
+    store.put("EXT. STREET - NIGHT\n" * 100)
+    assert store.stats()["memory_blobs"] == 1
+    assert store.get(ref.digest) == text
+    assert store.stats()["file_reads"] == 1
+
+def test_a_script_read_back_from_its_file_is_decoded_once_per_run(tmp_path, monkeypatch, sample_script):
+    store = BlobStore(path=str(tmp_path), min_chars=10, memory_max_bytes=0)
+    monkeypatch.setattr(blob_store, "_blob_store", store)
+    monkeypatch.setenv("BLOB_STORE_PATH", str(tmp_path))
+    ref = store.put(sample_script)
+    # Only on disk from here on, as after a restart
+    store.put("EXT. STREET - NIGHT\n" * 100)
+    state = ScriptAnalysisState(script=ref, requested_analyses=["cost"], analyses_complete={"cost": False})
+
+    with pinned(ref):
+        final_state = ScriptAnalysisState.model_validate(asyncio.run(analyze_script_workflow.ainvoke(state)))
+
+    assert final_state.analyses_complete == {"cost": True}
+    assert store.stats()["file_reads"] == 1
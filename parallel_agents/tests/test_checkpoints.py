@@ -0,0 +1,144 @@
+import asyncio
+import contextlib
+import sqlite3
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from pydantic_ai.models.test import TestModel
+
+from agents_graph2 import resume_analysis, run_analyze_script_workflow
+from analysis_registry import ANALYSIS_SPECS
+from checkpoints import SqliteCheckpointSaver, latest_run, script_id, set_checkpointer, thread_config
+
+class CountingModel(TestModel):
+    """TestModel counting its requests, failing them while fail is set"""
+
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.fail = fail
+        self.requests = 0
+
+    async def request(self, *args, **kwargs):
+        self.requests += 1
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return await super().request(*args, **kwargs)
+
+def rows(saver: SqliteCheckpointSaver, thread_id: str) -> dict:
+    with contextlib.closing(sqlite3.connect(saver.path)) as connection:
+        return {
+            table: connection.execute(f"SELECT COUNT(*) FROM {table} WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+            for table in ("checkpoints", "checkpoint_writes")
+        }
+
+def put_step(saver: SqliteCheckpointSaver, thread_id: str, value: int, parent: dict = None) -> dict:
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"value": value}
+    config = saver.put(parent or thread_config(thread_id), checkpoint, {"step": value}, {})
+    saver.put_writes(config, [("value", value + 1)], task_id=f"task-{value}")
+    return config
+
+@pytest.fixture
+def checkpointer(tmp_path, monkeypatch):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.sqlite3"))
+    monkeypatch.setenv("CHECKPOINT_ENABLED", "1")
+    set_checkpointer(saver)
+    yield saver
+    set_checkpointer(None)
+    saver.close()
+
+def test_concurrent_runs_of_a_script_keep_separate_threads(checkpointer, sample_script):
+    async def run_twice():
+        return await asyncio.gather(
+            run_analyze_script_workflow(sample_script, ["cost"]),
+            run_analyze_script_workflow(sample_script, ["timeline"])
+        )
+
+    first, second = asyncio.run(run_twice())
+
+    threads = [state.processing_metadata["script_id"] for state in (first, second)]
+    assert threads[0] != threads[1]
+    assert all(thread.startswith(f"{script_id(sample_script)}:") for thread in threads)
+    assert first.analyses_complete == {"cost": True}
+    assert second.analyses_complete == {"timeline": True}
+    # Neither run deleted or merged into the other's checkpoints
+    for thread, state in zip(threads, (first, second)):
+        latest = checkpointer.get_tuple(thread_config(thread))
+        assert latest.checkpoint["channel_values"]["requested_analyses"] == state.requested_analyses
+
+def test_put_and_get_checkpoints_and_writes(checkpointer):
+    first = put_step(checkpointer, "thread-a", 1)
+    second = put_step(checkpointer, "thread-a", 2, parent=first)
+
+    latest = checkpointer.get_tuple(thread_config("thread-a"))
+    assert latest.config == second
+    assert latest.parent_config == first
+    assert latest.checkpoint["channel_values"] == {"value": 2}
+    assert latest.metadata["step"] == 2
+    assert latest.pending_writes == [("task-2", "value", 3)]
+
+    earlier = checkpointer.get_tuple(first)
+    assert earlier.checkpoint["channel_values"] == {"value": 1}
+    assert earlier.pending_writes == [("task-1", "value", 2)]
+    assert earlier.metadata["script_id"] == "thread-a"
+    assert [item.config for item in checkpointer.list(thread_config("thread-a"))] == [second, first]
+    assert checkpointer.get_tuple(thread_config("thread-b")) is None
+
+def test_resume_reruns_only_the_failed_analysis(checkpointer, sample_script):
+    cost, timeline = CountingModel(fail=True), CountingModel()
+    with ANALYSIS_SPECS["cost"].get_agent().override(model=cost), ANALYSIS_SPECS["timeline"].get_agent().override(model=timeline):
+        failed = asyncio.run(run_analyze_script_workflow(sample_script, ["cost", "timeline"]))
+        assert failed.analyses_complete == {"cost": False, "timeline": True}
+
+        cost.fail = False
+        cost.requests = timeline.requests = 0
+        resumed = asyncio.run(resume_analysis(failed.processing_metadata["script_id"]))
+
+    assert resumed.analyses_complete == {"cost": True, "timeline": True}
+    assert resumed.cost_analysis is not None
+    assert resumed.processing_metadata["resumed_analyses"] == ["cost"]
+    assert cost.requests == 1
+    assert timeline.requests == 0
+
+def test_delete_thread_and_evict_clean_up_both_tables(checkpointer):
+    for thread_id in ("deleted", "stale", "fresh"):
+        put_step(checkpointer, thread_id, 1)
+        assert rows(checkpointer, thread_id) == {"checkpoints": 1, "checkpoint_writes": 1}
+
+    checkpointer.delete_thread("deleted")
+    assert rows(checkpointer, "deleted") == {"checkpoints": 0, "checkpoint_writes": 0}
+
+    with contextlib.closing(sqlite3.connect(checkpointer.path)) as connection, connection:
+        connection.execute("UPDATE checkpoints SET created_at = created_at - ? WHERE thread_id = 'stale'", (checkpointer.max_age_seconds + 60,))
+    checkpointer.evict()
+    assert rows(checkpointer, "stale") == {"checkpoints": 0, "checkpoint_writes": 0}
+    assert rows(checkpointer, "fresh") == {"checkpoints": 1, "checkpoint_writes": 1}
+
+def test_latest_run_is_looked_up_by_indexed_script_id(checkpointer):
+    put_step(checkpointer, "abc:run1", 1)
+    latest = put_step(checkpointer, "abc:run2", 1)
+    put_step(checkpointer, "other:run3", 1)
+
+    assert asyncio.run(latest_run(checkpointer, "abc")) == "abc:run2"
+    assert asyncio.run(latest_run(checkpointer, "missing")) is None
+    assert [item.config for item in checkpointer.list(None, filter={"script_id": "abc"}, limit=1)] == [latest]
+    with contextlib.closing(sqlite3.connect(checkpointer.path)) as connection:
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT thread_id FROM checkpoints WHERE script_id = ? ORDER BY checkpoint_id DESC LIMIT 1", ("abc",)
+        ).fetchall()
+    assert "idx_checkpoints_script" in str(plan)
+
+def test_databases_from_before_run_ids_get_the_script_id_column(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    saver = SqliteCheckpointSaver(path)
+    put_step(saver, "abc", 1)
+    saver.close()
+    with contextlib.closing(sqlite3.connect(path)) as connection, connection:
+        connection.execute("DROP INDEX idx_checkpoints_script")
+        connection.execute("ALTER TABLE checkpoints DROP COLUMN script_id")
+
+    saver = SqliteCheckpointSaver(path)
+    try:
+        assert asyncio.run(latest_run(saver, "abc")) == "abc"
+    finally:
+        saver.close()
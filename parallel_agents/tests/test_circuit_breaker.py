@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from pydantic_ai.models.test import TestModel
+
+import circuit_breaker
+from agents.info_gathering_agent import get_info_gathering_agent
+from agents_graph2 import ScriptAnalysisState, analyze_script_workflow, build_initial_state
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, protect_model
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class FailingModel(TestModel):
+    async def request(self, *args, **kwargs):
+        raise RuntimeError("provider unavailable")
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+@pytest.fixture
+def breaker(clock) -> CircuitBreaker:
+    return CircuitBreaker("test:model", window_seconds=60, min_calls=4, error_rate=0.5, slow_call_seconds=10, open_seconds=30, clock=clock)
+
+def test_closed_circuit_opens_once_the_error_rate_is_reached(breaker):
+    for failed in (True, False, True):
+        assert breaker.allow()
+        breaker.record(failed, 0.1)
+    # Fewer than min_calls in the window, so still closed
+    assert breaker.state == CLOSED
+
+    breaker.record(False, 11.0)     # Slow calls count as failures
+
+    assert breaker.state == OPEN
+    assert breaker.is_open()
+    assert not breaker.allow()
+    assert breaker.stats()["opened"] == 1
+    assert breaker.stats()["rejected"] == 1
+
+def test_old_outcomes_leave_the_window(breaker, clock):
+    for _ in range(3):
+        breaker.record(True, 0.1)
+    clock.now = 61
+    breaker.record(True, 0.1)
+
+    assert breaker.state == CLOSED
+    assert breaker.stats()["calls"] == 1
+
+def open_circuit(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.min_calls):
+        breaker.record(True, 0.1)
+    assert breaker.state == OPEN
+
+def test_half_open_probe_success_closes_the_circuit(breaker, clock):
+    open_circuit(breaker)
+    clock.now = 30
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()          # The probe
+    assert not breaker.allow()      # Everyone else waits for it
+    assert breaker.is_open()
+    breaker.record(False, 0.1)
+
+    assert breaker.state == CLOSED
+    assert breaker.stats()["calls"] == 1
+    assert breaker.stats()["probes"] == 1
+
+def test_half_open_probe_failure_opens_the_circuit_again(breaker, clock):
+    open_circuit(breaker)
+    clock.now = 30
+    assert breaker.allow()
+    breaker.record(True, 0.1)
+
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 30
+    assert breaker.stats()["opened"] == 2
+
+def test_abandoned_probe_frees_the_probe_slot(breaker, clock):
+    open_circuit(breaker)
+    clock.now = 30
+    assert breaker.allow()
+    breaker.abandon()
+
+    assert breaker.allow()
+
+def test_protected_model_fails_fast_while_open(monkeypatch):
+    monkeypatch.setenv("CIRCUIT_BREAKER_ENABLED", "1")
+    monkeypatch.setenv("CIRCUIT_MIN_CALLS", "1")
+    monkeypatch.setattr(circuit_breaker, "_circuit_breakers", None)
+    agent = get_info_gathering_agent()
+
+    with agent.override(model=protect_model(FailingModel())):
+        with pytest.raises(RuntimeError):
+            asyncio.run(agent.run("INT. HALL - DAY"))
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(agent.run("INT. HALL - DAY"))
+
+def test_extraction_is_degraded_when_the_circuit_opens_during_it(monkeypatch):
+    monkeypatch.setenv("CIRCUIT_BREAKER_ENABLED", "1")
+    monkeypatch.setenv("CIRCUIT_MIN_CALLS", "1")
+    monkeypatch.setattr(circuit_breaker, "_circuit_breakers", None)
+    # Prose the parser cannot structure, so extraction goes to the model
+    script = "A man walks into a bar. Later he meets Sarah at the office and they talk about money.\n" * 5
+
+    with get_info_gathering_agent().override(model=protect_model(FailingModel())):
+        final_state = ScriptAnalysisState.model_validate(
+            asyncio.run(analyze_script_workflow.ainvoke(build_initial_state(script, ["cost"])))
+        )
+
+    assert circuit_breaker.get_circuit_breakers().stats()["test:test"]["state"] == OPEN
+    assert final_state.extraction_complete
+    assert "info_gathering" in final_state.degraded
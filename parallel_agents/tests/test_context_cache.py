@@ -0,0 +1,95 @@
+import asyncio
+import inspect
+import json
+import os
+from importlib.metadata import version
+
+import httpx
+from pydantic import BaseModel
+from pydantic_ai import Agent
+
+from benchmarks.fake_gemini import FakeGeminiServer
+from context_cache import CachedContext, create_context_cached_model, use_context
+
+REQUIREMENTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "requirements.txt")
+
+class Verdict(BaseModel):
+    summary: str
+    scene_count: int
+
+def pinned_versions() -> dict:
+    with open(REQUIREMENTS_PATH, "rb") as f:
+        raw = f.read()
+    text = raw.decode("utf-16" if raw[:2] in (b"\xff\xfe", b"\xfe\xff") else "utf-8")
+    return dict(line.strip().split("==", 1) for line in text.splitlines() if "==" in line)
+
+def test_pydantic_ai_is_the_pinned_version():
+    # ContextCachedGeminiModel uses GeminiModel internals; upgrading pydantic-ai means re-checking it
+    pinned = pinned_versions()
+    assert pinned["pydantic-ai"] == pinned["pydantic-ai-slim"]
+    assert version("pydantic-ai-slim") == pinned["pydantic-ai-slim"]
+
+def test_gemini_internals_used_by_the_cached_model_still_exist():
+    from pydantic_ai.models import gemini
+
+    assert callable(gemini._gemini_response_ta.validate_json)
+    assert callable(gemini._settings_to_generation_config)
+    assert list(inspect.signature(gemini.GeminiModel._process_response).parameters) == ["self", "response"]
+    assert list(inspect.signature(gemini.GeminiModel.request).parameters) == [
+        "self", "messages", "model_settings", "model_request_parameters"
+    ]
+    assert gemini._settings_to_generation_config({"temperature": 0.5, "max_tokens": 10}) == {
+        "temperature": 0.5, "max_output_tokens": 10
+    }
+
+class RecordingGemini(httpx.AsyncBaseTransport):
+    """Answers like the fake Gemini server in-process, keeping every request body"""
+
+    def __init__(self, cached_contents: dict):
+        self.server = FakeGeminiServer()
+        self.server.cached_contents.update(cached_contents)
+        self.bodies = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(await request.aread() or b"{}")
+        self.bodies.append(body)
+        status, response = self.server._route(request.method, request.url.path, body)
+        return httpx.Response(status, json=response)
+
+def run_cached(transport: RecordingGemini) -> Verdict:
+    from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+    async def main():
+        provider = GoogleGLAProvider(api_key="test", http_client=httpx.AsyncClient(transport=transport))
+        agent = Agent(create_context_cached_model("fake-gemini", provider), output_type=Verdict, system_prompt="Judge the script.")
+        context = CachedContext(name="cachedContents/1", model_name="fake-gemini")
+        with use_context(context, "Analyze the cached script data."):
+            result = await agent.run('{"scene_count": 3}')
+        await provider.client.aclose()
+        return result.output
+
+    return asyncio.run(main())
+
+def test_request_references_the_cached_context():
+    transport = RecordingGemini({"cachedContents/1": 1000})
+
+    output = run_cached(transport)
+
+    assert isinstance(output, Verdict)
+    [body] = transport.bodies
+    assert body["cachedContent"] == "cachedContents/1"
+    assert "tools" not in body and "systemInstruction" not in body
+    assert body["contents"][0]["parts"] == [{"text": "Judge the script."}, {"text": "Analyze the cached script data."}]
+    assert body["generationConfig"]["responseMimeType"] == "application/json"
+    assert set(body["generationConfig"]["responseSchema"]["properties"]) == {"summary", "scene_count"}
+
+def test_expired_context_falls_back_to_the_full_request():
+    transport = RecordingGemini({})
+
+    output = run_cached(transport)
+
+    assert isinstance(output, Verdict)
+    cached, full = transport.bodies
+    assert cached["cachedContent"] == "cachedContents/1"
+    assert "cachedContent" not in full
+    assert full["tools"]["functionDeclarations"][0]["name"] == "final_result"
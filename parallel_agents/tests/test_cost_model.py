@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+import pytest
+
+import cost_model
+from agents.cost_analysis_agent import analyze_costs
+from agents.info_gathering_agent import RawScriptData
+from cost_model import RateTable, estimate_costs, get_rate_table, load_rate_table
+from script_parser import parse_script
+from script_stats import ScriptStatistics, compute_script_statistics
+
+@pytest.fixture
+def fresh_rate_table(monkeypatch):
+    """Forget the process-wide rate table so the next get_rate_table() reads COST_RATES_PATH again"""
+    monkeypatch.setattr(cost_model, "_rate_table", None)
+
+def line_amount(estimate, category: str) -> float:
+    return sum(line.amount for line in estimate.line_items if line.category == category)
+
+def test_rate_table_overrides_come_from_cost_rates_path(tmp_path, monkeypatch, fresh_rate_table):
+    rates_path = tmp_path / "rates.json"
+    rates_path.write_text(json.dumps({"currency": "EUR", "crew_base": 10, "cast_day_rates": {"lead": 1.0, "supporting": 2.0, "day_player": 3.0}}))
+    monkeypatch.setenv("COST_RATES_PATH", str(rates_path))
+
+    rates = get_rate_table()
+
+    assert rates.currency == "EUR"
+    assert rates.crew_base == 10
+    assert rates.cast_day_rates == {"lead": 1.0, "supporting": 2.0, "day_player": 3.0}
+    # Rates the file leaves out keep their defaults
+    assert rates.equipment_day_rate == RateTable().equipment_day_rate
+    assert get_rate_table() is rates
+
+def test_no_cost_rates_path_means_the_default_rates(monkeypatch, fresh_rate_table):
+    monkeypatch.delenv("COST_RATES_PATH", raising=False)
+
+    assert get_rate_table() == RateTable()
+    assert load_rate_table("") == RateTable()
+
+def test_estimate_uses_the_configured_rates(tmp_path, monkeypatch, fresh_rate_table, sample_script):
+    statistics = compute_script_statistics(parse_script(sample_script))
+    default = estimate_costs(statistics, RateTable())
+    rates_path = tmp_path / "rates.json"
+    rates_path.write_text(json.dumps({"currency": "EUR", "equipment_day_rate": 0.0, "night_lighting_day_rate": 0.0}))
+    monkeypatch.setenv("COST_RATES_PATH", str(rates_path))
+
+    configured = estimate_costs(statistics)
+
+    assert configured.currency == "EUR"
+    assert line_amount(default, "Equipment") > 0
+    assert line_amount(configured, "Equipment") == 0
+    assert configured.total < default.total
+    assert configured.breakdown_fields()["estimated_budget_range"].endswith("EUR)")
+
+def test_script_without_cast_is_priced_without_cast_lines():
+    statistics = ScriptStatistics(
+        scene_numbers=[1, 2, 3],
+        locations=["DESERT", "DESERT", "CABIN"],
+        page_eighths=[8, 4, 12],
+        dialogue_ratio=[0.0, 0.0, 0.0],
+        cast_size=[0, 0, 0],
+        cast=[[], [], []],
+        is_night=[False, True, False],
+        is_interior=[False, False, True],
+        is_exterior=[True, True, False],
+    )
+
+    estimate = estimate_costs(statistics, RateTable())
+
+    assert estimate.cast_days == {}
+    assert estimate.cast_tiers == {}
+    assert line_amount(estimate, "Cast") == 0
+    assert line_amount(estimate, "Locations") > 0
+    assert estimate.total == pytest.approx(sum(line.amount for line in estimate.line_items))
+    assert estimate.breakdown_fields()["talent_requirements"] == []
+
+def test_cost_analysis_without_cast_and_without_the_model(monkeypatch, fresh_rate_table):
+    monkeypatch.setenv("COST_SUGGESTIONS_ENABLED", "0")
+    monkeypatch.delenv("COST_RATES_PATH", raising=False)
+    statistics = compute_script_statistics(parse_script("EXT. DESERT - DAY\n\nWind sweeps the dunes.\n"))
+    raw_data = RawScriptData.model_construct()
+
+    breakdown = asyncio.run(analyze_costs(raw_data, statistics=statistics))
+
+    assert breakdown.estimated_shoot_days == 1
+    assert breakdown.talent_requirements == []
+    assert breakdown.cost_optimization_suggestions == []
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from pydantic_ai.models.test import TestModel
+
+from agents_graph2 import ScriptAnalysisState, build_initial_state, create_script_analysis_workflow, route_analyses
+from analysis_registry import ANALYSIS_SPECS
+from cost_model import estimate_costs
+from fusion import FusionGroup, parse_fusion_groups
+from script_parser import parse_script
+from script_stats import compute_script_statistics
+
+class CountingModel(TestModel):
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+
+    async def request(self, *args, **kwargs):
+        self.requests += 1
+        return await super().request(*args, **kwargs)
+
+def test_parse_fusion_groups():
+    groups = parse_fusion_groups(" location+props , timeline + cost,")
+
+    # Registry order, whatever order the names were given in
+    assert groups == [FusionGroup(("props", "location")), FusionGroup(("cost", "timeline"))]
+    assert [group.node_name for group in groups] == ["props_location_node", "cost_timeline_node"]
+    assert groups[1].input_fields == ("characters", "locations", "scene_count", "estimated_pages")
+    assert groups[1].derived_inputs == ("script_statistics", "cost_estimate", "shooting_schedule")
+    assert parse_fusion_groups("") == []
+
+@pytest.mark.parametrize("value, message", [
+    ("cost+budget", "Unknown analyses"),
+    ("cost", "at least two"),
+    ("cost+cost", "at least two"),
+    ("cost+props,props+timeline", "more than one fusion group"),
+])
+def test_parse_fusion_groups_rejects_invalid_groups(value, message):
+    with pytest.raises(ValueError, match=message):
+        parse_fusion_groups(value)
+
+def test_split_returns_each_breakdown_finalized_with_the_statistics(sample_script):
+    group = FusionGroup(("cost", "props"))
+    statistics = compute_script_statistics(parse_script(sample_script))
+    result = asyncio.run(group.get_agent().run("{}")).output
+
+    unfinalized = group.split(result)
+    breakdowns = group.split(result, statistics)
+
+    assert set(breakdowns) == {"cost", "props"}
+    assert isinstance(breakdowns["cost"], ANALYSIS_SPECS["cost"].output_type)
+    assert unfinalized["cost"] is result.cost
+    assert breakdowns["props"] is result.props     # No finalize step for props
+    assert breakdowns["cost"].estimated_shoot_days == estimate_costs(statistics).shoot_days
+    assert breakdowns["cost"].cost_optimization_suggestions == result.cost.cost_optimization_suggestions
+
+def test_fused_group_fills_every_analysis_with_one_model_call(sample_script):
+    group = FusionGroup(("cost", "timeline"))
+    workflow = create_script_analysis_workflow([group])
+    fused, cost, timeline = CountingModel(), CountingModel(), CountingModel()
+
+    with group.get_agent().override(model=fused), ANALYSIS_SPECS["cost"].get_agent().override(model=cost), \
+            ANALYSIS_SPECS["timeline"].get_agent().override(model=timeline):
+        final_state = ScriptAnalysisState.model_validate(
+            asyncio.run(workflow.ainvoke(build_initial_state(sample_script, ["cost", "timeline"])))
+        )
+
+    assert final_state.errors == []
+    assert final_state.analyses_complete == {"cost": True, "timeline": True}
+    assert final_state.cost_analysis is not None and final_state.timeline_analysis is not None
+    assert final_state.processing_metadata["cost_fused_with"] == "cost+timeline"
+    assert (fused.requests, cost.requests, timeline.requests) == (1, 0, 0)
+
+def test_partly_requested_groups_run_separately(sample_script):
+    group = FusionGroup(("cost", "timeline"))
+
+    assert route_analyses(build_initial_state(sample_script, ["cost", "props"]), [group]) == ["cost_node", "props_node"]
+    assert route_analyses(build_initial_state(sample_script, ["timeline", "cost"]), [group]) == ["cost_timeline_node"]
@@ -0,0 +1,84 @@
+import asyncio
+
+from hedging import Hedger, parse_budgets
+
+def slow_then_fast(slow_seconds: float = 0.2):
+    """Agent call whose first copy is slow and whose hedged copy returns at once"""
+    copies = []
+
+    async def call():
+        copies.append(len(copies))
+        if len(copies) == 1:
+            await asyncio.sleep(slow_seconds)
+            return "primary"
+        return "hedge"
+
+    return call, copies
+
+async def fast():
+    return "primary"
+
+def warm_up(hedger: Hedger, agent: str, calls: int) -> None:
+    async def main():
+        for _ in range(calls):
+            await hedger.run(agent, fast)
+
+    asyncio.run(main())
+
+def test_no_hedging_until_min_samples_calls_were_observed():
+    hedger = Hedger(quantile=0.5, min_samples=5, budget=1.0, min_delay_seconds=0.01)
+    warm_up(hedger, "cost", 4)
+    assert hedger.hedge_delay("cost") is None
+
+    call, copies = slow_then_fast()
+    assert asyncio.run(hedger.run("cost", call)) == "primary"
+    assert len(copies) == 1
+    assert hedger.stats()["cost"]["hedges_fired"] == 0
+
+    # The slow call was the fifth sample: the next slow call is hedged
+    assert hedger.hedge_delay("cost") is not None
+    call, copies = slow_then_fast()
+    assert asyncio.run(hedger.run("cost", call)) == "hedge"
+    assert len(copies) == 2
+    assert hedger.stats()["cost"] == {"calls": 6, "hedges_fired": 1, "hedges_won": 1, "hedge_rate": 1 / 6}
+
+def test_hedges_stay_within_the_budget():
+    hedger = Hedger(quantile=0.5, min_samples=3, budget=0.2, min_delay_seconds=0.01)
+    warm_up(hedger, "cost", 10)
+
+    results = []
+    for _ in range(5):
+        call, _ = slow_then_fast()
+        results.append(asyncio.run(hedger.run("cost", call)))
+        stats = hedger.stats()["cost"]
+        assert stats["hedges_fired"] <= 0.2 * stats["calls"]
+
+    # Calls 11 and 12 fit in 20% of the calls so far, 13 and 14 do not, 15 does again
+    assert results == ["hedge", "hedge", "primary", "primary", "hedge"]
+    assert hedger.stats()["cost"]["hedges_fired"] == 3
+
+def test_per_agent_budgets():
+    hedger = Hedger(quantile=0.5, min_samples=3, budget=1.0, budgets=parse_budgets("cost=0, timeline = 1"), min_delay_seconds=0.01)
+    for agent in ("cost", "timeline"):
+        warm_up(hedger, agent, 3)
+
+    call, copies = slow_then_fast(0.05)
+    assert asyncio.run(hedger.run("cost", call)) == "primary"
+    assert len(copies) == 1
+    call, copies = slow_then_fast(0.05)
+    assert asyncio.run(hedger.run("timeline", call)) == "hedge"
+
+def test_a_failed_copy_loses_to_the_other():
+    hedger = Hedger(quantile=0.5, min_samples=3, budget=1.0, min_delay_seconds=0.01)
+    warm_up(hedger, "cost", 3)
+    copies = []
+
+    async def call():
+        copies.append(len(copies))
+        if len(copies) == 1:
+            await asyncio.sleep(0.05)
+            return "primary"
+        raise RuntimeError("hedge failed")
+
+    assert asyncio.run(hedger.run("cost", call)) == "primary"
+    assert hedger.stats()["cost"]["hedges_won"] == 0
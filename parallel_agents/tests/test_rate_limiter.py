@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from rate_limiter import RateLimiter, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_bucket_refills_continuously_up_to_its_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=5, clock=clock)     # 10 per second, 50 at once
+    assert bucket.capacity == 50
+
+    bucket.take(50)
+    assert bucket.time_until(20) == pytest.approx(2.0)
+
+    clock.now = 1.5
+    assert bucket.time_until(15) == 0
+    assert bucket.level == pytest.approx(15)
+
+    clock.now = 100
+    assert bucket.time_until(1) == 0
+    assert bucket.level == 50
+
+def test_bucket_debt_is_paid_back_before_the_next_request():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=1, clock=clock)
+
+    bucket.take(30)     # Larger than estimated: the level goes below zero
+
+    assert bucket.level == -20
+    assert bucket.time_until(1) == pytest.approx(2.1)
+    # More than the capacity only needs a full bucket
+    assert bucket.time_until(1000) == pytest.approx(3.0)
+    bucket.give_back(100)
+    assert bucket.level == 10
+
+def limiter(tokens_per_second: float) -> RateLimiter:
+    """Limiter bounded by tokens only, with one second of burst"""
+    return RateLimiter(requests_per_minute=600_000, tokens_per_minute=tokens_per_second * 60, burst_seconds=1)
+
+def test_waiters_are_served_in_arrival_order():
+    rate_limiter = limiter(1000)
+    served = []
+
+    async def request(name: str, tokens: int):
+        await rate_limiter.acquire(tokens)
+        served.append(name)
+
+    async def main():
+        await rate_limiter.acquire(1000)    # Empty the bucket
+        # The large request arrives first; the small ones behind it could go right away but must not overtake it
+        await asyncio.gather(request("large", 200), request("small-1", 1), request("small-2", 1))
+
+    asyncio.run(main())
+
+    assert served == ["large", "small-1", "small-2"]
+    stats = rate_limiter.stats()
+    assert stats["requests"] == 4
+    assert stats["delayed"] == 3
+    assert stats["max_queue_depth"] == 3
+    assert stats["queue_depth"] == 0
+
+def test_cancelled_head_hands_its_turn_to_the_next_waiter():
+    rate_limiter = limiter(1000)
+
+    async def main():
+        await rate_limiter.acquire(1000)
+        head = asyncio.create_task(rate_limiter.acquire(1000))
+        behind = asyncio.create_task(rate_limiter.acquire(10))
+        await asyncio.sleep(0.01)
+        assert not behind.done()
+        head.cancel()
+        return await asyncio.wait_for(behind, timeout=1)
+
+    waited = asyncio.run(main())
+
+    assert waited < 0.5
+    assert rate_limiter.stats()["queue_depth"] == 0
+
+def test_reported_usage_corrects_the_estimate():
+    rate_limiter = limiter(1000)
+
+    async def main():
+        await rate_limiter.acquire(100)
+        rate_limiter.settle(100, 1100)      # 1000 more than estimated: the bucket is in debt
+        return await rate_limiter.acquire(100)
+
+    waited = asyncio.run(main())
+
+    assert waited >= 0.15
+    assert rate_limiter.stats()["reported_tokens"] == 1100
+    assert rate_limiter.stats()["estimated_tokens"] == 200
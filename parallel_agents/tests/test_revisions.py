@@ -0,0 +1,39 @@
+import asyncio
+
+from agents.info_gathering_agent import CHARS_PER_PAGE, RawScriptData, extract_script_data, merge_raw_script_data
+from revisions import RevisionStore, run_incremental_analysis
+from script_parser import parse_script
+
+SCENE = """INT. OFFICE {number} - DAY
+
+SARAH sits at her desk.
+
+SARAH
+Another meeting.
+
+"""
+
+def partial(pages: int, length: int) -> RawScriptData:
+    return RawScriptData(
+        characters=["SARAH"], locations=["OFFICE"], dialogue_lines=[], action_lines=[],
+        language_detected="English", script_length=length, estimated_pages=pages, scene_count=1
+    )
+
+def test_merged_pages_are_estimated_from_length_not_summed():
+    merged = merge_raw_script_data([partial(1, 300)] * 20)
+    assert merged.script_length == 6000
+    assert merged.estimated_pages == round(6000 / CHARS_PER_PAGE)
+    assert merged.scene_count == 20
+
+def test_incremental_run_counts_pages_like_a_full_run(tmp_path):
+    script = "".join(SCENE.format(number=number) for number in range(120))
+    parsed_script = parse_script(script)
+    full_run = asyncio.run(extract_script_data(script, parsed_script))
+
+    final_state, report = asyncio.run(run_incremental_analysis(
+        "draft", script, ["cost"], store=RevisionStore(str(tmp_path / "revisions.sqlite3"))
+    ))
+
+    assert report.scenes_total == 120
+    assert final_state.raw_data.estimated_pages == full_run.estimated_pages == parsed_script.estimated_pages
+    assert final_state.raw_data.scene_count == full_run.scene_count == 120
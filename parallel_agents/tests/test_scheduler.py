@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from scheduler import _Scenes, _Search, build_shooting_schedule, format_day_ranges
+from script_stats import ScriptStatistics
+
+LOCATIONS = ["OFFICE", "STREET", "DINER", "APARTMENT", "PARK", "WAREHOUSE"]
+CAST = ["SARAH", "MIKE", "ANNA", "BEN", "CHEN", "PRIYA"]
+
+def make_statistics(scene_count: int, seed: int = 7) -> ScriptStatistics:
+    rng = random.Random(seed)
+    locations = [rng.choice(LOCATIONS) for _ in range(scene_count)]
+    cast = [rng.sample(CAST, rng.randint(0, 3)) for _ in range(scene_count)]
+    exterior = [location in ("STREET", "PARK") for location in locations]
+    return ScriptStatistics(
+        scene_numbers=list(range(1, scene_count + 1)),
+        locations=locations,
+        page_eighths=[rng.randint(1, 24) for _ in range(scene_count)],
+        dialogue_ratio=[0.5] * scene_count,
+        cast_size=[len(names) for names in cast],
+        cast=cast,
+        is_night=[rng.random() < 0.3 for _ in range(scene_count)],
+        is_interior=[not value for value in exterior],
+        is_exterior=exterior,
+    )
+
+def assert_consistent(search: _Search, scene_count: int) -> None:
+    """Every scene is on exactly one day, and each day's counters match its members"""
+    scenes = search.scenes
+    members = [i for day in search.days for i in day.members]
+    assert sorted(members) == list(range(scene_count))
+    for day in search.days:
+        assert all(search.day_of[i] is day for i in day.members)
+        assert day.load == sum(scenes.eighths[i] for i in day.members)
+        assert set(day.locations) == {scenes.location[i] for i in day.members}
+        for location in day.locations:
+            assert day in search.by_location[location]
+
+@pytest.mark.parametrize("pages_per_day", [2.0, 5.0, 8.0])
+def test_days_stay_within_the_page_limit(pages_per_day):
+    statistics = make_statistics(80)
+    schedule = build_shooting_schedule(statistics, pages_per_day)
+
+    limit = round(pages_per_day * 8)
+    scheduled = [number for day in schedule.days for number in day.scene_numbers]
+    assert sorted(scheduled) == statistics.scene_numbers
+    for day in schedule.days:
+        assert day.page_eighths <= limit or len(day.scene_numbers) == 1
+    assert schedule.total_eighths == sum(statistics.page_eighths)
+
+def test_a_scene_longer_than_a_day_gets_a_day_of_its_own():
+    statistics = make_statistics(5)
+    statistics.page_eighths[2] = 100
+
+    schedule = build_shooting_schedule(statistics, 5.0)
+
+    assert [3] in [day.scene_numbers for day in schedule.days]
+
+def test_relocate_and_swap_never_lose_a_scene_or_setup():
+    statistics = make_statistics(120, seed=3)
+    scenes = _Scenes(statistics)
+    search = _Search(scenes, 40)
+    search.pack(list(range(len(scenes.numbers))))     # Script order, so the search has work to do
+    assert_consistent(search, 120)
+
+    cost = search.total_cost()
+    for _ in range(5):
+        search.relocate()
+        assert_consistent(search, 120)
+        search.swap()
+        assert_consistent(search, 120)
+        search.close_days()
+        assert_consistent(search, 120)
+        assert all(day.load <= search.capacity for day in search.days)
+        assert search.total_cost() <= cost
+        cost = search.total_cost()
+
+def test_every_setup_is_scheduled_and_the_schedule_is_deterministic():
+    statistics = make_statistics(60, seed=11)
+
+    schedule = build_shooting_schedule(statistics, 5.0)
+
+    setup_scenes = sorted(number for setup in schedule.setups for number in setup.scene_numbers)
+    assert setup_scenes == statistics.scene_numbers
+    for setup in schedule.setups:
+        on_days = {number for day in schedule.days if day.day in setup.days for number in day.scene_numbers}
+        assert set(setup.scene_numbers) <= on_days
+    assert build_shooting_schedule(statistics, 5.0) == schedule
+
+def test_format_day_ranges():
+    assert format_day_ranges([5, 1, 2, 3, 3]) == "1-3, 5"
+    assert format_day_ranges([4]) == "4"
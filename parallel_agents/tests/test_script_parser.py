@@ -0,0 +1,47 @@
+import pytest
+
+from script_parser import CHARACTER, DIALOGUE, PARENTHETICAL, parse_script, split_scene_heading, tokenize_script
+
+@pytest.mark.parametrize("heading, expected", [
+    ("INT. HOUSE - DAY", ("INT", "HOUSE", "DAY")),
+    ("EXT. CITY STREET - NIGHT", ("EXT", "CITY STREET", "NIGHT")),
+    ("INT./EXT. CAR - CONTINUOUS", ("INT/EXT", "CAR", "CONTINUOUS")),
+    ("I/E. TRAIN - DAWN", ("INT/EXT", "TRAIN", "DAWN")),
+    ("12A INT. KITCHEN - MORNING 12A", ("INT", "KITCHEN", "MORNING")),
+    ("EST. SKYLINE", ("EXT", "SKYLINE", "")),
+    ("INTERIOR WAREHOUSE - NIGHT", ("INT", "WAREHOUSE", "NIGHT")),
+])
+def test_split_scene_heading(heading, expected):
+    assert split_scene_heading(heading) == expected
+
+def test_scene_headings_and_character_cues(sample_script):
+    parsed = parse_script(sample_script)
+
+    assert [scene.heading for scene in parsed.scenes] == ["INT. COFFEE SHOP - DAY", "EXT. CITY STREET - NIGHT"]
+    assert parsed.characters == ["SARAH", "BARISTA", "MIKE"]
+    assert parsed.scenes[0].speaking_characters == ["SARAH", "BARISTA"]
+    assert parsed.scenes[0].parenthetical_count == 1
+    assert parsed.scenes[1].dialogue_counts == {"MIKE": 1}
+    assert parsed.is_structured
+
+def test_cue_extensions_and_dual_dialogue():
+    script = "INT. HALL - DAY\n\nANNA (V.O.)\nWhere are you?\n\nBEN (CONT'D) ^\n(shouting)\nRight here!\n"
+    tokens = list(tokenize_script(script.splitlines()))
+
+    cues = [token.character for token in tokens if token.kind == CHARACTER]
+    assert cues == ["ANNA", "BEN"]
+    assert [token.kind for token in tokens[-2:]] == [PARENTHETICAL, DIALOGUE]
+
+def test_all_caps_action_without_dialogue_is_not_a_cue():
+    parsed = parse_script("INT. HALL - DAY\n\nBOOM.\n\nThe lights go out.\n")
+
+    assert parsed.characters == []
+    assert parsed.scenes[0].action_line_count == 2
+
+def test_sentence_case_prefixes_are_not_scene_headings():
+    script = "INT. HOUSE - DAY\n\nJohn walks in.\n\nInterior lights flicker as he talks.\n\nJOHN\nEst. time is ten.\n"
+    parsed = parse_script(script)
+
+    assert [scene.heading for scene in parsed.scenes] == ["INT. HOUSE - DAY"]
+    assert parsed.scenes[0].action_line_count == 2
+    assert parsed.scenes[0].dialogue_line_count == 1
@@ -0,0 +1,61 @@
+import json
+import time
+
+from tracing import AgentStats, Span, Tracer, percentile
+
+def span(agent: str, duration: float, model_latency: float = 0.0, **fields) -> Span:
+    return Span(node=f"{agent}_node", agent=agent, duration_seconds=duration,
+                model_latency_seconds=model_latency, model_requests=1 if model_latency else 0, **fields)
+
+def test_percentile_is_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+def test_agent_stats_keep_a_rolling_window_and_totals():
+    stats = AgentStats(window=10)
+    for index in range(1, 21):
+        stats.add(span("cost", float(index), model_latency=index / 10, input_tokens=5, retries=index % 2))
+    stats.add(span("cost", 0.5, cache_hit=True))
+
+    summary = stats.summary()
+    # Percentiles cover the last 10 spans (model latency only those that reached the model), totals every span
+    assert summary["latency_seconds"] == {"p50": 15.0, "p95": 20.0, "p99": 20.0}
+    assert summary["model_latency_seconds"]["p50"] == 1.5
+    assert summary["count"] == 21
+    assert summary["cache_hits"] == 1
+    assert summary["retries"] == 10
+    assert summary["input_tokens"] == 100
+    assert summary["duration_sum_seconds"] == 210.5
+
+def test_render_prometheus():
+    tracer = Tracer(export_path=None)
+    tracer.record(span("cost", 2.0, model_latency=1.5, input_tokens=100, output_tokens=20))
+    tracer.record(span("cost", 4.0, error="boom"))
+
+    lines = tracer.render_prometheus().splitlines()
+
+    assert "# TYPE script_agent_latency_seconds summary" in lines
+    assert 'script_agent_latency_seconds{agent="cost",quantile="0.5"} 2.0' in lines
+    assert 'script_agent_latency_seconds{agent="cost",quantile="0.99"} 4.0' in lines
+    assert 'script_agent_latency_seconds_sum{agent="cost"} 6.0' in lines
+    assert 'script_agent_latency_seconds_count{agent="cost"} 2' in lines
+    assert 'script_agent_model_latency_seconds{agent="cost",quantile="0.5"} 1.5' in lines
+    assert 'script_agent_errors_total{agent="cost"} 1' in lines
+    assert 'script_agent_input_tokens_total{agent="cost"} 100' in lines
+
+def test_summary_is_exported_by_a_background_thread(tmp_path):
+    export_path = tmp_path / "trace_summary.json"
+    tracer = Tracer(export_path=str(export_path), export_interval_seconds=0.05)
+
+    tracer.record(span("timeline", 1.0))
+    # record() itself does not write the file
+    assert not export_path.exists()
+
+    deadline = time.monotonic() + 5
+    while not export_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert json.loads(export_path.read_text())["agents"]["timeline"]["count"] == 1
@@ -0,0 +1,14 @@
+import asyncio
+
+from agents.info_gathering_agent import get_info_gathering_agent
+from analysis_registry import ANALYSIS_SPECS
+from fusion import get_fused_agent
+from utils import close_models
+
+def test_close_models_drops_cached_agents():
+    agents = [get_info_gathering_agent(), ANALYSIS_SPECS["cost"].get_agent(), get_fused_agent(("cost", "timeline"))]
+
+    asyncio.run(close_models())
+
+    rebuilt = [get_info_gathering_agent(), ANALYSIS_SPECS["cost"].get_agent(), get_fused_agent(("cost", "timeline"))]
+    assert all(old is not new for old, new in zip(agents, rebuilt))
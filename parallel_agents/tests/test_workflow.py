@@ -0,0 +1,37 @@
+import asyncio
+
+from agents.info_gathering_agent import raw_data_from_parsed_script
+from agents_graph2 import ScriptAnalysisState, analyze_script_workflow, build_initial_state
+from language_detect import detect_language
+from script_parser import parse_script
+
+def run_workflow(state: ScriptAnalysisState) -> ScriptAnalysisState:
+    return ScriptAnalysisState.model_validate(asyncio.run(analyze_script_workflow.ainvoke(state)))
+
+def test_supplied_raw_data_is_reused(sample_script):
+    # Incremental re-analysis hands the graph raw data it rebuilt from stored scene extractions
+    raw_data = raw_data_from_parsed_script(parse_script(sample_script), sample_script, detect_language(sample_script))
+    state = build_initial_state(sample_script, ["cost", "timeline"]).model_copy(update={
+        "raw_data": raw_data,
+        "extraction_complete": True
+    })
+
+    final_state = run_workflow(state)
+
+    assert final_state.errors == []
+    assert final_state.extraction_complete
+    assert final_state.degraded == []
+    assert final_state.raw_data == raw_data
+    assert set(final_state.analysis_inputs) == {"cost", "timeline"}
+    assert final_state.analyses_complete == {"cost": True, "timeline": True}
+
+def test_script_content_is_still_a_graph_input(sample_script):
+    schema = analyze_script_workflow.get_input_jsonschema()
+    assert "script_content" in schema["properties"]
+
+    final_state = asyncio.run(analyze_script_workflow.ainvoke({"script_content": sample_script, "requested_analyses": ["cost"]}))
+
+    assert final_state["errors"] == []
+    assert final_state["script_content"] is None
+    assert final_state["script"].text() == sample_script
+    assert final_state["analyses_complete"] == {"cost": True}
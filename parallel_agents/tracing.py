@@ -0,0 +1,302 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache, wraps
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+from collections import deque
+from dotenv import load_dotenv
+import atexit
+import json
+import math
+import os
+import threading
+import time
+
+load_dotenv()
+
+DEFAULT_TRACE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "trace_summary.json")
+DEFAULT_WINDOW = 1000                   # Spans kept per agent for the rolling percentiles
+DEFAULT_EXPORT_INTERVAL_SECONDS = 5.0   # Time between JSON exports while spans are being recorded
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Span
+@dataclass
+class Span:
+    """One graph node execution"""
+    node: str                               # Graph node name
+    agent: str                              # Agent (or phase) the node runs, used to aggregate
+    start_time: float = field(default_factory=time.time)
+    end_time: Optional[float] = None
+    duration_seconds: float = 0.0           # Wall time of the whole node
+    model_latency_seconds: float = 0.0      # Time spent waiting on model requests
+    model_requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    retries: int = 0                        # Requests re-sent after output validation failed
+    cache_hit: bool = False
+    hedged: bool = False                    # A duplicate request was sent (see hedging.py)
+    hedge_won: bool = False                 # The duplicate finished first
+    rate_limit_wait_seconds: float = 0.0    # Time requests waited for quota (see rate_limiter.py)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    """Return the span of the node running in this context, if tracing is enabled"""
+    return _current_span.get()
+
+def record_model_request(latency_seconds: float, usage: Any, is_retry: bool = False) -> None:
+    """Add one model request (and its pydantic-ai Usage) to the current span"""
+    span = _current_span.get()
+    if span is None:
+        return
+    span.model_latency_seconds += latency_seconds
+    span.model_requests += 1
+    span.input_tokens += getattr(usage, "request_tokens", None) or 0
+    span.output_tokens += getattr(usage, "response_tokens", None) or 0
+    if is_retry:
+        span.retries += 1
+
+# Aggregation
+def percentile(sorted_values: List[float], quantile: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(quantile * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class AgentStats:
+    """Rolling latency window and running totals for one agent"""
+
+    def __init__(self, window: int):
+        self.durations: Deque[float] = deque(maxlen=window)
+        self.model_latencies: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.model_requests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.duration_sum = 0.0
+
+    def add(self, span: Span) -> None:
+        self.durations.append(span.duration_seconds)
+        self.count += 1
+        self.duration_sum += span.duration_seconds
+        self.errors += span.error is not None
+        self.cache_hits += span.cache_hit
+        self.retries += span.retries
+        self.model_requests += span.model_requests
+        self.input_tokens += span.input_tokens
+        self.output_tokens += span.output_tokens
+        # Cache hits and parser-only runs never reach the model
+        if span.model_requests:
+            self.model_latencies.append(span.model_latency_seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        durations = sorted(self.durations)
+        model_latencies = sorted(self.model_latencies)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "retries": self.retries,
+            "model_requests": self.model_requests,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "duration_sum_seconds": self.duration_sum,
+            "latency_seconds": {f"p{int(q * 100)}": percentile(durations, q) for q in QUANTILES},
+            "model_latency_seconds": {f"p{int(q * 100)}": percentile(model_latencies, q) for q in QUANTILES},
+        }
+
+class Tracer:
+    """
+    Collects finished spans, keeps rolling percentiles per agent and exports them.
+
+    The JSON summary is written by a background thread every export interval
+    while new spans have been recorded, so record() never touches the disk.
+    """
+
+    def __init__(self, export_path: Optional[str] = DEFAULT_TRACE_PATH, window: int = DEFAULT_WINDOW,
+                 export_interval_seconds: float = DEFAULT_EXPORT_INTERVAL_SECONDS):
+        self.export_path = export_path
+        self.window = window
+        self.export_interval_seconds = export_interval_seconds
+        self._lock = threading.Lock()
+        self._agents: Dict[str, AgentStats] = {}
+        self._recent: Deque[Span] = deque(maxlen=window)
+        self._dirty = False
+        self._exporter: Optional[threading.Thread] = None
+        self._export_lock = threading.Lock()     # The exporter thread and the exit flush share the temp file
+
+    def record(self, span: Span) -> None:
+        """Add a finished span; the summary is exported by the background thread"""
+        with self._lock:
+            if span.agent not in self._agents:
+                self._agents[span.agent] = AgentStats(self.window)
+            self._agents[span.agent].add(span)
+            self._recent.append(span)
+            self._dirty = True
+            start_exporter = bool(self.export_path) and self._exporter is None
+            if start_exporter:
+                self._exporter = threading.Thread(target=self._export_periodically, name="trace-export", daemon=True)
+        if start_exporter:
+            self._exporter.start()
+
+    def _export_periodically(self) -> None:
+        while True:
+            time.sleep(self.export_interval_seconds)
+            self.flush()
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-agent totals and p50/p95/p99 latencies, plus the most recent spans"""
+        with self._lock:
+            return {
+                "generated_at": time.time(),
+                "window": self.window,
+                "agents": {name: stats.summary() for name, stats in self._agents.items()},
+                "recent_spans": [span.to_dict() for span in self._recent],
+            }
+
+    def export_json(self) -> None:
+        """Write the summary to the export path (atomically, so readers never see half a file)"""
+        if not self.export_path:
+            return
+        with self._export_lock:
+            summary = self.summary()
+            with self._lock:
+                self._dirty = False
+            try:
+                os.makedirs(os.path.dirname(self.export_path) or ".", exist_ok=True)
+                temp_path = f"{self.export_path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(summary, f, indent=2)
+                os.replace(temp_path, self.export_path)
+            except OSError as e:
+                print(f"⚠️ Could not export trace summary: {e}")
+
+    def flush(self) -> None:
+        """Export if spans were recorded since the last export"""
+        if self._dirty:
+            self.export_json()
+
+    def render_prometheus(self) -> str:
+        """Render the per-agent metrics in the Prometheus text exposition format"""
+        summary = self.summary()["agents"]
+        lines = []
+
+        for metric, key, help_text in (
+            ("script_agent_latency_seconds", "latency_seconds", "Node wall time per agent"),
+            ("script_agent_model_latency_seconds", "model_latency_seconds", "Time waiting on model requests per agent"),
+        ):
+            lines.append(f"# HELP {metric} {help_text} (rolling window)")
+            lines.append(f"# TYPE {metric} summary")
+            for agent, stats in summary.items():
+                for quantile in QUANTILES:
+                    value = stats[key][f"p{int(quantile * 100)}"]
+                    lines.append(f'{metric}{{agent="{agent}",quantile="{quantile}"}} {value}')
+                if key == "latency_seconds":
+                    lines.append(f'{metric}_sum{{agent="{agent}"}} {stats["duration_sum_seconds"]}')
+                    lines.append(f'{metric}_count{{agent="{agent}"}} {stats["count"]}')
+
+        for metric, key, help_text in (
+            ("script_agent_runs_total", "count", "Node executions per agent"),
+            ("script_agent_errors_total", "errors", "Node executions that reported an error"),
+            ("script_agent_cache_hits_total", "cache_hits", "Analyses served from the result cache"),
+            ("script_agent_retries_total", "retries", "Model requests re-sent after output validation failed"),
+            ("script_agent_model_requests_total", "model_requests", "Model requests sent"),
+            ("script_agent_input_tokens_total", "input_tokens", "Prompt tokens reported by the model"),
+            ("script_agent_output_tokens_total", "output_tokens", "Response tokens reported by the model"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for agent, stats in summary.items():
+                lines.append(f'{metric}{{agent="{agent}"}} {stats[key]}')
+
+        return "\n".join(lines) + "\n"
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Optional[Tracer]:
+    """
+    Return the process-wide tracer, or None when TRACING_ENABLED is off.
+
+    Configured through TRACE_EXPORT_PATH (empty disables the JSON file),
+    TRACE_WINDOW and TRACE_EXPORT_INTERVAL_SECONDS.
+    """
+    global _tracer
+    if os.getenv('TRACING_ENABLED', '1').lower() in ('0', 'false', 'no'):
+        return None
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(
+                export_path=os.getenv('TRACE_EXPORT_PATH', DEFAULT_TRACE_PATH),
+                window=int(os.getenv('TRACE_WINDOW', DEFAULT_WINDOW)),
+                export_interval_seconds=float(os.getenv('TRACE_EXPORT_INTERVAL_SECONDS', DEFAULT_EXPORT_INTERVAL_SECONDS))
+            )
+            atexit.register(_tracer.flush)
+        return _tracer
+
+# Instrumentation
+@asynccontextmanager
+async def start_span(node: str, agent: str) -> AsyncIterator[Optional[Span]]:
+    """Open a span for a node; model requests made inside are recorded on it"""
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+
+    span = Span(node=node, agent=agent)
+    token = _current_span.set(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception as e:
+        span.error = str(e)
+        raise
+    finally:
+        span.duration_seconds = time.perf_counter() - start
+        span.end_time = time.time()
+        _current_span.reset(token)
+        tracer.record(span)
+
+def traced_node(node: str, agent: str, node_func: Callable[[Any], Awaitable[Dict[str, Any]]]):
+    """Wrap a graph node so each execution is recorded as a span"""
+    @wraps(node_func)
+    async def run_traced(state):
+        async with start_span(node, agent) as span:
+            update = await node_func(state)
+            if span is not None and update and update.get("errors"):
+                span.error = update["errors"][0]
+            return update
+    return run_traced
+
+def instrument_model(model):
+    """Wrap a pydantic-ai model so every request is recorded on the current span"""
+    return _traced_model_class()(model)
+
+@lru_cache(maxsize=None)
+def _traced_model_class():
+    # Built on first use so importing this module does not load pydantic-ai
+    from pydantic_ai.messages import ModelRequest, RetryPromptPart
+    from pydantic_ai.models.wrapper import WrapperModel
+
+    class TracedModel(WrapperModel):
+        """Model wrapper timing each request and reading its usage"""
+
+        async def request(self, messages, *args, **kwargs):
+            # A retry prompt in the last message means the previous output failed validation
+            is_retry = bool(messages) and isinstance(messages[-1], ModelRequest) and any(
+                isinstance(part, RetryPromptPart) for part in messages[-1].parts
+            )
+            start = time.perf_counter()
+            response = await super().request(messages, *args, **kwargs)
+            record_model_request(time.perf_counter() - start, response.usage, is_retry)
+            return response
+
+    return TracedModel
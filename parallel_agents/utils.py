@@ -1,16 +1,168 @@
-from pydantic_ai.models.gemini import GeminiModel
-from pydantic_ai.providers.google_gla import GoogleGLAProvider
 from dotenv import load_dotenv
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional
+import importlib.util
 import os
+import threading
 
-load_dotenv()
-
-def get_model():
-    model_name = os.getenv('MODEL_CHOICE', 'gemini-2.0-flash')
-    api_key = os.getenv('GEMINI_KEY')
-    
-    # Initialize the provider with the API key
-    provider = GoogleGLAProvider(api_key=api_key)
-    
-    # Create GeminiModel with the provider
-    return GeminiModel(model_name, provider=provider)
\ No newline at end of file
+# pydantic-ai and httpx are only imported once a model is actually needed,
+# so importing the agents and the graph stays cheap
+if TYPE_CHECKING:
+    import httpx
+    from pydantic_ai.models import Model
+    from pydantic_ai.models.gemini import GeminiModel
+    from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+@lru_cache(maxsize=None)
+def load_environment() -> None:
+    """Load .env once, on first use"""
+    load_dotenv()
+
+# Connection pool configuration - one pool is shared by every agent in the process
+def get_pool_settings() -> Dict[str, object]:
+    """Read HTTP connection pool settings from the environment"""
+    load_environment()
+    http2_requested = os.getenv('MODEL_HTTP2', '1').lower() not in ('0', 'false', 'no')
+    return {
+        'max_connections': int(os.getenv('MODEL_MAX_CONNECTIONS', 100)),
+        'max_keepalive_connections': int(os.getenv('MODEL_MAX_KEEPALIVE_CONNECTIONS', 100)),
+        'keepalive_expiry': float(os.getenv('MODEL_KEEPALIVE_EXPIRY', 120)),
+        # HTTP/2 needs the optional h2 package, otherwise fall back to HTTP/1.1 keep-alive
+        'http2': http2_requested and importlib.util.find_spec('h2') is not None,
+        'timeout': float(os.getenv('MODEL_TIMEOUT', 600)),
+        'connect_timeout': float(os.getenv('MODEL_CONNECT_TIMEOUT', 5)),
+    }
+
+def create_http_client(transport: Optional["httpx.AsyncBaseTransport"] = None) -> "httpx.AsyncClient":
+    """
+    Create an HTTP client with a tuned keep-alive connection pool
+
+    Args:
+        transport: Custom transport (e.g. for benchmarks); by default a pooled
+            transport is built from get_pool_settings()
+    """
+    import httpx
+
+    settings = get_pool_settings()
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(
+            http2=settings['http2'],
+            limits=httpx.Limits(
+                max_connections=settings['max_connections'],
+                max_keepalive_connections=settings['max_keepalive_connections'],
+                keepalive_expiry=settings['keepalive_expiry']
+            )
+        )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings['timeout'], connect=settings['connect_timeout'])
+    )
+
+# Process-wide model registry
+_registry_lock = threading.Lock()
+_http_client: Optional["httpx.AsyncClient"] = None
+_provider: Optional["GoogleGLAProvider"] = None
+_models: Dict[str, "Model"] = {}
+_model_override: Optional["Model"] = None
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Return the shared HTTP client, recreating it (and the models using it) if it was closed"""
+    global _http_client, _provider
+    with _registry_lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = create_http_client()
+            _provider = None
+            _models.clear()
+        return _http_client
+
+def get_provider() -> "GoogleGLAProvider":
+    """Return the shared Gemini provider"""
+    from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+    global _provider
+    http_client = get_http_client()
+    with _registry_lock:
+        if _provider is None:
+            _provider = GoogleGLAProvider(api_key=os.getenv('GEMINI_KEY'), http_client=http_client)
+        return _provider
+
+def set_model_override(model: Optional["Model"]) -> None:
+    """
+    Make get_model() return this model for every model name, e.g. a local fake for benchmarks
+
+    Agents keep the model they were built with, so set the override before the
+    first agent call. Pass None to go back to Gemini.
+    """
+    global _model_override
+    if model is not None:
+        model = wrap_model(model)
+    with _registry_lock:
+        _model_override = model
+
+def wrap_model(model: "Model") -> "Model":
+    """
+    Add the enabled request wrappers to a model, innermost first: tracing, the
+    circuit breaker and the rate limiter (so queueing for quota is neither
+    traced as model latency nor counted as a slow call)
+    """
+    from circuit_breaker import get_circuit_breakers, protect_model
+    from rate_limiter import get_rate_limiter, rate_limit_model
+    from tracing import get_tracer, instrument_model
+
+    if get_tracer() is not None:
+        model = instrument_model(model)
+    if get_circuit_breakers() is not None:
+        model = protect_model(model)
+    if get_rate_limiter() is not None:
+        model = rate_limit_model(model)
+    return model
+
+def get_model(model_name: Optional[str] = None) -> "Model":
+    """
+    Return the shared GeminiModel for a model name (defaults to MODEL_CHOICE), with the
+    tracing, circuit breaker and rate limit wrappers that are enabled (see wrap_model)
+    """
+    from pydantic_ai.models.gemini import GeminiModel
+    from context_cache import create_context_cached_model, get_context_cache
+
+    with _registry_lock:
+        if _model_override is not None:
+            return _model_override
+
+    load_environment()
+    model_name = model_name or os.getenv('MODEL_CHOICE', 'gemini-2.0-flash')
+    provider = get_provider()
+    with _registry_lock:
+        if model_name not in _models:
+            if get_context_cache() is not None:
+                model = create_context_cached_model(model_name, provider)
+            else:
+                model = GeminiModel(model_name, provider=provider)
+            _models[model_name] = wrap_model(model)
+        return _models[model_name]
+
+def clear_agents() -> None:
+    """Drop the cached agents, so the next call builds them on a model from get_model()"""
+    from agents.info_gathering_agent import get_info_gathering_agent
+    from analysis_registry import ANALYSIS_SPECS
+    from fusion import get_fused_agent
+
+    get_info_gathering_agent.cache_clear()
+    for spec in ANALYSIS_SPECS.values():
+        spec.get_agent.cache_clear()
+    get_fused_agent.cache_clear()
+
+async def close_models() -> None:
+    """
+    Close the shared HTTP client, e.g. on application shutdown. The cached agents
+    are dropped with the models, so none is left holding the closed client.
+    """
+    global _http_client, _provider
+    with _registry_lock:
+        http_client = _http_client
+        _http_client = None
+        _provider = None
+        _models.clear()
+    clear_agents()
+    if http_client is not None:
+        await http_client.aclose()